@@ -0,0 +1,108 @@
+"""Shared helpers for the offline benchmarks.
+
+The integration package imports Home Assistant from its ``__init__``, so the
+HA-free modules are loaded directly from their files, with the same loader
+the tests use (``conftest.load_component_module``).
+"""
+from __future__ import annotations
+
+import json
+import statistics
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from conftest import COMPONENT_DIR, load_component_module  # noqa: E402
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+# Marketing block used to pad pages; it mentions gold and prices on purpose
+# so the fallback strategies have realistic noise to wade through.
+_PAD_BLOCK = (
+    '<div class="promo"><h3>Grow your savings with Maybank Gold Investment</h3>'
+    "<p>Start investing in gold and silver from as low as RM{n}.00 with the "
+    "Maybank Gold Investment Account. Terms and conditions apply. "
+    '<a href="/maybank2u/malaysia/en/personal/promo{n}.page">Learn more</a></p></div>\n'
+)
+_PAD_ANCHOR = '<div class="row">'
+
+
+def pad_page(html: str, size: int) -> str:
+    """Insert marketing blocks above the rate tables until ``html`` is ``size`` bytes."""
+    idx = html.find(_PAD_ANCHOR)
+    if idx < 0:
+        idx = len(html)
+    missing = size - len(html.encode("utf-8"))
+    blocks: List[str] = []
+    n = 0
+    while missing > 0:
+        block = _PAD_BLOCK.format(n=n % 997)
+        blocks.append(block)
+        missing -= len(block)
+        n += 1
+    return html[:idx] + "".join(blocks) + html[idx:]
+
+
+def load_fixtures(version: str = "v1") -> List[Dict[str, Any]]:
+    """Return fixtures from ``fixtures/<version>/manifest.json`` with their HTML."""
+    base = FIXTURES_DIR / version
+    manifest = json.loads((base / "manifest.json").read_text(encoding="utf-8"))
+    by_name: Dict[str, Dict[str, Any]] = {}
+    fixtures: List[Dict[str, Any]] = []
+    for entry in manifest["fixtures"]:
+        item = dict(entry)
+        html = (base / entry["file"]).read_text(encoding="utf-8")
+        if "pad_to_bytes" in entry:
+            html = pad_page(html, entry["pad_to_bytes"])
+        item["html"] = html
+        if isinstance(item["expected"], str):
+            item["expected"] = by_name[item["expected"]]["expected"]
+        by_name[item["name"]] = item
+        fixtures.append(item)
+    return fixtures
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile; ``samples`` need not be sorted."""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Any],
+    tolerance: float,
+    min_delta_ms: float = 0.25,
+) -> List[str]:
+    """Cases whose fastest run is ``tolerance`` times slower than the baseline's.
+
+    Slowdowns under ``min_delta_ms`` are ignored as noise.
+    """
+    failures: List[str] = []
+    for case, base in baseline["results"].items():
+        current = results.get(case)
+        if current is None:
+            continue
+        limit = base["min"] * tolerance
+        if current["min"] > limit and current["min"] - base["min"] > min_delta_ms:
+            failures.append(
+                f"{case}: best {current['min']:.3f} ms > {limit:.3f} ms "
+                f"(baseline {base['min']:.3f} ms x {tolerance})"
+            )
+    return failures
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    return {
+        "min": min(samples),
+        "p50": statistics.median(samples),
+        "p99": percentile(samples, 99),
+        "mean": statistics.fmean(samples),
+    }
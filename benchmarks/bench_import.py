@@ -0,0 +1,230 @@
+"""Import-time benchmark for the integration's modules.
+
+Each sample is a fresh interpreter. It first imports every module the
+integration's files import at module level (Home Assistant, voluptuous,
+aiohttp, the standard library), as a running Home Assistant already has
+them loaded. Then it times the import of one case, so only the
+integration's own module code is measured: building schemas, compiling
+patterns and defining classes. The component is byte-compiled first, as
+it would be after Home Assistant's first start, so compiling the source
+isn't timed either.
+
+    python benchmarks/bench_import.py                  # every case, 30 runs each
+    python benchmarks/bench_import.py --case parser --runs 100
+    python benchmarks/bench_import.py --against REV    # before/after against a git revision
+    python benchmarks/bench_import.py --save-baseline  # record baseline_import.json
+    python benchmarks/bench_import.py --compare        # exit 1 on regression
+
+The ``parser`` case loads ``parser.py`` on its own and needs nothing
+installed. The ``sensor`` case imports the sensor platform the way Home
+Assistant does and is skipped when Home Assistant is missing.
+
+``--against`` exports the component as it was at a git revision into a
+temporary directory and measures it the same way, alternating runs between
+the two trees so drift on the machine affects both alike. The saving is the
+difference of the medians. With ``--save-baseline`` both sides are recorded,
+the before side under the revision's subject line as well as its name, so
+it can still be found after the history is rebased.
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import compileall
+import json
+import subprocess
+import sys
+import tarfile
+import tempfile
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from _common import COMPONENT_DIR, ROOT, compare, summarize
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline_import.json"
+PACKAGE = "custom_components.maybank_gold_silver"
+CASES = ("parser", "sensor")
+
+# Run in the child: pre-import the dependencies, then time one import
+_CHILD = """
+import importlib, importlib.util, json, sys, time
+sys.path.insert(0, {root!r})
+for name in {deps!r}:
+    try:
+        importlib.import_module(name)
+    except Exception:
+        pass
+before = set(sys.modules)
+started = time.perf_counter()
+if {case!r} == "parser":
+    spec = importlib.util.spec_from_file_location("maybank_parser", {parser!r})
+    module = sys.modules["maybank_parser"] = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+else:
+    importlib.import_module({package!r} + ".sensor")
+elapsed = time.perf_counter() - started
+loaded = sorted(m for m in set(sys.modules) - before if m.startswith({package!r}))
+print(json.dumps({{"ms": elapsed * 1000, "loaded": loaded}}))
+"""
+
+
+def dependencies(component_dir: Path = COMPONENT_DIR) -> List[str]:
+    """Modules imported at module level by the component, besides its own."""
+    names = set()
+    for path in sorted(component_dir.glob("*.py")):
+        tree = ast.parse(path.read_text(encoding="utf-8"))
+        for node in tree.body:
+            if isinstance(node, ast.Import):
+                names.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module != "__future__":
+                names.add(node.module)
+                # "from homeassistant.helpers import storage" imports a submodule
+                names.update(f"{node.module}.{alias.name}" for alias in node.names if alias.name.islower())
+    return sorted(names)
+
+
+def _ha_available() -> bool:
+    try:
+        import homeassistant  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def export_revision(rev: str, dest: Path) -> Path:
+    """Write the component as of git revision ``rev`` under ``dest``; return that root."""
+    archive = subprocess.run(
+        ["git", "archive", "--format=tar", rev, "custom_components"],
+        check=True, capture_output=True, cwd=str(ROOT),
+    ).stdout
+    with tarfile.open(fileobj=BytesIO(archive)) as tar:
+        tar.extractall(dest)
+    return dest
+
+
+def describe_revision(rev: str) -> str:
+    """The subject line of the commit ``rev`` names."""
+    return subprocess.run(
+        ["git", "log", "-1", "--format=%s", rev],
+        check=True, capture_output=True, text=True, cwd=str(ROOT),
+    ).stdout.strip()
+
+
+def _sample(code: str, root: Path) -> Tuple[float, List[str]]:
+    out = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True, cwd=str(root)
+    ).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    return result["ms"], result["loaded"]
+
+
+def run_case(case: str, runs: int, deps: List[str], roots: List[Path]) -> Optional[List[Dict[str, Any]]]:
+    """Time ``case`` in each tree under ``roots``, alternating between them every run."""
+    if case == "sensor" and not _ha_available():
+        print("sensor: skipped, Home Assistant not installed")
+        return None
+    codes = [
+        _CHILD.format(
+            root=str(root),
+            deps=deps,
+            case=case,
+            parser=str(root / "custom_components" / "maybank_gold_silver" / "parser.py"),
+            package=PACKAGE,
+        )
+        for root in roots
+    ]
+    samples: List[List[float]] = [[] for _ in roots]
+    loaded: List[List[str]] = [[] for _ in roots]
+    for _ in range(runs):
+        for idx, (code, root) in enumerate(zip(codes, roots)):
+            ms, loaded[idx] = _sample(code, root)
+            samples[idx].append(ms)
+    results = []
+    for idx in range(len(roots)):
+        stats = summarize(samples[idx])
+        stats["runs"] = runs
+        stats["modules"] = [name[len(PACKAGE) + 1:] or "__init__" for name in loaded[idx]]
+        results.append(stats)
+    return results
+
+
+def report(results: Dict[str, Dict[str, Any]]) -> None:
+    print(f"{'case':<10}{'runs':>6}{'min ms':>10}{'p50 ms':>10}{'p99 ms':>10}  modules")
+    print("-" * 72)
+    for case, stats in results.items():
+        modules = ", ".join(stats["modules"]) or "-"
+        print(
+            f"{case:<10}{stats['runs']:>6}{stats['min']:>10.3f}{stats['p50']:>10.3f}"
+            f"{stats['p99']:>10.3f}  {modules}"
+        )
+
+
+def report_saving(before: Dict[str, Dict[str, Any]], after: Dict[str, Dict[str, Any]], rev: str) -> None:
+    print(f"\nagainst {rev}:")
+    print(f"{'case':<10}{'before p50':>12}{'after p50':>12}{'saved ms':>10}{'saved':>8}  modules no longer loaded")
+    print("-" * 80)
+    for case, stats in after.items():
+        old = before[case]
+        saved = old["p50"] - stats["p50"]
+        dropped = ", ".join(sorted(set(old["modules"]) - set(stats["modules"]))) or "-"
+        print(
+            f"{case:<10}{old['p50']:>12.3f}{stats['p50']:>12.3f}{saved:>10.3f}"
+            f"{saved / old['p50']:>8.0%}  {dropped}"
+        )
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--case", action="append", choices=CASES, help="run only these (repeatable)")
+    ap.add_argument("--runs", type=int, default=30, help="fresh interpreters per case")
+    ap.add_argument("--against", metavar="REV", help="also time the component at this git revision")
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--compare", action="store_true")
+    ap.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    ap.add_argument("--tolerance", type=float, default=2.0, help="allowed slowdown factor")
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        roots = [ROOT]
+        deps = set(dependencies())
+        if args.against:
+            before_root = export_revision(args.against, Path(tmp))
+            before_dir = before_root / "custom_components" / "maybank_gold_silver"
+            compileall.compile_dir(str(before_dir), quiet=1)
+            roots.append(before_root)
+            # Both trees run with the same dependencies already imported
+            deps.update(dependencies(before_dir))
+        compileall.compile_dir(str(COMPONENT_DIR), quiet=1)
+        results: Dict[str, Dict[str, Any]] = {}
+        before: Dict[str, Dict[str, Any]] = {}
+        for case in args.case or CASES:
+            stats = run_case(case, args.runs, sorted(deps), roots)
+            if stats is not None:
+                results[case] = stats[0]
+                if args.against:
+                    before[case] = stats[1]
+    report(results)
+    if args.against:
+        report_saving(before, results, args.against)
+
+    if args.save_baseline:
+        saved: Dict[str, Any] = {"runs": args.runs, "results": results}
+        if args.against:
+            saved["before"] = {"rev": args.against, "subject": describe_revision(args.against), "results": before}
+        args.baseline.write_text(json.dumps(saved, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"\nBaseline written to {args.baseline}")
+    if args.compare:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        failures = compare(results, baseline, args.tolerance, min_delta_ms=0.5)
+        if failures:
+            print("\nREGRESSIONS:")
+            for line in failures:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
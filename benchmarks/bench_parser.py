@@ -0,0 +1,140 @@
+"""Offline benchmark for the Maybank price parser.
+
+Runs every fixture in the versioned corpus through the full parser, through
+the parser with the strategy order adapted to the winner, through a
+re-parse of the remembered table window, and through each strategy on its
+own, then reports throughput, p50/p99 latency and peak
+memory. Regressions are judged on the fastest run of each case,
+which is far less sensitive to scheduler noise than the median.
+
+    python benchmarks/bench_parser.py                     # report only
+    python benchmarks/bench_parser.py --save-baseline     # record baseline.json
+    python benchmarks/bench_parser.py --compare           # exit 1 on regression
+
+Baselines are machine specific: record one on the machine you compare on.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from _common import compare, load_component_module, load_fixtures, summarize
+
+parser = load_component_module("parser")
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+_PHASES = ("full", "adaptive", "windowed") + tuple(parser.STRATEGIES)
+
+
+def _runner(strategy: str, html: str) -> Callable[[], Any]:
+    if strategy == "full":
+        return lambda: parser.parse_prices(html)
+    if strategy == "adaptive":
+        # What a refresh costs once the fetcher has learned the winning strategy
+        winner = parser.parse_tables(parser.extract_tables(html), html).strategy
+        order = parser.order_strategies(winner)
+        return lambda: parser.parse_tables(parser.extract_tables(html), html, order)
+    if strategy == "windowed":
+        # A refresh that finds the tables where the last page had them
+        tables = parser.extract_tables(html)
+        hint = parser.make_hint(html, tables)
+        order = parser.order_strategies(parser.parse_tables(tables, html).strategy)
+
+        def _windowed() -> Any:
+            found = parser.extract_window(html, hint) if hint else None
+            return parser.parse_tables(found if found is not None else parser.extract_tables(html), html, order)
+
+        return _windowed
+    strategies = (strategy,)
+    return lambda: parser.parse_tables(parser.extract_tables(html), html, strategies)
+
+
+def _time(func: Callable[[], Any], budget: float, min_runs: int, max_runs: int) -> List[float]:
+    samples: List[float] = []
+    deadline = time.perf_counter() + budget
+    while len(samples) < max_runs and (len(samples) < min_runs or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _peak_kib(func: Callable[[], Any]) -> float:
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def run(version: str, budget: float, min_runs: int, max_runs: int) -> Dict[str, Dict[str, Any]]:
+    results: Dict[str, Dict[str, Any]] = {}
+    for fixture in load_fixtures(version):
+        html = fixture["html"]
+        size = len(html.encode("utf-8"))
+        got = parser.parse_prices(html)
+        if got != fixture["expected"]:
+            raise SystemExit(f"{fixture['name']}: parsed {got}, expected {fixture['expected']}")
+        for strategy in _PHASES:
+            func = _runner(strategy, html)
+            stats = summarize(_time(func, budget, min_runs, max_runs))
+            stats["mb_per_s"] = size / 1e6 / (stats["p50"] / 1000) if stats["p50"] else 0.0
+            stats["peak_kib"] = _peak_kib(func)
+            stats["bytes"] = size
+            results[f"{fixture['name']}/{strategy}"] = stats
+    return results
+
+
+def report(results: Dict[str, Dict[str, Any]]) -> None:
+    print(f"{'case':<34}{'bytes':>10}{'p50 ms':>10}{'p99 ms':>10}{'MB/s':>9}{'peak KiB':>11}")
+    print("-" * 84)
+    for case, stats in results.items():
+        print(
+            f"{case:<34}{stats['bytes']:>10}{stats['p50']:>10.3f}{stats['p99']:>10.3f}"
+            f"{stats['mb_per_s']:>9.1f}{stats['peak_kib']:>11.1f}"
+        )
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--fixtures", default="v1", help="fixture corpus version")
+    ap.add_argument("--budget", type=float, default=0.3, help="seconds to spend per case")
+    ap.add_argument("--min-runs", type=int, default=5)
+    ap.add_argument("--max-runs", type=int, default=500)
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--compare", action="store_true")
+    ap.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    ap.add_argument("--tolerance", type=float, default=2.0, help="allowed slowdown factor")
+    args = ap.parse_args(argv)
+
+    results = run(args.fixtures, args.budget, args.min_runs, args.max_runs)
+    report(results)
+
+    if args.save_baseline:
+        args.baseline.write_text(
+            json.dumps({"fixtures": args.fixtures, "results": results}, indent=2, sort_keys=True) + "\n",
+            encoding="utf-8",
+        )
+        print(f"\nBaseline written to {args.baseline}")
+    if args.compare:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        failures = compare(results, baseline, args.tolerance)
+        if failures:
+            print("\nREGRESSIONS:")
+            for line in failures:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,382 @@
+"""End-to-end refresh benchmark against a local stub of the Maybank rates page.
+
+A stub aiohttp server, run in a child process, serves the recorded
+``real_page.html`` fixture. ``MaybankMetalsCoordinator`` is driven through
+it for many refresh cycles, with the real fetcher, the redirect checks and
+the ``ssl=False`` retry all in the path. Each scenario reports refresh
+p50/p99 latency, event-loop CPU time, the longest event-loop stall, peak
+traced memory per cycle, and the blocks and bytes each cycle leaves
+allocated.
+
+    python benchmarks/bench_refresh.py                         # every scenario
+    python benchmarks/bench_refresh.py --scenario tls --cycles 500
+    python benchmarks/bench_refresh.py --scenario bloated --offload-kb 0   # always parse in the executor
+    python benchmarks/bench_refresh.py --save-baseline         # record baseline_refresh.json
+    python benchmarks/bench_refresh.py --compare               # exit 1 on regression
+
+Unlike the parser benchmark this one needs Home Assistant (and so aiohttp)
+installed. It never touches the network: every lookup of the Maybank host
+resolves to 127.0.0.1. The ``tls`` scenario needs the ``openssl`` command
+and ``brotli`` needs the ``brotli`` package; each is skipped when missing.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import gzip
+import json
+import logging
+import multiprocessing
+import shutil
+import socket
+import ssl
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from _common import FIXTURES_DIR, ROOT, compare, pad_page, summarize
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline_refresh.json"
+
+HOST = "www.maybank2u.com.my"
+PAGE_PATH = "/maybank2u/malaysia/en/personal/rates/gold_and_silver.page"
+# Where the ``redirect`` scenario sends the client; still passes the host/path check
+MOVED_PATH = "/maybank2u/malaysia/en/personal/rates/gold_and_silver/current.page"
+SCENARIOS = ("plain", "latency", "redirect", "gzip", "brotli", "errors", "tls", "bloated")
+
+# Gold selling price in real_page.html, rewritten when the page "changes"
+_GOLD_PRICE = "534.14"
+# The bloated scenario serves a page without rate tables, so every parse
+# falls through to the free-text strategy over the whole padded page
+_BLOATED_FIXTURE = "layout_div_text.html"
+_BLOATED_GOLD_PRICE = "345.50"
+
+
+# ---------- Stub server (child process) ----------
+
+def _page_for(version: int, html: str, price: str) -> str:
+    return html.replace(price, f"{float(price) + version / 100:.2f}", 1)
+
+
+def _serve(scenario: str, options: Dict[str, Any], conn) -> None:
+    """Run the stub server until the parent terminates the process."""
+    from aiohttp import web
+
+    price = _GOLD_PRICE
+    if scenario == "bloated":
+        html = (FIXTURES_DIR / "v1" / _BLOATED_FIXTURE).read_text(encoding="utf-8")
+        html = pad_page(html, int(options["bloat_mb"] * 1024 * 1024))
+        price = _BLOATED_GOLD_PRICE
+    else:
+        html = (FIXTURES_DIR / "v1" / "real_page.html").read_text(encoding="utf-8")
+    count = 0
+    # Encoded bodies per page version; compression is not what is measured
+    bodies: Dict[int, bytes] = {}
+
+    def _body(version: int) -> bytes:
+        body = bodies.get(version)
+        if body is None:
+            body = _page_for(version, html, price).encode("utf-8")
+            if scenario == "gzip":
+                body = gzip.compress(body)
+            elif scenario == "brotli":
+                import brotli
+
+                body = brotli.compress(body, quality=5)
+            bodies.clear()
+            bodies[version] = body
+        return body
+
+    async def _page(request: web.Request) -> web.StreamResponse:
+        nonlocal count
+        count += 1
+        if scenario == "latency":
+            await asyncio.sleep(options["latency_ms"] / 1000)
+        if scenario == "errors" and count % options["error_every"] == 0:
+            return web.Response(status=503, text="Service Unavailable")
+        if scenario == "redirect" and request.path == PAGE_PATH:
+            raise web.HTTPFound(MOVED_PATH)
+        version = count // options["change_every"]
+        body = _body(version)
+        etag = f'"v{version}"'
+        if options["etag"] and request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        headers = {"ETag": etag} if options["etag"] else {}
+        if scenario in ("gzip", "brotli"):
+            headers["Content-Encoding"] = "gzip" if scenario == "gzip" else "br"
+        return web.Response(body=body, headers=headers, content_type="text/html", charset="utf-8")
+
+    async def _main() -> None:
+        app = web.Application()
+        app.router.add_get(PAGE_PATH, _page)
+        app.router.add_get(MOVED_PATH, _page)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        ssl_context = None
+        if options.get("certfile"):
+            ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            ssl_context.load_cert_chain(options["certfile"], options["keyfile"])
+        site = web.TCPSite(runner, "127.0.0.1", 0, ssl_context=ssl_context)
+        await site.start()
+        conn.send(runner.addresses[0][1])
+        await asyncio.Event().wait()
+
+    asyncio.run(_main())
+
+
+def _self_signed_cert(directory: Path) -> Optional[Dict[str, str]]:
+    """Write a self-signed certificate for the Maybank host, or None without openssl."""
+    if shutil.which("openssl") is None:
+        return None
+    certfile, keyfile = directory / "cert.pem", directory / "key.pem"
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+            "-subj", f"/CN={HOST}", "-keyout", str(keyfile), "-out", str(certfile),
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return {"certfile": str(certfile), "keyfile": str(keyfile)}
+
+
+# ---------- Client (this process) ----------
+
+def _resolver_class():
+    from aiohttp.abc import AbstractResolver
+
+    class _LoopbackResolver(AbstractResolver):
+        """Resolve every host to 127.0.0.1 so nothing leaves the machine."""
+
+        async def resolve(self, host: str, port: int = 0, family: int = socket.AF_INET) -> List[Dict[str, Any]]:
+            return [
+                {
+                    "hostname": host,
+                    "host": "127.0.0.1",
+                    "port": port,
+                    "family": socket.AF_INET,
+                    "proto": 0,
+                    "flags": socket.AI_NUMERICHOST,
+                }
+            ]
+
+        async def close(self) -> None:
+            pass
+
+    return _LoopbackResolver
+
+
+async def _watch_loop(stalls: List[float]) -> None:
+    """Append how late each 1 ms sleep wakes up, i.e. how long the loop was blocked."""
+    loop = asyncio.get_running_loop()
+    while True:
+        before = loop.time()
+        await asyncio.sleep(0.001)
+        stalls.append((loop.time() - before - 0.001) * 1000)
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    """Traced memory still referenced, leaving out tracemalloc's own snapshots."""
+    gc.collect()
+    return tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+
+
+def _retained(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot) -> tuple[int, int]:
+    """Blocks and bytes allocated between two snapshots and still held at the second."""
+    diff = after.compare_to(before, "filename")
+    return sum(stat.count_diff for stat in diff), sum(stat.size_diff for stat in diff)
+
+
+async def _drive(
+    scheme: str, port: int, cycles: int, alloc_cycles: int, config_dir: str, offload_kb: Optional[float]
+) -> Dict[str, Any]:
+    import aiohttp
+    from homeassistant.core import HomeAssistant
+
+    from custom_components.maybank_gold_silver import fetcher as fetcher_module
+    from custom_components.maybank_gold_silver.breaker import CircuitBreaker
+    from custom_components.maybank_gold_silver.sensor import MaybankMetalsCoordinator
+
+    hass = HomeAssistant(config_dir)
+    fetcher_module.SOURCE_URL = f"{scheme}://{HOST}:{port}{PAGE_PATH}"
+    session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(resolver=_resolver_class()()),
+        trace_configs=[fetcher_module._trace_config()],
+    )
+    fetcher = fetcher_module.MaybankFetcher(hass, session)
+    # Every cycle should make a request; an open breaker would refuse them
+    fetcher.breaker = CircuitBreaker(threshold=sys.maxsize)
+    if offload_kb is not None:
+        fetcher.offload_threshold = int(offload_kb * 1024)
+    # A microsecond interval keeps the fetcher's freshness window from
+    # answering refreshes without a request
+    coordinator = MaybankMetalsCoordinator(hass, fetcher, timedelta(microseconds=1))
+    latencies: List[float] = []
+    cpu: List[float] = []
+    peaks: List[float] = []
+    retained = (0, 0)
+    # Longest event-loop stall seen during each cycle
+    stall_max: List[float] = []
+    stalls: List[float] = []
+    watcher = asyncio.create_task(_watch_loop(stalls))
+    failed = 0
+    try:
+        for cycle in range(cycles + alloc_cycles):
+            traced = cycle >= cycles
+            if cycle == cycles:
+                watcher.cancel()
+                tracemalloc.start()
+            elif cycle == cycles + 1:
+                # After one traced cycle, so what every cycle replaces (the
+                # last page, the last timings) is in both snapshots
+                before = _snapshot()
+            if traced:
+                tracemalloc.reset_peak()
+                cycle_start = tracemalloc.get_traced_memory()[0]
+            stalls.clear()
+            started, cpu_started = time.perf_counter(), time.thread_time()
+            await coordinator.async_refresh()
+            elapsed, cpu_used = time.perf_counter() - started, time.thread_time() - cpu_started
+            if traced:
+                peaks.append((tracemalloc.get_traced_memory()[1] - cycle_start) / 1024)
+                continue
+            latencies.append(elapsed * 1000)
+            cpu.append(cpu_used * 1000)
+            stall_max.append(max(stalls, default=0.0))
+            failed += not coordinator.last_update_success
+        if alloc_cycles > 1:
+            retained = _retained(before, _snapshot())
+    finally:
+        tracemalloc.stop()
+        watcher.cancel()
+        await session.close()
+        await hass.async_stop(force=True)
+    stats = summarize(latencies)
+    stats["cpu_ms"] = summarize(cpu)["p50"]
+    stats["stall_ms"] = summarize(stall_max)["p99"]
+    stats["loop_ms_saved"] = fetcher.metrics["loop_ms_saved"]
+    stats["offloaded"] = fetcher.offload_counts["executor"]
+    stats["peak_kib"] = max(peaks) if peaks else 0.0
+    # Still allocated after the traced cycles, per cycle: what each refresh keeps
+    compared = max(alloc_cycles - 1, 1)
+    stats["retained_blocks"] = retained[0] / compared
+    stats["retained_bytes"] = retained[1] / compared
+    stats["cycles"] = cycles
+    stats["failed"] = failed
+    stats["skipped"] = dict(fetcher.skip_counts)
+    return stats
+
+
+def run_scenario(scenario: str, args: argparse.Namespace, workdir: Path) -> Optional[Dict[str, Any]]:
+    options = {
+        "latency_ms": args.latency_ms,
+        "error_every": args.error_every,
+        "change_every": args.change_every,
+        "etag": args.etag,
+        "bloat_mb": args.bloat_mb,
+    }
+    scheme = "http"
+    if scenario == "tls":
+        cert = _self_signed_cert(workdir)
+        if cert is None:
+            print("tls: skipped, openssl not found")
+            return None
+        options.update(cert)
+        scheme = "https"
+    if scenario == "brotli":
+        try:
+            import brotli  # noqa: F401
+        except ImportError:
+            print("brotli: skipped, brotli package not installed")
+            return None
+    ctx = multiprocessing.get_context("spawn")
+    parent, child = ctx.Pipe()
+    server = ctx.Process(target=_serve, args=(scenario, options, child), daemon=True)
+    server.start()
+    try:
+        if not parent.poll(30):
+            raise SystemExit(f"{scenario}: stub server did not start")
+        port = parent.recv()
+        config_dir = tempfile.mkdtemp(prefix=f"refresh_{scenario}_", dir=workdir)
+        return asyncio.run(_drive(scheme, port, args.cycles, args.alloc_cycles, config_dir, args.offload_kb))
+    finally:
+        server.terminate()
+        server.join()
+
+
+def report(results: Dict[str, Dict[str, Any]]) -> None:
+    print(
+        f"{'scenario':<12}{'cycles':>8}{'failed':>8}{'p50 ms':>10}{'p99 ms':>10}"
+        f"{'loop CPU ms':>13}{'stall ms':>10}{'peak KiB':>11}{'kept blocks':>13}{'kept B':>9}"
+    )
+    print("-" * 104)
+    for scenario, stats in results.items():
+        print(
+            f"{scenario:<12}{stats['cycles']:>8}{stats['failed']:>8}{stats['p50']:>10.3f}"
+            f"{stats['p99']:>10.3f}{stats['cpu_ms']:>13.3f}{stats['stall_ms']:>10.3f}{stats['peak_kib']:>11.1f}"
+            f"{stats['retained_blocks']:>13.1f}{stats['retained_bytes']:>9.0f}"
+        )
+    for scenario, stats in results.items():
+        if stats["offloaded"]:
+            print(
+                f"{scenario}: {stats['offloaded']} parses in the executor, "
+                f"{stats['loop_ms_saved']:.1f} ms of parsing moved off the event loop"
+            )
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--scenario", action="append", choices=SCENARIOS, help="run only these (repeatable)")
+    ap.add_argument("--cycles", type=int, default=2000, help="timed refresh cycles per scenario")
+    ap.add_argument("--alloc-cycles", type=int, default=20, help="extra cycles run under tracemalloc")
+    ap.add_argument("--latency-ms", type=float, default=20.0, help="server delay in the latency scenario")
+    ap.add_argument("--error-every", type=int, default=5, help="every Nth request is a 503 in the errors scenario")
+    ap.add_argument("--change-every", type=int, default=10, help="new gold price every N requests")
+    ap.add_argument("--etag", action="store_true", help="send ETags and answer 304 when unchanged")
+    ap.add_argument("--bloat-mb", type=float, default=2.0, help="page size in the bloated scenario")
+    ap.add_argument(
+        "--offload-kb", type=float, help="parse pages this large in the executor (default: the fetcher's)"
+    )
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--compare", action="store_true")
+    ap.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    ap.add_argument("--tolerance", type=float, default=2.0, help="allowed slowdown factor")
+    args = ap.parse_args(argv)
+
+    sys.path.insert(0, str(ROOT))
+    # The errors and tls scenarios fail on purpose; keep their logging out of the report
+    logging.basicConfig(level=logging.CRITICAL)
+    results: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for scenario in args.scenario or SCENARIOS:
+            stats = run_scenario(scenario, args, Path(workdir))
+            if stats is not None:
+                results[scenario] = stats
+    report(results)
+
+    if args.save_baseline:
+        args.baseline.write_text(
+            json.dumps({"cycles": args.cycles, "results": results}, indent=2, sort_keys=True) + "\n",
+            encoding="utf-8",
+        )
+        print(f"\nBaseline written to {args.baseline}")
+    if args.compare:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        failures = compare(results, baseline, args.tolerance, min_delta_ms=1.0)
+        if failures:
+            print("\nREGRESSIONS:")
+            for line in failures:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""Replay months of rate history through the coordinator on a simulated clock.
+
+Each snapshot is either a page of HTML, which goes through the fetcher's
+normal parse path (digest skip, table window, strategy order), or a set of
+already parsed prices. The snapshot is fed to ``MaybankMetalsCoordinator``
+with the fetcher's injected clock at its timestamp. The price, derived and
+holding sensors are real entities on an entity platform, so every state
+write and attribute build is in the measured path. Nothing is fetched and
+nothing sleeps.
+
+    python benchmarks/bench_replay.py                          # 90 synthetic days
+    python benchmarks/bench_replay.py --days 365 --parsed      # skip HTML parsing
+    python benchmarks/bench_replay.py --input snapshots.jsonl --states-out states.jsonl
+    python benchmarks/bench_replay.py --save-baseline          # record baseline_replay.json
+    python benchmarks/bench_replay.py --compare                # exit 1 on regression
+
+``--input`` takes one JSON object per line: ``{"at": ..., "html": "..."}`` or
+``{"at": ..., "prices": {"gold": {"buy": ..., "sell": ...}, ...}}``, where
+``at`` is an ISO 8601 timestamp or epoch seconds. Without it, synthetic
+history is generated from ``real_page.html``: polls every 30 minutes, and
+rates that move at about 09:15 and 13:45 on weekdays. ``--states-out``
+writes every state change with its simulated time, to check automation
+triggers against.
+
+Like the refresh benchmark this needs Home Assistant installed.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from _common import FIXTURES_DIR, ROOT, compare, summarize
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline_replay.json"
+
+TIME_ZONE = "Asia/Kuala_Lumpur"
+# Holdings valued on every update, so the portfolio sensors are replayed too
+HOLDINGS = {"gold": 50.0, "silver": 1000.0, "miga": 120.0}
+
+# Prices in real_page.html, in the order they are substituted
+_PAGE_PRICES = (
+    ("gold", "buy", "534.14"),
+    ("gold", "sell", "513.79"),
+    ("silver", "buy", "6.62"),
+    ("silver", "sell", "6.10"),
+    ("miga_100g", "buy", "534.13"),
+    ("miga_100g", "sell", "522.06"),
+    ("miga_below100g", "buy", "535.88"),
+    ("miga_below100g", "sell", "521.56"),
+)
+
+Snapshot = Tuple[datetime, Dict[str, Any]]
+
+
+# ---------- Snapshots ----------
+
+def _parse_at(value: Any) -> datetime:
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, timezone.utc)
+    at = datetime.fromisoformat(value)
+    return at if at.tzinfo else at.replace(tzinfo=timezone.utc)
+
+
+def read_snapshots(path: Path) -> Iterator[Snapshot]:
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                item = json.loads(line)
+                yield _parse_at(item["at"]), item
+
+
+def _quote(mid: float, spread: float) -> Dict[str, float]:
+    return {"buy": round(mid * (1 + spread), 2), "sell": round(mid * (1 - spread), 2)}
+
+
+def synthetic_snapshots(days: int, parsed: bool, seed: int) -> Iterator[Snapshot]:
+    """Poll every 30 minutes over ``days`` days of rates published twice per weekday."""
+    from homeassistant.util import dt as dt_util
+
+    rng = random.Random(seed)
+    # The page split around each price, so new prices can be joined in
+    rest = (FIXTURES_DIR / "v1" / "real_page.html").read_text(encoding="utf-8")
+    pieces: List[str] = []
+    for _, _, literal in _PAGE_PRICES:
+        head, rest = rest.split(literal, 1)
+        pieces.append(head)
+    tz = dt_util.get_time_zone(TIME_ZONE)
+    start = datetime(2025, 1, 6, tzinfo=tz)  # a Monday
+    gold, silver = 524.0, 6.35
+    prices: Dict[str, Dict[str, float]] = {}
+    publish_at: List[datetime] = []
+    for step in range(days * 48):
+        at = start + timedelta(minutes=30 * step)
+        if at.hour == 0 and at.minute == 0 and at.weekday() < 5:
+            publish_at = [
+                at.replace(hour=9, minute=15) + timedelta(minutes=rng.randint(-10, 10)),
+                at.replace(hour=13, minute=45) + timedelta(minutes=rng.randint(-10, 10)),
+            ]
+        if not prices or (publish_at and at >= publish_at[0]):
+            if publish_at and at >= publish_at[0]:
+                publish_at.pop(0)
+            gold *= 1 + rng.gauss(0, 0.006)
+            silver *= 1 + rng.gauss(0, 0.009)
+            prices = {
+                "gold": _quote(gold, 0.019),
+                "silver": _quote(silver, 0.041),
+                "miga_100g": _quote(gold * 1.005, 0.011),
+                "miga_below100g": _quote(gold * 1.006, 0.014),
+            }
+        if parsed:
+            yield at, {"prices": prices}
+        else:
+            values = [f"{prices[metal][field]:.2f}" for metal, field, _ in _PAGE_PRICES]
+            yield at, {"html": "".join(p + v for p, v in zip(pieces, values)) + rest}
+
+
+# ---------- Replay ----------
+
+async def _replay(snapshots: List[Snapshot], config_dir: str, states_out: Optional[Path]) -> Dict[str, Any]:
+    from homeassistant.const import EVENT_STATE_CHANGED
+    from homeassistant.core import HomeAssistant, callback
+    from homeassistant.helpers import device_registry as dr, entity, entity_registry as er
+    from homeassistant.helpers.entity_platform import EntityPlatform
+    from homeassistant.util import dt as dt_util
+
+    from custom_components.maybank_gold_silver.const import DOMAIN
+    from custom_components.maybank_gold_silver.fetcher import MaybankFetcher
+    from custom_components.maybank_gold_silver.sensor import MaybankMetalsCoordinator, _build_entities
+
+    class ReplayFetcher(MaybankFetcher):
+        """Serves the current snapshot instead of requesting the page."""
+
+        snapshot: Dict[str, Any] = {}
+
+        async def _async_fetch(self) -> Dict[str, Any]:
+            self.refresh_count += 1
+            if "html" in self.snapshot:
+                return await self._async_process_page(self.snapshot["html"], None, (None, None))
+            if self.snapshot["prices"] == self.data:
+                return self._unchanged("unchanged")
+            return self._accept_prices(self.snapshot["prices"])
+
+    clock = [snapshots[0][0].astimezone(timezone.utc)]
+    dt_util.set_default_time_zone(dt_util.get_time_zone(TIME_ZONE))
+
+    hass = HomeAssistant(config_dir)
+    out = states_out.open("w", encoding="utf-8") if states_out else None
+    writes = 0
+
+    @callback
+    def _on_state(event) -> None:
+        nonlocal writes
+        writes += 1
+        if out is not None:
+            new = event.data["new_state"]
+            # Not last_updated: the state machine stamps that from time.time()
+            out.write(json.dumps({"at": clock[0].isoformat(), "entity_id": new.entity_id, "state": new.state}) + "\n")
+
+    try:
+        # The parts of Home Assistant startup that adding entities relies on
+        entity.async_setup(hass)
+        await dr.async_load(hass)
+        await er.async_load(hass)
+        hass.bus.async_listen(EVENT_STATE_CHANGED, _on_state)
+        # The simulated clock stamps prices and history and drives the scheduler
+        fetcher = ReplayFetcher(hass, None, utcnow=lambda: clock[0])
+        # No interval: the replay loop triggers every refresh, and the
+        # fetcher's freshness window never answers with the previous snapshot
+        coordinator = MaybankMetalsCoordinator(hass, fetcher, None, holdings=HOLDINGS)
+        platform = EntityPlatform(
+            hass=hass,
+            logger=logging.getLogger(__name__),
+            domain="sensor",
+            platform_name=DOMAIN,
+            platform=None,
+            scan_interval=timedelta(minutes=30),
+            entity_namespace=None,
+        )
+        await platform.async_add_entities(_build_entities(coordinator))
+        await hass.async_block_till_done()
+        writes = 0
+        per_snapshot: List[float] = []
+        started = time.perf_counter()
+        for at, snapshot in snapshots:
+            clock[0] = at.astimezone(timezone.utc)
+            fetcher.snapshot = snapshot
+            step = time.perf_counter()
+            await coordinator.async_refresh()
+            per_snapshot.append((time.perf_counter() - step) * 1000)
+            if out is not None:
+                # Run the queued listeners while the clock is still at this snapshot
+                await hass.async_block_till_done()
+        await hass.async_block_till_done()
+        elapsed = time.perf_counter() - started
+        span = snapshots[-1][0] - snapshots[0][0]
+        stats = summarize(per_snapshot)
+        stats.update(
+            {
+                "snapshots": len(snapshots),
+                "simulated_days": round(span.total_seconds() / 86400, 1),
+                "wall_s": round(elapsed, 3),
+                "snapshots_per_s": round(len(snapshots) / elapsed, 1),
+                "state_writes": writes,
+                "suppressed_writes": coordinator.suppressed_writes,
+                "changes_seen": fetcher.scheduler.changes_seen,
+                "skipped": dict(fetcher.skip_counts),
+                "failed": fetcher.metrics["failure"],
+                "derived": dict(fetcher.derived),
+            }
+        )
+        return stats
+    finally:
+        if out is not None:
+            out.close()
+        await hass.async_stop(force=True)
+
+
+def report(stats: Dict[str, Any]) -> None:
+    print(
+        f"{stats['snapshots']} snapshots over {stats['simulated_days']} simulated days "
+        f"in {stats['wall_s']} s: {stats['snapshots_per_s']} snapshots/s"
+    )
+    print(f"per snapshot: p50 {stats['p50']:.3f} ms, p99 {stats['p99']:.3f} ms")
+    print(
+        f"state writes {stats['state_writes']}, suppressed {stats['suppressed_writes']}, "
+        f"rate changes {stats['changes_seen']}, skipped {stats['skipped']}, failed {stats['failed']}"
+    )
+    print(f"final derived values: {stats['derived']}")
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--input", type=Path, help="JSON lines of timestamped snapshots")
+    ap.add_argument("--days", type=int, default=90, help="days of synthetic history")
+    ap.add_argument("--parsed", action="store_true", help="synthesize parsed prices instead of HTML")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--states-out", type=Path, help="write every state change as JSON lines")
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--compare", action="store_true")
+    ap.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    ap.add_argument("--tolerance", type=float, default=2.0, help="allowed slowdown factor")
+    args = ap.parse_args(argv)
+
+    sys.path.insert(0, str(ROOT))
+    logging.basicConfig(level=logging.WARNING)
+    if args.input:
+        snapshots = list(read_snapshots(args.input))
+    else:
+        snapshots = list(synthetic_snapshots(args.days, args.parsed, args.seed))
+    if not snapshots:
+        raise SystemExit("no snapshots to replay")
+    with tempfile.TemporaryDirectory() as config_dir:
+        stats = asyncio.run(_replay(snapshots, config_dir, args.states_out))
+    report(stats)
+
+    case = "parsed" if args.parsed and not args.input else "html"
+    results = {case: stats}
+    if args.save_baseline:
+        args.baseline.write_text(
+            json.dumps({"days": args.days, "results": results}, indent=2, sort_keys=True) + "\n",
+            encoding="utf-8",
+        )
+        print(f"\nBaseline written to {args.baseline}")
+    if args.compare:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        failures = compare(results, baseline, args.tolerance, min_delta_ms=0.05)
+        if failures:
+            print("\nREGRESSIONS:")
+            for line in failures:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""Shared setup for the offline tests and benchmarks.
+
+The integration package imports Home Assistant from its ``__init__``, so the
+modules without Home Assistant imports are loaded straight from their files.
+Test modules load them at import time with ``load_component_module`` and end
+with ``run_tests(globals())``, so each one also runs as a plain script.
+"""
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict
+
+COMPONENT_DIR = Path(__file__).resolve().parent / "custom_components" / "maybank_gold_silver"
+
+
+def load_component_module(name: str) -> ModuleType:
+    """Import ``custom_components/maybank_gold_silver/<name>.py`` standalone, once."""
+    mod_name = f"maybank_{name}"
+    if mod_name in sys.modules:
+        return sys.modules[mod_name]
+    spec = importlib.util.spec_from_file_location(mod_name, COMPONENT_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    # Registered before running so dataclasses can resolve the module
+    sys.modules[mod_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def require(module: str, namespace: Dict[str, Any]) -> None:
+    """Skip the calling test module when ``module`` isn't installed."""
+    if importlib.util.find_spec(module) is not None:
+        return
+    if namespace.get("__name__") == "__main__":
+        print(f"skipped: {module} is not installed")
+        sys.exit(0)
+    import pytest
+
+    pytest.skip(f"{module} is not installed", allow_module_level=True)
+
+
+def run_tests(namespace: Dict[str, Any]) -> None:
+    """Run every ``test_*`` function in a module's namespace, for ``python test_x.py``."""
+    if namespace.get("__name__") != "__main__":
+        return
+    for name, func in list(namespace.items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"{name}: OK")
@@ -0,0 +1,100 @@
+"""Failure backoff with jitter and a circuit breaker for the page fetch.
+
+Kept free of Home Assistant imports so it can be exercised offline. Times
+are plain seconds from any monotonic clock the caller chooses.
+
+Every consecutive failure doubles the backoff, up to ``cap``, with half of
+it randomised so instances blocked together don't retry together. After
+``threshold`` consecutive failures the breaker opens and refuses requests
+until the backoff has passed. It then lets a single probe through
+(half-open); the probe's success closes the breaker and its failure opens
+it again for longer.
+"""
+from __future__ import annotations
+
+import random
+from typing import Any, Callable, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATES = (CLOSED, OPEN, HALF_OPEN)
+
+
+class CircuitBreaker:
+    """Consecutive-failure counter, backoff clock and open/half-open/closed state."""
+
+    def __init__(
+        self,
+        threshold: int = 3,
+        base: float = 300.0,
+        cap: float = 6 * 3600.0,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        self.threshold = threshold
+        self.base = base
+        self.cap = cap
+        self._rng = rng
+        self.state = CLOSED
+        self.failures = 0
+        # When the backoff after the last failure ends (None while healthy)
+        self.retry_at: Optional[float] = None
+        # Times the breaker went from closed to open, and requests it refused
+        self.trips = 0
+        self.refused = 0
+        self._probing = False
+
+    def backoff(self, failures: int) -> float:
+        """Delay after ``failures`` consecutive failures: half fixed, half jitter."""
+        ceiling = min(self.cap, self.base * 2 ** max(0, failures - 1))
+        return ceiling / 2 + self._rng() * ceiling / 2
+
+    def retry_in(self, now: float) -> Optional[float]:
+        """Seconds until the backoff ends, or None when no backoff applies."""
+        if self.retry_at is None:
+            return None
+        return max(0.0, self.retry_at - now)
+
+    def allow(self, now: float) -> bool:
+        """Whether a request may be made now; claims the probe when half-open."""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if self.retry_at is not None and now < self.retry_at:
+                self.refused += 1
+                return False
+            self.state = HALF_OPEN
+            self._probing = False
+        if self._probing:
+            self.refused += 1
+            return False
+        self._probing = True
+        return True
+
+    def record_success(self) -> None:
+        self.state = CLOSED
+        self.failures = 0
+        self.retry_at = None
+        self._probing = False
+
+    def record_failure(self, now: float) -> float:
+        """Count a failure and return the backoff before the next attempt."""
+        self.failures += 1
+        delay = self.backoff(self.failures)
+        self.retry_at = now + delay
+        if self.state == HALF_OPEN or self.failures >= self.threshold:
+            if self.state == CLOSED:
+                self.trips += 1
+            self.state = OPEN
+        self._probing = False
+        return delay
+
+    def as_dict(self, now: float) -> Dict[str, Any]:
+        retry_in = self.retry_in(now)
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "retry_in_s": round(retry_in, 1) if retry_in is not None else None,
+            "trips": self.trips,
+            "refused": self.refused,
+        }
@@ -1,9 +1,35 @@
 from __future__ import annotations
 
+from typing import Any
+
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import selector
 
-from .const import DOMAIN
+from .const import (
+    CONF_ADAPTIVE_POLLING,
+    CONF_DEFER_FIRST_REFRESH,
+    CONF_HOLDING_GOLD,
+    CONF_HOLDING_MIGA,
+    CONF_HOLDING_SILVER,
+    CONF_PARSE_OFFLOAD_KB,
+    CONF_QUIET_END,
+    CONF_QUIET_START,
+    CONF_REQUEST_BUDGET,
+    CONF_STATISTICS_IMPORT,
+    CONF_STREAMING,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_DEFER_FIRST_REFRESH,
+    DEFAULT_PARSE_OFFLOAD_KB,
+    DEFAULT_REQUEST_BUDGET,
+    DEFAULT_STATISTICS_IMPORT,
+    DEFAULT_STREAMING,
+    DOMAIN,
+    MAX_PARSE_OFFLOAD_KB,
+    MAX_REQUEST_BUDGET,
+    MIN_PARSE_OFFLOAD_KB,
+    MIN_REQUEST_BUDGET,
+)
 
 import voluptuous as vol
 
@@ -29,3 +55,102 @@ class MaybankGoldSilverConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     async def async_step_import(self, user_input):
         """Import from configuration.yaml (not used, but kept for completeness)."""
         return await self.async_step_user(user_input)
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry):
+        """Return the options flow handler."""
+        return MaybankGoldSilverOptionsFlow(config_entry)
+
+
+class MaybankGoldSilverOptionsFlow(config_entries.OptionsFlow):
+    """Handle options for Maybank Gold & Silver."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        self._entry = config_entry
+        self._options: dict[str, Any] = {}
+
+    async def async_step_init(self, user_input: dict[str, Any] | None = None):
+        """Manage the fetch options."""
+        if user_input is not None:
+            self._options.update(user_input)
+            return await self.async_step_holdings()
+
+        options = self._entry.options
+        schema = vol.Schema(
+            {
+                vol.Optional(
+                    CONF_STREAMING,
+                    default=options.get(CONF_STREAMING, DEFAULT_STREAMING),
+                ): bool,
+                vol.Optional(
+                    CONF_DEFER_FIRST_REFRESH,
+                    default=options.get(CONF_DEFER_FIRST_REFRESH, DEFAULT_DEFER_FIRST_REFRESH),
+                ): bool,
+                vol.Optional(
+                    CONF_ADAPTIVE_POLLING,
+                    default=options.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING),
+                ): bool,
+                vol.Optional(
+                    CONF_QUIET_START,
+                    description={"suggested_value": options.get(CONF_QUIET_START)},
+                ): selector.TimeSelector(),
+                vol.Optional(
+                    CONF_QUIET_END,
+                    description={"suggested_value": options.get(CONF_QUIET_END)},
+                ): selector.TimeSelector(),
+                vol.Optional(
+                    CONF_STATISTICS_IMPORT,
+                    default=options.get(CONF_STATISTICS_IMPORT, DEFAULT_STATISTICS_IMPORT),
+                ): bool,
+                vol.Optional(
+                    CONF_REQUEST_BUDGET,
+                    default=options.get(CONF_REQUEST_BUDGET, DEFAULT_REQUEST_BUDGET),
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=MIN_REQUEST_BUDGET,
+                        max=MAX_REQUEST_BUDGET,
+                        step=1,
+                        mode=selector.NumberSelectorMode.BOX,
+                        unit_of_measurement="s",
+                    )
+                ),
+                vol.Optional(
+                    CONF_PARSE_OFFLOAD_KB,
+                    default=options.get(CONF_PARSE_OFFLOAD_KB, DEFAULT_PARSE_OFFLOAD_KB),
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=MIN_PARSE_OFFLOAD_KB,
+                        max=MAX_PARSE_OFFLOAD_KB,
+                        step=1,
+                        mode=selector.NumberSelectorMode.BOX,
+                        unit_of_measurement="KB",
+                    )
+                ),
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=schema)
+
+    async def async_step_holdings(self, user_input: dict[str, Any] | None = None):
+        """Manage the gram holdings that are valued against each price update."""
+        if user_input is not None:
+            self._options.update(user_input)
+            return self.async_create_entry(title="", data=self._options)
+
+        options = self._entry.options
+        grams = selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0,
+                step=0.01,
+                mode=selector.NumberSelectorMode.BOX,
+                unit_of_measurement="g",
+            )
+        )
+        schema = vol.Schema(
+            {
+                vol.Optional(CONF_HOLDING_GOLD, default=options.get(CONF_HOLDING_GOLD, 0)): grams,
+                vol.Optional(CONF_HOLDING_SILVER, default=options.get(CONF_HOLDING_SILVER, 0)): grams,
+                vol.Optional(CONF_HOLDING_MIGA, default=options.get(CONF_HOLDING_MIGA, 0)): grams,
+            }
+        )
+        return self.async_show_form(step_id="holdings", data_schema=schema)
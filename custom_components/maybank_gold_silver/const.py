@@ -79,3 +79,121 @@ SENSOR_TYPES = {
         "device": "regular",
     },
 }
+
+# Sensors computed from the parsed prices (see derived.py)
+DERIVED_SENSOR_TYPES = {
+    "miga_3_spread_100g_plus": {
+        "name": "5. Spread 100g+",
+        "icon": "mdi:arrow-expand-horizontal",
+        "unit": "MYR/g",
+        "device": "miga",
+    },
+    "miga_4_spread_below_100g": {
+        "name": "6. Spread <100g",
+        "icon": "mdi:arrow-expand-horizontal",
+        "unit": "MYR/g",
+        "device": "miga",
+    },
+    "miga_5_tier_premium_buy": {
+        "name": "7. <100g Buy Premium",
+        "icon": "mdi:scale-unbalanced",
+        "unit": "MYR/g",
+        "device": "miga",
+    },
+    "miga_6_tier_premium_sell": {
+        "name": "8. <100g Sell Discount",
+        "icon": "mdi:scale-unbalanced",
+        "unit": "MYR/g",
+        "device": "miga",
+    },
+    "gold_spread": {
+        "name": "Gold Spread",
+        "icon": "mdi:arrow-expand-horizontal",
+        "unit": "MYR/g",
+        "device": "regular",
+    },
+    "silver_spread": {
+        "name": "Silver Spread",
+        "icon": "mdi:arrow-expand-horizontal",
+        "unit": "MYR/g",
+        "device": "regular",
+    },
+    "gold_silver_ratio": {
+        "name": "Gold/Silver Ratio",
+        "icon": "mdi:scale-balance",
+        "unit": None,
+        "device": "regular",
+    },
+}
+
+CONF_STREAMING = "streaming"
+# Read the page in chunks and stop once all rate tables are parsed
+DEFAULT_STREAMING = True
+
+# Last successfully parsed prices, restored on startup
+STORAGE_KEY = f"{DOMAIN}.snapshot"
+STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 10  # seconds
+
+CONF_DEFER_FIRST_REFRESH = "defer_first_refresh"
+# Wait for Home Assistant to finish starting before the first fetch
+DEFAULT_DEFER_FIRST_REFRESH = False
+
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+CONF_QUIET_START = "quiet_start"
+CONF_QUIET_END = "quiet_end"
+# Learn when Maybank publishes new rates and poll around those times
+DEFAULT_ADAPTIVE_POLLING = True
+
+# Gram holdings per account, valued against every new set of prices
+CONF_HOLDING_GOLD = "holding_gold"
+CONF_HOLDING_SILVER = "holding_silver"
+CONF_HOLDING_MIGA = "holding_miga"
+# Account -> option holding its grams
+HOLDING_OPTIONS = {
+    "gold": CONF_HOLDING_GOLD,
+    "silver": CONF_HOLDING_SILVER,
+    "miga": CONF_HOLDING_MIGA,
+}
+
+# Buy/sell transactions recorded with the record_transaction service
+LEDGER_STORAGE_KEY = f"{DOMAIN}.ledger"
+LEDGER_SAVE_DELAY = 5  # seconds
+# Dispatched with the account name when its first transaction is recorded
+SIGNAL_LEDGER_ACCOUNT_ADDED = f"{DOMAIN}_ledger_account_added"
+
+CONF_STATISTICS_IMPORT = "statistics_import"
+# Publish hourly mean/min/max as external statistics instead of letting the
+# recorder compile them from price sensor states
+DEFAULT_STATISTICS_IMPORT = False
+
+CONF_REQUEST_BUDGET = "request_budget"
+# Seconds a refresh may take from the first connect to the last byte,
+# shared by the first attempt and any retry
+DEFAULT_REQUEST_BUDGET = 30
+MIN_REQUEST_BUDGET = 5
+MAX_REQUEST_BUDGET = 120
+# Largest share of the budget the connect and first-byte phases may use;
+# the body read gets whatever is left before the deadline
+CONNECT_BUDGET_SHARE = 0.25
+FIRST_BYTE_BUDGET_SHARE = 0.5
+
+CONF_PARSE_OFFLOAD_KB = "parse_offload_kb"
+# Pages at least this large (in KB of text) are parsed in the executor
+# instead of on the event loop; the live page is about 15 KB
+DEFAULT_PARSE_OFFLOAD_KB = 256
+MIN_PARSE_OFFLOAD_KB = 0
+MAX_PARSE_OFFLOAD_KB = 10240
+
+# Fetch/parse metrics published as diagnostic sensors (disabled by default)
+DIAGNOSTIC_SENSOR_TYPES = {
+    "connect_ms": {"name": "Connect Time", "icon": "mdi:lan-connect", "unit": "ms"},
+    "first_byte_ms": {"name": "Time to First Byte", "icon": "mdi:timer-sand", "unit": "ms"},
+    "body_ms": {"name": "Body Download Time", "icon": "mdi:download", "unit": "ms"},
+    "bytes": {"name": "Bytes Downloaded", "icon": "mdi:file-download", "unit": "B"},
+    "parse_ms": {"name": "Parse Duration", "icon": "mdi:code-tags", "unit": "ms"},
+    "strategy": {"name": "Parse Strategy", "icon": "mdi:format-list-checks"},
+    "loop_ms_saved": {"name": "Event Loop Time Saved", "icon": "mdi:timer-off", "unit": "ms", "counter": True},
+    "success": {"name": "Successful Fetches", "icon": "mdi:check-circle", "counter": True},
+    "failure": {"name": "Failed Fetches", "icon": "mdi:alert-circle", "counter": True},
+}
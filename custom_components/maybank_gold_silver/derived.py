@@ -0,0 +1,50 @@
+"""Values derived from the parsed prices: spreads, MIGA-i tier premiums and the gold/silver ratio.
+
+Kept free of Home Assistant imports so it can be exercised offline. The
+keys match ``DERIVED_SENSOR_TYPES`` in const.py.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+
+def _price(prices: Mapping[str, Any], metal: str, field: str) -> Optional[float]:
+    try:
+        return float(prices[metal][field])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _diff(prices: Mapping[str, Any], a: Tuple[str, str], b: Tuple[str, str]) -> Optional[float]:
+    left, right = _price(prices, *a), _price(prices, *b)
+    if left is None or right is None:
+        return None
+    return round(left - right, 2)
+
+
+def _mid(prices: Mapping[str, Any], metal: str) -> Optional[float]:
+    buy, sell = _price(prices, metal, "buy"), _price(prices, metal, "sell")
+    if buy is None or sell is None:
+        return None
+    return (buy + sell) / 2
+
+
+def compute_derived(prices: Optional[Mapping[str, Any]]) -> Dict[str, Optional[float]]:
+    """Compute every derived value; a value is None when an input is missing.
+
+    Spreads are buy minus sell. The MIGA-i buy premium is how much more a
+    gram costs below 100g, and the sell discount how much less a gram
+    fetches. The gold/silver ratio uses mid prices.
+    """
+    prices = prices or {}
+    gold_mid, silver_mid = _mid(prices, "gold"), _mid(prices, "silver")
+    ratio = round(gold_mid / silver_mid, 2) if gold_mid and silver_mid else None
+    return {
+        "miga_3_spread_100g_plus": _diff(prices, ("miga_100g", "buy"), ("miga_100g", "sell")),
+        "miga_4_spread_below_100g": _diff(prices, ("miga_below100g", "buy"), ("miga_below100g", "sell")),
+        "miga_5_tier_premium_buy": _diff(prices, ("miga_below100g", "buy"), ("miga_100g", "buy")),
+        "miga_6_tier_premium_sell": _diff(prices, ("miga_100g", "sell"), ("miga_below100g", "sell")),
+        "gold_spread": _diff(prices, ("gold", "buy"), ("gold", "sell")),
+        "silver_spread": _diff(prices, ("silver", "buy"), ("silver", "sell")),
+        "gold_silver_ratio": ratio,
+    }
@@ -0,0 +1,74 @@
+"""Diagnostics support for Maybank Gold & Silver."""
+from __future__ import annotations
+
+import json
+import time
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .sensor import PRICE_UNRECORDED_ATTRIBUTES
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return fetch and refresh statistics for a config entry."""
+    coordinator = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if coordinator is None:
+        return {"options": dict(entry.options), "coordinator": None}
+    fetcher = coordinator.fetcher
+    return {
+        "options": dict(entry.options),
+        "last_update_success": coordinator.last_update_success,
+        "last_error": hass.data[DOMAIN].get("last_error"),
+        "data": coordinator.data,
+        "fetch": fetcher.fetch_stats,
+        "metrics": dict(fetcher.metrics),
+        "strategies": {
+            "last": fetcher.last_strategy,
+            "wins": dict(fetcher.strategy_wins),
+        },
+        "table_window": dict(fetcher.window_counts),
+        "parse_offload": {
+            "threshold_bytes": fetcher.offload_threshold,
+            **fetcher.offload_counts,
+            "loop_ms_saved": fetcher.metrics["loop_ms_saved"],
+        },
+        "breaker": fetcher.breaker.as_dict(time.monotonic()),
+        "startup": coordinator.startup_stats,
+        "schedule": _schedule(coordinator),
+        "refreshes": {
+            "total": fetcher.refresh_count,
+            "skipped": dict(fetcher.skip_counts),
+            "skip_rate": round(fetcher.skip_rate, 3),
+            "coalesced": dict(fetcher.coalesced),
+            "subscribers": fetcher.subscriber_count,
+        },
+        "entity_writes": {"suppressed": coordinator.suppressed_writes},
+        "attribute_bytes": _attribute_bytes(coordinator),
+    }
+
+
+def _schedule(coordinator) -> dict[str, Any] | None:
+    if not coordinator.adaptive:
+        return None
+    scheduler = coordinator.fetcher.scheduler
+    return {
+        "update_interval": str(coordinator.update_interval),
+        "changes_seen": scheduler.changes_seen,
+        "last_change": scheduler.last_change.isoformat() if scheduler.last_change else None,
+        "weekday_windows": scheduler.windows("weekday"),
+        "weekend_windows": scheduler.windows("weekend"),
+    }
+
+
+def _attribute_bytes(coordinator) -> dict[str, int]:
+    """JSON size of one price sensor's attributes, and what the recorder keeps of it."""
+    attrs = coordinator.price_attributes("gold", "buy")
+    recorded = {key: value for key, value in attrs.items() if key not in PRICE_UNRECORDED_ATTRIBUTES}
+    full = len(json.dumps(dict(attrs), default=str))
+    kept = len(json.dumps(recorded, default=str))
+    return {"full": full, "recorded": kept, "saved_per_row": full - kept}
@@ -0,0 +1,800 @@
+"""Process-wide fetcher for the Maybank rates page.
+
+Every coordinator (config entries and the deprecated YAML platform) fetches
+through the one ``MaybankFetcher`` kept in ``hass.data[DOMAIN]["fetcher"]``.
+Concurrent refreshes share a single in-flight request and new prices are
+pushed to all subscribed coordinators, so the page is scraped once no
+matter how many coordinators exist.
+"""
+from __future__ import annotations
+
+import asyncio
+import codecs
+import logging
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from aiohttp import ClientError, ClientSSLError, ClientTimeout, TraceConfig
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONNECT_BUDGET_SHARE,
+    DEFAULT_PARSE_OFFLOAD_KB,
+    DEFAULT_REQUEST_BUDGET,
+    DEFAULT_SCAN_INTERVAL_MINUTES,
+    DEFAULT_STATISTICS_IMPORT,
+    DEFAULT_STREAMING,
+    DOMAIN,
+    FIRST_BYTE_BUDGET_SHARE,
+    SNAPSHOT_SAVE_DELAY,
+    SOURCE_URL,
+    STORAGE_KEY,
+    STORAGE_VERSION,
+    USER_AGENT,
+)
+from .breaker import CLOSED, CircuitBreaker
+from .derived import compute_derived
+from .history import PriceHistory
+from .parser import (
+    TableExtractor,
+    TableHint,
+    extract_tables,
+    extract_window,
+    has_required_tables,
+    ParseResult,
+    locate_window,
+    make_hint,
+    order_strategies,
+    parse_tables,
+    rate_digest,
+)
+from .scheduler import PollScheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@callback
+def async_get_fetcher(hass: HomeAssistant) -> MaybankFetcher:
+    """Return the shared fetcher, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    fetcher = domain_data.get("fetcher")
+    if fetcher is None:
+        # A session of our own so request phases can be traced
+        session = async_create_clientsession(hass, trace_configs=[_trace_config()])
+        fetcher = domain_data["fetcher"] = MaybankFetcher(hass, session)
+    return fetcher
+
+
+def _trace_config() -> TraceConfig:
+    """Record connection and response-header times into the request's timings dict."""
+
+    def _mark(name: str):
+        async def _on_event(session, context, params) -> None:
+            timings = context.trace_request_ctx
+            if isinstance(timings, dict):
+                timings[name] = time.monotonic()
+
+        return _on_event
+
+    trace = TraceConfig()
+    trace.on_connection_create_start.append(_mark("connect_start"))
+    trace.on_connection_create_end.append(_mark("connect_end"))
+    trace.on_request_end.append(_mark("headers"))
+    return trace
+
+
+class MaybankFetcher:
+    """Single-flight fetch and parse of the rates page, shared by all coordinators."""
+
+    def __init__(
+        self, hass: HomeAssistant, session, utcnow: Callable[[], datetime] = dt_util.utcnow
+    ) -> None:
+        self.hass = hass
+        self._session = session
+        # Wall clock for price timestamps, history and the learned schedule;
+        # replays pass a simulated one
+        self.utcnow = utcnow
+        self.streaming = DEFAULT_STREAMING
+        # Seconds one refresh may take, retries included
+        self.request_budget: float = DEFAULT_REQUEST_BUDGET
+        # Pages of at least this many characters are parsed in the executor
+        self.offload_threshold: int = DEFAULT_PARSE_OFFLOAD_KB * 1024
+        self.offload_counts: Dict[str, int] = {"inline": 0, "executor": 0}
+        # Publish hourly external statistics from the price history
+        self.import_statistics = DEFAULT_STATISTICS_IMPORT
+        self._statistics_until: Optional[float] = None
+        # Backs off after failed requests and stops them while the site is failing
+        self.breaker = CircuitBreaker()
+        # Learns publication windows from every observed change; coordinators
+        # with adaptive polling enabled take their interval from it
+        self.scheduler = PollScheduler(timedelta(minutes=DEFAULT_SCAN_INTERVAL_MINUTES))
+        self.data: Optional[Dict[str, Any]] = None
+        # Rolling min/max/mean per metal and field, fed with every price change
+        self.history = PriceHistory()
+        # Spreads, tier premiums and ratio, computed once per new set of prices
+        self.derived: Dict[str, Optional[float]] = {}
+        # Details of the last successful download (bytes, timing, charset)
+        self.fetch_stats: Dict[str, Any] = {}
+        # Validators and table digest from the last successfully parsed page
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._digest: Optional[str] = None
+        # Where the rate tables were in that page, so the next parse can
+        # read just that window
+        self._hint: Optional[TableHint] = None
+        self.window_counts: Dict[str, int] = {"hit": 0, "miss": 0}
+        # Which parse strategy found the prices last, and how often each has
+        self.last_strategy: Optional[str] = None
+        self.strategy_wins: Dict[str, int] = {}
+        # Latest latency phases, size, parse time and strategy, plus outcome counts
+        self.metrics: Dict[str, Any] = {"success": 0, "failure": 0, "loop_ms_saved": 0.0}
+        self._metrics_listeners: list[Callable[[], None]] = []
+        self.refresh_count = 0
+        self.skip_counts: Dict[str, int] = {"not_modified": 0, "unchanged": 0}
+        # Refreshes answered without a request of their own
+        self.coalesced: Dict[str, int] = {"in_flight": 0, "fresh": 0}
+        self._store: Store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._load_task: Optional[asyncio.Task] = None
+        # When the current prices were parsed, and whether they came from storage
+        self.prices_as_of: Optional[datetime] = None
+        self.restored = False
+        self._fetched_at: Optional[float] = None
+        self._inflight: Optional[asyncio.Task] = None
+        self._subscribers: list[DataUpdateCoordinator] = []
+        self._waiting: set[DataUpdateCoordinator] = set()
+
+    # ---------- Subscribers ----------
+
+    @callback
+    def async_subscribe(self, coordinator: DataUpdateCoordinator) -> Callable[[], None]:
+        """Push new prices to ``coordinator``; returns a function that unsubscribes."""
+        self._subscribers.append(coordinator)
+        if coordinator.data is None and self.data is not None:
+            coordinator.data = self.data
+
+        @callback
+        def _unsubscribe() -> None:
+            if coordinator in self._subscribers:
+                self._subscribers.remove(coordinator)
+
+        return _unsubscribe
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    @callback
+    def _publish(self, data: Dict[str, Any]) -> None:
+        """Hand new prices to subscribers that did not ask for them."""
+        for coordinator in list(self._subscribers):
+            if coordinator not in self._waiting:
+                coordinator.async_set_updated_data(data)
+
+    # ---------- Snapshot ----------
+
+    async def async_load_snapshot(self) -> None:
+        """Restore the prices saved by a previous run (only loaded once)."""
+        if self._load_task is None:
+            self._load_task = self.hass.async_create_task(self._async_load())
+        await self._load_task
+
+    async def _async_load(self) -> None:
+        try:
+            stored = await self._store.async_load()
+        except Exception as err:  # corrupt storage must never block setup
+            _LOGGER.warning("Maybank metals: could not load saved prices: %s", err)
+            return
+        if not stored or not stored.get("prices") or self.data is not None:
+            return
+        self.data = stored["prices"]
+        self.derived = compute_derived(self.data)
+        self.prices_as_of = dt_util.parse_datetime(stored.get("saved_at") or "")
+        self.restored = True
+        self._etag = stored.get("etag")
+        self._last_modified = stored.get("last_modified")
+        self._digest = stored.get("digest")
+        self._hint = TableHint.from_dict(stored.get("hint"))
+        self.scheduler.restore(stored.get("schedule"))
+        self.history.restore(stored.get("history"))
+        self._statistics_until = stored.get("statistics_until")
+        strategies = stored.get("strategies") or {}
+        self.last_strategy = strategies.get("last")
+        self.strategy_wins = dict(strategies.get("wins") or {})
+        _LOGGER.debug("Maybank metals: restored prices saved at %s", self.prices_as_of)
+
+    @callback
+    def _snapshot(self) -> Dict[str, Any]:
+        return {
+            "prices": self.data,
+            "saved_at": self.prices_as_of.isoformat() if self.prices_as_of else None,
+            "etag": self._etag,
+            "last_modified": self._last_modified,
+            "digest": self._digest,
+            "hint": self._hint.as_dict() if self._hint else None,
+            "schedule": self.scheduler.as_dict(),
+            "history": self.history.as_dict(),
+            "statistics_until": self._statistics_until,
+            "strategies": {"last": self.last_strategy, "wins": self.strategy_wins},
+        }
+
+    # ---------- Fetching ----------
+
+    @property
+    def skip_rate(self) -> float:
+        """Fraction of refreshes that skipped parsing because nothing changed."""
+        if not self.refresh_count:
+            return 0.0
+        return sum(self.skip_counts.values()) / self.refresh_count
+
+    async def async_fetch(self, requester: DataUpdateCoordinator | None = None) -> Dict[str, Any]:
+        """Return current prices, joining a request already in flight.
+
+        Prices fetched less than half of the requester's update interval ago
+        are returned as they are, so coordinators polling on different
+        timers don't each hit the page. That only applies while the last
+        attempt succeeded; the interval is stretched by the failure backoff
+        and would otherwise answer retries from the cache.
+        """
+        interval = getattr(requester, "update_interval", None)
+        if (
+            self.data is not None
+            and not self.breaker.failures
+            and self._fetched_at is not None
+            and interval is not None
+            and time.monotonic() - self._fetched_at < interval.total_seconds() / 2
+        ):
+            self.coalesced["fresh"] += 1
+            return self.data
+        task = self._inflight
+        if task is None and not self.breaker.allow(time.monotonic()):
+            raise UpdateFailed(
+                f"Circuit breaker {self.breaker.state} after {self.breaker.failures} failures; "
+                f"next attempt in {self.breaker.retry_in(time.monotonic()) or 0:.0f} s"
+            )
+        if requester is not None:
+            self._waiting.add(requester)
+        if task is None:
+            task = self._inflight = self.hass.async_create_task(
+                self._async_fetch_and_publish(), f"{DOMAIN} fetch"
+            )
+        else:
+            self.coalesced["in_flight"] += 1
+        try:
+            # Shielded so one coordinator shutting down can't cancel the
+            # request the others are waiting on
+            return await asyncio.shield(task)
+        finally:
+            self._waiting.discard(requester)
+
+    @property
+    def next_attempt(self) -> Optional[datetime]:
+        """When the failure backoff ends, or None while requests are healthy."""
+        retry_in = self.breaker.retry_in(time.monotonic())
+        if retry_in is None:
+            return None
+        return self.utcnow() + timedelta(seconds=retry_in)
+
+    @callback
+    def async_add_metrics_listener(self, update_callback: Callable[[], None]) -> Callable[[], None]:
+        """Call ``update_callback`` after every request; returns a function that removes it."""
+        self._metrics_listeners.append(update_callback)
+
+        @callback
+        def _remove() -> None:
+            if update_callback in self._metrics_listeners:
+                self._metrics_listeners.remove(update_callback)
+
+        return _remove
+
+    def _record_latency(self, timings: Dict[str, float], started: float, received: int = 0) -> None:
+        """Split the request time into connect, first byte and body phases."""
+        done = time.monotonic()
+        connect = timings.get("connect_end", started) - timings.get("connect_start", started)
+        headers_at = timings.get("headers", done)
+        self.metrics["connect_ms"] = round(connect * 1000, 1)
+        self.metrics["first_byte_ms"] = round((headers_at - started - connect) * 1000, 1)
+        self.metrics["body_ms"] = round((done - headers_at) * 1000, 1)
+        self.metrics["bytes"] = received
+
+    async def _async_fetch_and_publish(self) -> Dict[str, Any]:
+        previous = self.data
+        try:
+            data = await self._async_fetch()
+        except Exception:
+            self.metrics["failure"] += 1
+            delay = self.breaker.record_failure(time.monotonic())
+            _LOGGER.debug(
+                "Maybank metals: failure %d, circuit %s, backing off %.0f s",
+                self.breaker.failures,
+                self.breaker.state,
+                delay,
+            )
+            raise
+        else:
+            if self.breaker.state != CLOSED:
+                _LOGGER.info("Maybank metals: fetch recovered, closing the circuit breaker")
+            self.breaker.record_success()
+            self.metrics["success"] += 1
+        finally:
+            self._inflight = None
+            for update_callback in list(self._metrics_listeners):
+                update_callback()
+        self._fetched_at = time.monotonic()
+        if data is not previous:
+            self._publish(data)
+        if self.import_statistics:
+            self._async_import_statistics()
+        return data
+
+    @callback
+    def _async_import_statistics(self) -> None:
+        """Publish the hours completed since the last import (all history the first time)."""
+        from .long_term_statistics import async_import_hourly
+
+        until = async_import_hourly(
+            self.hass, self.history, self._statistics_until, self.utcnow().timestamp()
+        )
+        if until != self._statistics_until:
+            self._statistics_until = until
+            self._store.async_delay_save(self._snapshot, SNAPSHOT_SAVE_DELAY)
+
+    def _unchanged(self, reason: str) -> Dict[str, Any]:
+        """Count a skipped refresh and hand back the current data untouched."""
+        self.skip_counts[reason] += 1
+        self.hass.data.setdefault(DOMAIN, {})["last_error"] = None
+        if self.restored:
+            # The saved prices are confirmed live; refresh the snapshot
+            # attributes. Coordinators waiting on this fetch are notified
+            # once it returns
+            self.restored = False
+            for coordinator in self._subscribers:
+                if coordinator not in self._waiting:
+                    coordinator.async_update_listeners()
+        _LOGGER.debug(
+            "Maybank metals: page %s, skipping parse (skip rate %.0f%%)",
+            reason.replace("_", " "),
+            self.skip_rate * 100,
+        )
+        return self.data
+
+    async def _read_body(self, resp, started: float) -> tuple[str, Optional[list]]:
+        """Read the response body, returning the HTML and any tables parsed on the way.
+
+        In streaming mode the body is decoded and tokenized chunk by chunk,
+        and the connection is closed as soon as the investment account and
+        MIGA-i tables are complete. Otherwise the whole page is read and
+        decoded by aiohttp, and tables are left for the parser (``None``).
+        Either way ``bytes`` counts the body as received, after any gzip or
+        brotli decoding, not the decoded text.
+
+        With a table hint, streamed text is only buffered until the hinted
+        window can be located, and tokenizing starts there.
+
+        ``offload`` in the stats says whether the page is large enough to be
+        parsed in the executor. It is decided from ``Content-Length`` before
+        the first chunk when the server sends one, else from the bytes
+        received so far. Once set, streaming stops tokenizing, drops any
+        tables found so far and only buffers the rest of the page, so no
+        tokenizing of a large page happens on the event loop.
+        """
+        if not self.streaming:
+            body = await resp.read()
+            # Decodes the body read above, as aiohttp keeps it
+            html = await resp.text()
+            self.fetch_stats = {
+                "mode": "full",
+                "bytes": len(body),
+                "content_length": resp.content_length,
+                "early_exit": False,
+                "offload": len(body) >= self.offload_threshold,
+                "time_to_last_byte_ms": round((time.monotonic() - started) * 1000, 1),
+                "charset": resp.get_encoding(),
+                "decode_path": "aiohttp",
+            }
+            return html, None
+
+        charset, decode_path = resp.charset, "header"
+        decoder = None
+        extractor = TableExtractor()
+        hint = self._hint
+        window: Optional[tuple] = None
+        parts: list[str] = []
+        received = 0
+        decoded = 0
+        seen_tables = 0
+        early_exit = False
+        # Content-Length is the encoded size, so a gzipped page may only
+        # cross the threshold once decoded, which the loop below catches
+        offload = (resp.content_length or 0) >= self.offload_threshold
+        async for chunk in resp.content.iter_chunked(_STREAM_CHUNK_SIZE):
+            received += len(chunk)
+            if decoder is None:
+                if not charset:
+                    charset, decode_path = _sniff_charset(chunk)
+                try:
+                    decoder = codecs.getincrementaldecoder(charset)(errors="replace")
+                except LookupError:
+                    charset, decode_path = "utf-8", "fallback"
+                    decoder = codecs.getincrementaldecoder(charset)(errors="replace")
+            text = decoder.decode(chunk)
+            parts.append(text)
+            decoded += len(text)
+            if not offload and received >= self.offload_threshold:
+                offload = True
+            if offload:
+                # The executor extracts the tables from the whole page
+                continue
+            if hint is not None:
+                if decoded < hint.search_end:
+                    continue
+                extractor, window = self._start_window("".join(parts), hint)
+                hint = None
+            else:
+                extractor.feed(text)
+            if len(extractor.tables) != seen_tables:
+                seen_tables = len(extractor.tables)
+                if has_required_tables(extractor.tables):
+                    early_exit = True
+                    break
+        elapsed = time.monotonic() - started
+        if early_exit:
+            # Drop the rest of the page instead of draining it
+            resp.close()
+        elif decoder is not None:
+            tail = decoder.decode(b"", final=True)
+            parts.append(tail)
+            if not offload and hint is not None:
+                # The page ended before the hinted window could be located
+                extractor, window = self._start_window("".join(parts), hint)
+            elif not offload:
+                extractor.feed(tail)
+        tables = None if offload else extractor.close()
+        if offload or (window is not None and not has_required_tables(tables)):
+            # Too large to tokenize here, or the tables moved outside the
+            # window; leave a full parse to the caller
+            window, tables = None, None
+        self.fetch_stats = {
+            "mode": "streaming",
+            "bytes": received,
+            "content_length": resp.content_length,
+            "early_exit": early_exit,
+            "offload": offload,
+            "time_to_last_byte_ms": round(elapsed * 1000, 1),
+            "charset": charset,
+            "decode_path": decode_path,
+        }
+        if self._hint is not None and not offload:
+            # Offloaded pages try the window in the executor, and count it there
+            self._count_window(window is not None)
+        _LOGGER.debug("Maybank metals: download stats %s", self.fetch_stats)
+        return "".join(parts), tables
+
+    @staticmethod
+    def _start_window(text: str, hint: TableHint) -> tuple[TableExtractor, Optional[tuple]]:
+        """Return an extractor fed from the hinted window, or from the top if it is lost."""
+        window = locate_window(text, hint)
+        extractor = TableExtractor(window[0] if window else 0)
+        extractor.feed(text[window[0]:] if window else text)
+        return extractor, window
+
+    def _count_window(self, hit: bool) -> None:
+        self.window_counts["hit" if hit else "miss"] += 1
+        self.fetch_stats["window"] = "hit" if hit else "miss"
+
+    def _timeout(self, deadline: float) -> ClientTimeout:
+        """Per-phase timeouts for an attempt that must finish by ``deadline``.
+
+        Connect and time to first byte are each capped at a share of the
+        budget (``sock_read`` also bounds stalls while the body downloads),
+        and ``total`` holds the whole attempt to the time left.
+        """
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise UpdateFailed(f"Request budget of {self.request_budget:g} s used up")
+        return ClientTimeout(
+            total=remaining,
+            connect=min(remaining, self.request_budget * CONNECT_BUDGET_SHARE),
+            sock_read=min(remaining, self.request_budget * FIRST_BYTE_BUDGET_SHARE),
+        )
+
+    async def _async_fetch(self) -> Dict[str, Any]:
+        """Fetch data from Maybank with proper error handling."""
+        _LOGGER.debug("Maybank metals: starting fetch from source")
+        headers = {
+            "User-Agent": USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+            "Accept-Language": "en-MY,en;q=0.9",
+            "Accept-Encoding": "gzip, deflate, br",
+            "Cache-Control": "no-cache",
+            "Pragma": "no-cache",
+            "Connection": "keep-alive",
+            "Upgrade-Insecure-Requests": "1",
+            "Referer": SOURCE_URL,
+            "Origin": "https://www.maybank2u.com.my",
+            # Browser client hints and fetch metadata to better mimic a real browser
+            "Sec-Fetch-Dest": "document",
+            "Sec-Fetch-Mode": "navigate",
+            "Sec-Fetch-Site": "same-origin",
+            "Sec-Fetch-User": "?1",
+            "sec-ch-ua": '"Chromium";v="124", "Google Chrome";v="124", ";Not A Brand";v="99"',
+            "sec-ch-ua-mobile": "?0",
+            "sec-ch-ua-platform": '"Windows"',
+        }
+        # Conditional GET: only possible once we hold data to fall back on
+        if self.data:
+            if self._etag:
+                headers["If-None-Match"] = self._etag
+            if self._last_modified:
+                headers["If-Modified-Since"] = self._last_modified
+        self.refresh_count += 1
+
+        started = time.monotonic()
+        deadline = started + self.request_budget
+        timings: Dict[str, float] = {}
+        tables = None
+        try:
+            async with self._session.get(
+                SOURCE_URL,
+                headers=headers,
+                timeout=self._timeout(deadline),
+                allow_redirects=True,
+                trace_request_ctx=timings,
+            ) as resp:
+                if resp.status == 304 and self.data:
+                    self._record_latency(timings, started)
+                    return self._unchanged("not_modified")
+                if resp.status != 200:
+                    _LOGGER.error("Maybank metals: HTTP status %s", resp.status)
+                    raise UpdateFailed(f"HTTP {resp.status}")
+                # Enforce that the final URL is still the Maybank page we were told to use
+                final_url = resp.url
+                final_host = getattr(final_url, "host", "")
+                final_path = getattr(final_url, "path", "")
+                # Allow any subdomain of maybank2u.com.my (e.g., www, origin variations) and flexible path
+                if not final_host.endswith("maybank2u.com.my") or "gold_and_silver" not in final_path:
+                    raise UpdateFailed(
+                        f"Unexpected redirect to {final_url}; refusing to parse as per user requirement"
+                    )
+                _LOGGER.debug("Maybank metals: fetching from %s (status %s)", final_url, resp.status)
+                validators = (resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+                html, tables = await self._read_body(resp, started)
+                self._record_latency(timings, started, self.fetch_stats["bytes"])
+                _LOGGER.debug("Maybank metals: fetched %d chars of HTML", len(html))
+        except UpdateFailed:
+            # Re-raise UpdateFailed as-is
+            raise
+        except (asyncio.TimeoutError, ClientError) as err:
+            if not isinstance(err, ClientSSLError):
+                # Timeouts, refused connections and resets are left to the
+                # backoff; retrying them at once only adds to the load
+                reason = _error_reason(err, timings)
+                self.hass.data.setdefault(DOMAIN, {})["last_error"] = f"request_error: {reason}"
+                _LOGGER.error("Maybank metals: request error: %s", reason)
+                raise UpdateFailed(f"Request error: {reason}") from err
+            # Retry once with SSL verification disabled, only for the strict Maybank host
+            _LOGGER.info("Maybank metals: request error on first attempt: %s, retrying with SSL disabled", err)
+            self.hass.data.setdefault(DOMAIN, {})["last_error"] = f"request_error: {err}"
+            started = time.monotonic()
+            timings = {}
+            try:
+                async with self._session.get(
+                    SOURCE_URL,
+                    headers=headers,
+                    timeout=self._timeout(deadline),
+                    allow_redirects=True,
+                    ssl=False,
+                    trace_request_ctx=timings,
+                ) as resp:
+                    if resp.status == 304 and self.data:
+                        self._record_latency(timings, started)
+                        return self._unchanged("not_modified")
+                    if resp.status != 200:
+                        _LOGGER.error("Maybank metals: HTTP status (ssl=False) %s", resp.status)
+                        raise UpdateFailed(f"HTTP {resp.status}")
+                    final_url = resp.url
+                    final_host = getattr(final_url, "host", "")
+                    final_path = getattr(final_url, "path", "")
+                    if not final_host.endswith("maybank2u.com.my") or "gold_and_silver" not in final_path:
+                        raise UpdateFailed(
+                            f"Unexpected redirect to {final_url} (ssl=False); refusing to parse as per user requirement"
+                        )
+                    _LOGGER.debug("Maybank metals: retry (ssl=False) from %s (status %s)", final_url, resp.status)
+                    validators = (resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+                    html, tables = await self._read_body(resp, started)
+                    self._record_latency(timings, started, self.fetch_stats["bytes"])
+                    _LOGGER.debug("Maybank metals: fetched %d chars of HTML (ssl=False)", len(html))
+            except Exception as err2:  # any failure in retry
+                reason = _error_reason(err2, timings)
+                msg = f"request_error_retry: {reason}"
+                self.hass.data.setdefault(DOMAIN, {})["last_error"] = msg
+                _LOGGER.error("Maybank metals: request error on retry: %s", reason)
+                raise UpdateFailed(f"Request error: {reason}") from err2
+        except Exception as err:
+            # Catch-all to prevent any unhandled exception from crashing HA
+            msg = f"Unexpected error: {type(err).__name__}: {err}"
+            self.hass.data.setdefault(DOMAIN, {})["last_error"] = msg
+            _LOGGER.error("Maybank metals: %s", msg)
+            raise UpdateFailed(msg) from err
+        return await self._async_process_page(html, tables, validators)
+
+    def _parse_args(self, html: str, tables: Optional[list]) -> tuple:
+        """Arguments for ``_parse_page``, taken on the event loop."""
+        # Only try the window if streaming didn't already
+        hint = self._hint if tables is None and self.fetch_stats.get("window") is None else None
+        digest = self._digest if self.data else None
+        # Try the strategy that worked last time first
+        return html, tables, hint, digest, order_strategies(self.last_strategy, self.strategy_wins)
+
+    async def _async_process_page(
+        self, html: str, tables: Optional[list], validators: tuple
+    ) -> Dict[str, Any]:
+        """Parse a page on the event loop, or in the executor when it is large.
+
+        A bloated page, or one that falls through to the free-text strategy,
+        can take hundreds of milliseconds to parse. In the executor that
+        work no longer blocks the loop, at the cost of a thread hop that
+        only pays off for large pages. ``_read_body`` decides which, from the
+        bytes received; pages that didn't come through it go by their length.
+        """
+        offload = self.fetch_stats.get("offload")
+        if offload is None:
+            offload = len(html) >= self.offload_threshold
+        if not offload:
+            return self._process_page(html, tables, validators)
+        try:
+            parsed = await self.hass.async_add_executor_job(_parse_page, *self._parse_args(html, tables))
+        except Exception as err:
+            raise self._parse_error(err) from err
+        self.metrics["loop_ms_saved"] = round(self.metrics["loop_ms_saved"] + parsed.parse_ms, 2)
+        return self._process_page(html, tables, validators, parsed)
+
+    def _process_page(
+        self,
+        html: str,
+        tables: Optional[list],
+        validators: tuple,
+        parsed: Optional[_ParsedPage] = None,
+    ) -> Dict[str, Any]:
+        """Parse a downloaded page, skipping it when the rate tables are unchanged.
+
+        ``parsed`` is the result of ``_parse_page`` when it already ran in
+        the executor; otherwise it runs here, inline.
+        """
+        try:
+            _LOGGER.debug("Maybank metals: parsing HTML for prices (length: %d)", len(html))
+            self.offload_counts["inline" if parsed is None else "executor"] += 1
+            if parsed is None:
+                parsed = _parse_page(*self._parse_args(html, tables))
+            tables = parsed.tables
+            if parsed.window is not None:
+                self._count_window(parsed.window)
+            self.metrics["parse_ms"] = parsed.parse_ms
+            result = parsed.result
+            if result is None:
+                self._etag, self._last_modified = validators
+                return self._unchanged("unchanged")
+            self.metrics["strategy"] = result.strategy
+            prices = result.prices
+            if result.strategy is not None:
+                self.last_strategy = result.strategy
+                self.strategy_wins[result.strategy] = self.strategy_wins.get(result.strategy, 0) + 1
+            if not prices:
+                # Log a small sanitized snippet to help troubleshoot without spamming logs
+                snippet = re.sub(r"\s+", " ", html)[:1000]
+                self.hass.data.setdefault(DOMAIN, {})["last_error"] = "parse_failed"
+                _LOGGER.error(
+                    "Maybank metals parsing returned no data. First 1000 chars: %s",
+                    snippet,
+                )
+                # Also log if we can find gold/silver keywords
+                if 'gold' in html.lower():
+                    idx = html.lower().find('gold')
+                    context = html[max(0, idx-100):idx+300]
+                    _LOGGER.error("Found 'gold' at position %d, context: %s", idx, context[:400])
+                raise UpdateFailed("Failed to parse metals prices from Maybank page")
+            self._digest = parsed.digest
+            self._hint = make_hint(html, tables)
+            _LOGGER.info("Maybank metals: successfully parsed prices %s", prices)
+            return self._accept_prices(prices, validators)
+        except UpdateFailed:
+            raise
+        except Exception as err:
+            raise self._parse_error(err) from err
+
+    def _parse_error(self, err: Exception) -> UpdateFailed:
+        """Record an unexpected parsing error and wrap it for the coordinator."""
+        msg = f"Parse error: {type(err).__name__}: {err}"
+        self.hass.data.setdefault(DOMAIN, {})["last_error"] = msg
+        _LOGGER.error("Maybank metals: %s", msg)
+        return UpdateFailed(msg)
+
+    def _accept_prices(self, prices: Dict[str, Any], validators: tuple = (None, None)) -> Dict[str, Any]:
+        """Take on a new set of prices along with the derived values, history and schedule."""
+        self.hass.data.setdefault(DOMAIN, {})["last_error"] = None
+        self._etag, self._last_modified = validators
+        if self.data and prices != self.data:
+            # Maybank published new rates since the previous poll
+            self.scheduler.record_change(dt_util.as_local(self.utcnow()))
+        self.data = prices
+        self.derived = compute_derived(prices)
+        self.prices_as_of = self.utcnow()
+        self.history.record(self.prices_as_of.timestamp(), prices)
+        self.restored = False
+        self._store.async_delay_save(self._snapshot, SNAPSHOT_SAVE_DELAY)
+        return prices
+
+
+# ---------- Fetch helpers ----------
+
+# Read size for streaming mode; small enough to stop shortly after the
+# MIGA-i table, large enough to keep the per-chunk overhead negligible
+_STREAM_CHUNK_SIZE = 16 * 1024
+
+_RE_META_CHARSET = re.compile(rb"""<meta[^>]{0,200}?charset=["']?([A-Za-z0-9_\-]+)""", re.IGNORECASE)
+
+
+class _ParsedPage(NamedTuple):
+    """What ``_parse_page`` found; applied to the fetcher on the event loop.
+
+    A named tuple rather than a frozen dataclass, which takes several times
+    as long to define and adds to the platform's import time.
+    """
+
+    tables: list
+    # Whether the hinted window held the rate tables (None if not tried)
+    window: Optional[bool]
+    digest: str
+    # None when the rate tables hash to the previous digest
+    result: Optional[ParseResult]
+    parse_ms: float
+
+
+def _parse_page(
+    html: str,
+    tables: Optional[list],
+    hint: Optional[TableHint],
+    previous_digest: Optional[str],
+    order: tuple,
+) -> _ParsedPage:
+    """Extract the rate tables and parse them, unless they are unchanged.
+
+    Touches no fetcher or Home Assistant state, so it can run in the executor.
+    """
+    started = time.monotonic()
+    window = None
+    if tables is None and hint is not None:
+        tables = extract_window(html, hint)
+        window = tables is not None
+    if tables is None:
+        tables = extract_tables(html)
+    digest = rate_digest(html, tables)
+    result = None if digest == previous_digest else parse_tables(tables, html, order)
+    return _ParsedPage(tables, window, digest, result, round((time.monotonic() - started) * 1000, 2))
+
+
+def _error_reason(err: BaseException, timings: Dict[str, float]) -> str:
+    """Describe a request error, naming the phase a timeout hit from the trace marks."""
+    if not isinstance(err, asyncio.TimeoutError):
+        return str(err)
+    if "headers" in timings:
+        phase = "body read"
+    elif "connect_end" in timings:
+        phase = "time to first byte"
+    else:
+        phase = "connect"
+    return f"timed out during {phase}"
+
+
+def _sniff_charset(head: bytes) -> tuple[str, str]:
+    """Pick a charset from a ``<meta>`` tag in the first chunk, else UTF-8."""
+    match = _RE_META_CHARSET.search(head[:4096])
+    if match:
+        return match.group(1).decode("ascii").lower(), "meta"
+    return "utf-8", "default"
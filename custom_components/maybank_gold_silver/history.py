@@ -0,0 +1,269 @@
+"""Fixed-size price history with rolling-window statistics.
+
+Kept free of Home Assistant imports so it can be exercised offline. The
+fetcher records every new set of prices. Each metal/field pair is a ring
+buffer of timestamps and prices. For each window it keeps the oldest sample
+still inside, monotonic queues for the minimum and maximum, and the
+time-weighted area under the price curve, so stats are updated in
+amortised constant time. Memory is bounded by the buffer capacity.
+"""
+from __future__ import annotations
+
+from array import array
+from collections import deque
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+# Series tracked: every metal and field the parser produces
+METALS = ("gold", "silver", "miga_100g", "miga_below100g")
+FIELDS = ("buy", "sell")
+
+# Window name -> length in seconds
+WINDOWS: Dict[str, float] = {
+    "1h": 3600.0,
+    "24h": 86400.0,
+    "7d": 7 * 86400.0,
+    "30d": 30 * 86400.0,
+}
+
+HOUR = 3600.0
+
+# Samples kept per series. Only price changes are stored, a few a day, so
+# this covers the 30 day window with plenty to spare
+DEFAULT_CAPACITY = 512
+
+
+class _Window:
+    """Incremental min/max/time-weighted mean over one trailing window."""
+
+    __slots__ = ("length", "tail", "carry", "area", "mins", "maxs")
+
+    def __init__(self, length: float) -> None:
+        self.length = length
+        # Sequence number of the oldest sample inside the window
+        self.tail = 0
+        # Price in effect when the window starts (last sample before it)
+        self.carry: Optional[float] = None
+        # Sum of price * duration between consecutive samples in the window
+        self.area = 0.0
+        self.mins: deque = deque()
+        self.maxs: deque = deque()
+
+
+class RingSeries:
+    """Ring buffer of (timestamp, price) samples for one metal and field."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, windows: Mapping[str, float] = WINDOWS) -> None:
+        if capacity < 2:
+            raise ValueError("capacity must be at least 2")
+        self.capacity = capacity
+        self._ts = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        # Sequence number the next sample gets; slot is head % capacity
+        self._head = 0
+        self._windows = {name: _Window(length) for name, length in windows.items()}
+
+    def __len__(self) -> int:
+        return min(self._head, self.capacity)
+
+    def _t(self, seq: int) -> float:
+        return self._ts[seq % self.capacity]
+
+    def _v(self, seq: int) -> float:
+        return self._values[seq % self.capacity]
+
+    @property
+    def last(self) -> Optional[Tuple[float, float]]:
+        if not self._head:
+            return None
+        return self._t(self._head - 1), self._v(self._head - 1)
+
+    def samples(self) -> Iterator[Tuple[float, float]]:
+        """Yield stored samples, oldest first."""
+        for seq in range(self._head - len(self), self._head):
+            yield self._t(seq), self._v(seq)
+
+    def _evict(self, win: _Window) -> None:
+        seq = win.tail
+        value = self._v(seq)
+        if seq + 1 < self._head:
+            win.area -= value * (self._t(seq + 1) - self._t(seq))
+        win.carry = value
+        win.tail = seq + 1
+        if win.mins and win.mins[0] == seq:
+            win.mins.popleft()
+        if win.maxs and win.maxs[0] == seq:
+            win.maxs.popleft()
+
+    def _advance(self, win: _Window, now: float) -> None:
+        cutoff = now - win.length
+        while win.tail < self._head and self._t(win.tail) <= cutoff:
+            self._evict(win)
+
+    def append(self, ts: float, value: float) -> bool:
+        """Add a sample; repeats of the last price and out-of-order times are ignored."""
+        last = self.last
+        if last is not None and (ts < last[0] or value == last[1]):
+            return False
+        seq = self._head
+        if seq >= self.capacity:
+            # The slot about to be reused must leave every window first
+            oldest = seq - self.capacity
+            for win in self._windows.values():
+                if win.tail == oldest:
+                    self._evict(win)
+        for win in self._windows.values():
+            if win.tail < seq:
+                win.area += self._v(seq - 1) * (ts - self._t(seq - 1))
+        slot = seq % self.capacity
+        self._ts[slot] = ts
+        self._values[slot] = value
+        self._head += 1
+        for win in self._windows.values():
+            while win.mins and self._v(win.mins[-1]) >= value:
+                win.mins.pop()
+            win.mins.append(seq)
+            while win.maxs and self._v(win.maxs[-1]) <= value:
+                win.maxs.pop()
+            win.maxs.append(seq)
+            self._advance(win, ts)
+        return True
+
+    def stats(self, window: str, now: float) -> Optional[Dict[str, float]]:
+        """Return min, max and time-weighted mean over the window ending at ``now``.
+
+        ``now`` must not go backwards between calls, since samples that
+        leave a window are not brought back.
+        """
+        win = self._windows[window]
+        if self._head:
+            now = max(now, self._t(self._head - 1))
+        self._advance(win, now)
+        if win.tail == self._head:
+            if win.carry is None:
+                return None
+            return {"min": win.carry, "max": win.carry, "mean": win.carry}
+        last = self._head - 1
+        low = self._v(win.mins[0])
+        high = self._v(win.maxs[0])
+        area = win.area + self._v(last) * (now - self._t(last))
+        start = self._t(win.tail)
+        if win.carry is not None:
+            low = min(low, win.carry)
+            high = max(high, win.carry)
+            cutoff = now - win.length
+            area += win.carry * (start - cutoff)
+            start = cutoff
+        span = now - start
+        mean = area / span if span > 0 else self._v(last)
+        return {"min": low, "max": high, "mean": round(mean, 2)}
+
+
+class PriceHistory:
+    """Ring buffers for every metal and field, fed from parsed price dicts."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        self.capacity = capacity
+        self._series: Dict[Tuple[str, str], RingSeries] = {
+            (metal, field): RingSeries(capacity) for metal in METALS for field in FIELDS
+        }
+
+    def record(self, ts: float, prices: Mapping[str, Any]) -> int:
+        """Add the prices parsed at ``ts`` (epoch seconds); returns samples stored."""
+        stored = 0
+        for (metal, field), series in self._series.items():
+            value = (prices.get(metal) or {}).get(field)
+            if value is None:
+                continue
+            try:
+                stored += series.append(ts, float(value))
+            except (TypeError, ValueError):
+                continue
+        return stored
+
+    def samples(self, metal: str, field: str) -> List[Tuple[float, float]]:
+        """Stored (timestamp, price) samples for one series, oldest first."""
+        series = self._series.get((metal, field))
+        return list(series.samples()) if series is not None else []
+
+    def stats(self, metal: str, field: str, now: float) -> Dict[str, float]:
+        """Flat ``min_24h``/``max_24h``/``mean_24h``-style stats for one series."""
+        series = self._series.get((metal, field))
+        out: Dict[str, float] = {}
+        if series is None:
+            return out
+        for window in WINDOWS:
+            values = series.stats(window, now)
+            if values is None:
+                continue
+            for name, value in values.items():
+                out[f"{name}_{window}"] = value
+        return out
+
+    # ---------- Persistence ----------
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            f"{metal}.{field}": [[ts, value] for ts, value in series.samples()]
+            for (metal, field), series in self._series.items()
+            if len(series)
+        }
+
+    def restore(self, state: Optional[Dict[str, Any]]) -> None:
+        """Load state produced by ``as_dict``; malformed entries are skipped."""
+        if not isinstance(state, dict):
+            return
+        for key, samples in state.items():
+            metal, _, field = key.partition(".")
+            series = self._series.get((metal, field))
+            if series is None or not isinstance(samples, list):
+                continue
+            for sample in samples[-self.capacity:]:
+                try:
+                    series.append(float(sample[0]), float(sample[1]))
+                except (TypeError, ValueError, IndexError):
+                    continue
+
+
+def hourly_stats(
+    samples: Sequence[Tuple[float, float]], since: float, until: float
+) -> List[Tuple[float, float, float, float]]:
+    """Aggregate a price step series into whole hours.
+
+    Returns ``(hour_start, mean, min, max)`` for every hour that starts at
+    or after ``since`` and ends by ``until``. Each price holds until the
+    next sample. The mean is time-weighted, and the hour holding the first
+    sample is averaged from that sample on. Runs in O(hours + samples).
+    """
+    out: List[Tuple[float, float, float, float]] = []
+    if not samples:
+        return out
+    hour = max(since, samples[0][0]) // HOUR * HOUR
+    end = until // HOUR * HOUR
+    count = len(samples)
+    idx = 0
+    current: Optional[float] = None
+    while hour < end:
+        next_hour = hour + HOUR
+        while idx < count and samples[idx][0] <= hour:
+            current = samples[idx][1]
+            idx += 1
+        if current is None:
+            # First hour: covered from the first sample onwards
+            pos, current = samples[idx]
+            idx += 1
+        else:
+            pos = hour
+        covered_from = pos
+        low = high = current
+        area = 0.0
+        while idx < count and samples[idx][0] < next_hour:
+            ts, value = samples[idx]
+            area += current * (ts - pos)
+            pos, current = ts, value
+            low = min(low, value)
+            high = max(high, value)
+            idx += 1
+        area += current * (next_hour - pos)
+        out.append((hour, round(area / (next_hour - covered_from), 4), low, high))
+        hour = next_hour
+    return out
@@ -0,0 +1,66 @@
+"""Valuation of gram holdings against the parsed prices.
+
+Kept free of Home Assistant imports so it can be exercised offline. All
+positions are valued in one pass per set of prices; entities only read the
+result. ``buy`` is the price Maybank sells a gram at and ``sell`` the price
+it buys a gram back at, so market value uses ``buy`` and liquidation value
+uses ``sell``.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Mapping, Optional
+
+# MIGA-i prices a position of this many grams or more at the 100g+ tier
+MIGA_TIER_GRAMS = 100.0
+
+
+def price_key(account: str, grams: float) -> str:
+    """Key in the prices dict for an account, picking the MIGA-i tier by size."""
+    if account == "miga":
+        return "miga_100g" if grams >= MIGA_TIER_GRAMS else "miga_below100g"
+    return account
+
+
+def _price(prices: Mapping[str, Any], metal: str, field: str) -> Optional[float]:
+    try:
+        return float(prices[metal][field])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def value_holdings(holdings: Mapping[str, float], prices: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    """Value every non-zero position and the portfolio total.
+
+    Returns ``{"positions": {account: {...}}, "market_value": ...,
+    "liquidation_value": ...}``. A position without prices has ``None``
+    values, and so do the totals, rather than a total that silently
+    leaves it out.
+    """
+    prices = prices or {}
+    positions: Dict[str, Dict[str, Any]] = {}
+    market_total: Optional[float] = 0.0
+    liquidation_total: Optional[float] = 0.0
+    for account, grams in holdings.items():
+        if not grams:
+            continue
+        key = price_key(account, grams)
+        buy, sell = _price(prices, key, "buy"), _price(prices, key, "sell")
+        market = round(grams * buy, 2) if buy is not None else None
+        liquidation = round(grams * sell, 2) if sell is not None else None
+        positions[account] = {
+            "grams": grams,
+            "tier": key,
+            "buy_price": buy,
+            "sell_price": sell,
+            "market_value": market,
+            "liquidation_value": liquidation,
+        }
+        market_total = None if market is None or market_total is None else market_total + market
+        liquidation_total = (
+            None if liquidation is None or liquidation_total is None else liquidation_total + liquidation
+        )
+    return {
+        "positions": positions,
+        "market_value": round(market_total, 2) if market_total is not None else None,
+        "liquidation_value": round(liquidation_total, 2) if liquidation_total is not None else None,
+    }
@@ -0,0 +1,295 @@
+"""Buy/sell ledger with running FIFO and weighted-average cost basis.
+
+Kept free of Home Assistant imports so it can be exercised offline. Each
+account keeps its open FIFO lots and running totals, so a transaction costs
+O(1) amortised (every lot is consumed at most once) and P&L against a new
+price is O(1). The stored form carries a checkpoint of those totals, so
+loading never replays the whole history. In memory the books are also
+copied every ``CHECKPOINT_INTERVAL`` transactions or so, and a backdated
+transaction only replays from the copy before it.
+"""
+from __future__ import annotations
+
+import bisect
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+ACCOUNTS = ("gold", "silver", "miga")
+KINDS = ("buy", "sell")
+
+# Grams below this are treated as zero when lots are consumed
+_EPSILON = 1e-9
+
+# Fewest transactions between in-memory copies of the books. Copies are
+# also at least half as many transactions apart as the open lots they hold,
+# so copying stays O(1) amortised per transaction however many are open.
+CHECKPOINT_INTERVAL = 512
+
+
+def _timestamp(when: str) -> float:
+    """Seconds since the epoch of an ISO 8601 timestamp (UTC if it has no offset)."""
+    at = datetime.fromisoformat(when)
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=timezone.utc)
+    return at.timestamp()
+
+
+def _transaction(when: str, account: str, kind: str, grams: float, price: float) -> list:
+    """Check a transaction and return it in stored form; raises ValueError if invalid."""
+    if account not in ACCOUNTS:
+        raise ValueError(f"unknown account {account!r}")
+    if kind not in KINDS:
+        raise ValueError(f"unknown transaction type {kind!r}")
+    grams, price = float(grams), float(price)
+    if grams <= 0 or price <= 0:
+        raise ValueError("grams and price must be positive")
+    # Raises ValueError for text that isn't an ISO 8601 timestamp
+    _timestamp(when)
+    return [when, account, kind, grams, price]
+
+
+class AccountBook:
+    """Open lots and running cost/P&L totals for one account."""
+
+    __slots__ = ("lots", "grams", "fifo_cost", "average_cost", "realized_fifo", "realized_average")
+
+    def __init__(self) -> None:
+        # [grams, price per gram] of every lot not yet sold, oldest first
+        self.lots: deque = deque()
+        self.grams = 0.0
+        self.fifo_cost = 0.0
+        self.average_cost = 0.0
+        self.realized_fifo = 0.0
+        self.realized_average = 0.0
+
+    def buy(self, grams: float, price: float) -> None:
+        self.lots.append([grams, price])
+        self.grams += grams
+        self.fifo_cost += grams * price
+        self.average_cost += grams * price
+
+    def sell(self, grams: float, price: float) -> None:
+        if grams > self.grams + _EPSILON:
+            raise ValueError(f"cannot sell {grams:g} g, only {self.grams:g} g held")
+        grams = min(grams, self.grams)
+        # Weighted average: remove the sold share of the pooled cost
+        share = self.average_cost * grams / self.grams
+        self.average_cost -= share
+        self.realized_average += grams * price - share
+        # FIFO: consume the oldest lots first
+        remaining = grams
+        cost = 0.0
+        while remaining > _EPSILON:
+            lot = self.lots[0]
+            used = min(lot[0], remaining)
+            cost += used * lot[1]
+            lot[0] -= used
+            remaining -= used
+            if lot[0] <= _EPSILON:
+                self.lots.popleft()
+        self.fifo_cost -= cost
+        self.realized_fifo += grams * price - cost
+        self.grams -= grams
+        if self.grams <= _EPSILON:
+            # Clear rounding residue once the position is closed
+            self.grams = self.fifo_cost = self.average_cost = 0.0
+            self.lots.clear()
+
+    def summary(self, bid: Optional[float]) -> Dict[str, Any]:
+        """Cost basis and P&L, with unrealized P&L valued at ``bid`` per gram."""
+        out: Dict[str, Any] = {
+            "grams": round(self.grams, 4),
+            "cost_basis_fifo": round(self.fifo_cost, 2),
+            "cost_basis_average": round(self.average_cost, 2),
+            "average_cost_per_gram": round(self.average_cost / self.grams, 2) if self.grams else None,
+            "realized_fifo": round(self.realized_fifo, 2),
+            "realized_average": round(self.realized_average, 2),
+            "unrealized_fifo": None,
+            "unrealized_average": None,
+        }
+        if bid is not None:
+            value = self.grams * bid
+            out["unrealized_fifo"] = round(value - self.fifo_cost, 2)
+            out["unrealized_average"] = round(value - self.average_cost, 2)
+        return out
+
+    def copy(self) -> AccountBook:
+        book = AccountBook()
+        book.lots = deque([lot[0], lot[1]] for lot in self.lots)
+        book.grams = self.grams
+        book.fifo_cost = self.fifo_cost
+        book.average_cost = self.average_cost
+        book.realized_fifo = self.realized_fifo
+        book.realized_average = self.realized_average
+        return book
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "lots": [list(lot) for lot in self.lots],
+            "grams": self.grams,
+            "fifo_cost": self.fifo_cost,
+            "average_cost": self.average_cost,
+            "realized_fifo": self.realized_fifo,
+            "realized_average": self.realized_average,
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> AccountBook:
+        book = cls()
+        book.lots = deque([float(g), float(p)] for g, p in state["lots"])
+        book.grams = float(state["grams"])
+        book.fifo_cost = float(state["fifo_cost"])
+        book.average_cost = float(state["average_cost"])
+        book.realized_fifo = float(state["realized_fifo"])
+        book.realized_average = float(state["realized_average"])
+        return book
+
+
+class Ledger:
+    """Transactions for every account plus the books derived from them.
+
+    Transactions are kept as compact ``[when, account, kind, grams, price]``
+    lists in timestamp order, ``when`` being an ISO 8601 timestamp. Ties
+    keep the order they were recorded in.
+    """
+
+    def __init__(self) -> None:
+        self.books: Dict[str, AccountBook] = {}
+        self.transactions: List[list] = []
+        # Epoch seconds of each transaction, parsed on the first backdated one
+        self._times: Optional[List[float]] = None
+        # Copies of the books after the first _marks[i] transactions
+        self._marks: List[int] = [0]
+        self._snapshots: List[Dict[str, AccountBook]] = [{}]
+
+    def record(self, account: str, kind: str, grams: float, price: float, when: str) -> list:
+        """Apply and store a transaction; raises ValueError if it is invalid.
+
+        A transaction dated before the last one is inserted in timestamp
+        order. The books are rebuilt from the nearest copy made before that
+        point, replaying only the transactions after it, so FIFO lots,
+        average cost and realized P&L come out as if it had been recorded on
+        time. It is rejected if that makes a later sale exceed the grams
+        held.
+        """
+        txn = _transaction(when, account, kind, grams, price)
+        at = _timestamp(when)
+        if not self.transactions or at >= self._last_time():
+            _apply(self.books, txn)
+            self.transactions.append(txn)
+            if self._times is not None:
+                self._times.append(at)
+            self._checkpoint()
+            return txn
+        if self._times is None:
+            self._times = [_timestamp(other[0]) for other in self.transactions]
+        position = bisect.bisect_right(self._times, at)
+        # The last copy made at or before the insertion point
+        index = bisect.bisect_right(self._marks, position) - 1
+        start = self._marks[index]
+        marks, snapshots = self._marks[:index + 1], self._snapshots[:index + 1]
+        books = _copy_books(snapshots[-1])
+        # Raises ValueError, before anything is changed, if a sale falls short
+        replay = self.transactions[start:position] + [txn] + self.transactions[position:]
+        for applied, other in enumerate(replay, start + 1):
+            _apply(books, other)
+            if _due(books, applied - marks[-1]):
+                marks.append(applied)
+                snapshots.append(_copy_books(books))
+        self.transactions.insert(position, txn)
+        self._times.insert(position, at)
+        self.books, self._marks, self._snapshots = books, marks, snapshots
+        return txn
+
+    def _last_time(self) -> float:
+        if self._times is not None:
+            return self._times[-1]
+        return _timestamp(self.transactions[-1][0])
+
+    def _checkpoint(self) -> None:
+        """Copy the books if enough transactions were applied since the last copy."""
+        if _due(self.books, len(self.transactions) - self._marks[-1]):
+            self._marks.append(len(self.transactions))
+            self._snapshots.append(_copy_books(self.books))
+
+    # ---------- Persistence ----------
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "transactions": self.transactions,
+            "checkpoint": {
+                "applied": len(self.transactions),
+                "books": {account: book.as_dict() for account, book in self.books.items()},
+            },
+        }
+
+    def restore(self, state: Optional[Dict[str, Any]]) -> int:
+        """Load state produced by ``as_dict``; returns how many transactions were dropped.
+
+        Books come straight from the checkpoint; only transactions recorded
+        after it are replayed. A missing or unreadable checkpoint falls back
+        to a full replay. The replay stops at the first transaction that is
+        malformed or can't be applied, such as a sale with nothing held, and
+        drops it and everything after it, so the valid prefix is kept.
+        """
+        self.books = {}
+        self.transactions = []
+        self._times = None
+        self._marks, self._snapshots = [0], [{}]
+        if not isinstance(state, dict):
+            return 0
+        stored = state.get("transactions") or []
+        if not isinstance(stored, list):
+            return 0
+        applied = 0
+        try:
+            checkpoint = state.get("checkpoint") or {}
+            stored_books = checkpoint.get("books", {})
+            if not isinstance(stored_books, dict):
+                raise TypeError("checkpoint books are not a mapping")
+            books = {account: AccountBook.from_dict(book) for account, book in stored_books.items()}
+            applied = int(checkpoint.get("applied") or 0)
+            if applied > len(stored):
+                raise ValueError("checkpoint is ahead of the transactions")
+            # Taken as they are: the checkpoint already accounts for them
+            transactions = [list(txn) for txn in stored[:applied]]
+        except (AttributeError, KeyError, TypeError, ValueError):
+            books, transactions, applied = {}, [], 0
+        self.books, self.transactions = books, transactions
+        if applied:
+            # Backdated transactions before the checkpoint replay from here
+            # or, if they are earlier still, from the start
+            self._marks.append(applied)
+            self._snapshots.append(_copy_books(books))
+        for index in range(applied, len(stored)):
+            try:
+                txn = _transaction(*stored[index])
+                _apply(self.books, txn)
+            except (TypeError, ValueError):
+                return len(stored) - index
+            self.transactions.append(txn)
+            self._checkpoint()
+        return 0
+
+
+def _apply(books: Dict[str, AccountBook], txn: list) -> None:
+    _, account, kind, grams, price = txn
+    book = books.get(account)
+    if book is None:
+        if kind == "sell":
+            raise ValueError(f"cannot sell {grams:g} g, nothing held")
+        book = books[account] = AccountBook()
+    if kind == "buy":
+        book.buy(grams, price)
+    else:
+        book.sell(grams, price)
+
+
+def _due(books: Dict[str, AccountBook], since: int) -> bool:
+    """Whether to copy ``books``, ``since`` transactions after the last copy."""
+    return since >= CHECKPOINT_INTERVAL and 2 * since >= sum(len(book.lots) for book in books.values())
+
+
+def _copy_books(books: Dict[str, AccountBook]) -> Dict[str, AccountBook]:
+    return {account: book.copy() for account, book in books.items()}
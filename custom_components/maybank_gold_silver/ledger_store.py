@@ -0,0 +1,83 @@
+"""The transaction ledger kept in Home Assistant storage."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Callable, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, LEDGER_SAVE_DELAY, LEDGER_STORAGE_KEY, STORAGE_VERSION
+from .ledger import Ledger
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class StoredLedger:
+    """The ledger, its storage and the entities listening to it."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self.ledger = Ledger()
+        self._store: Store = Store(hass, STORAGE_VERSION, LEDGER_STORAGE_KEY)
+        self._listeners: list[Callable[[], None]] = []
+        self._load_task: Optional[asyncio.Task] = None
+
+    async def async_load(self) -> None:
+        """Load the stored ledger (only loaded once)."""
+        if self._load_task is None:
+            self._load_task = self.hass.async_create_task(self._async_load())
+        try:
+            await self._load_task
+        except Exception:
+            # Let the next caller try again rather than re-raise this for good
+            self._load_task = None
+            raise
+
+    async def _async_load(self) -> None:
+        try:
+            stored = await self._store.async_load()
+        except Exception as err:  # corrupt storage must never block setup
+            _LOGGER.warning("Maybank metals: could not load the transaction ledger: %s", err)
+            return
+        try:
+            dropped = self.ledger.restore(stored)
+        except Exception as err:  # nor may a ledger that doesn't add up
+            _LOGGER.warning("Maybank metals: could not restore the transaction ledger, starting empty: %s", err)
+            self.ledger = Ledger()
+            return
+        if dropped:
+            _LOGGER.warning(
+                "Maybank metals: dropped the last %d stored transactions from the first one "
+                "that could not be applied",
+                dropped,
+            )
+
+    @callback
+    def async_add_listener(self, update_callback: Callable[[], None]) -> Callable[[], None]:
+        self._listeners.append(update_callback)
+
+        @callback
+        def _remove() -> None:
+            if update_callback in self._listeners:
+                self._listeners.remove(update_callback)
+
+        return _remove
+
+    @callback
+    def async_record(self, account: str, kind: str, grams: float, price: float, when: str) -> None:
+        self.ledger.record(account, kind, grams, price, when)
+        self._store.async_delay_save(self.ledger.as_dict, LEDGER_SAVE_DELAY)
+        for update_callback in list(self._listeners):
+            update_callback()
+
+
+async def async_get_ledger(hass: HomeAssistant) -> StoredLedger:
+    """Return the shared ledger, loading it from storage on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    stored = domain_data.get("ledger")
+    if stored is None:
+        stored = domain_data["ledger"] = StoredLedger(hass)
+    await stored.async_load()
+    return stored
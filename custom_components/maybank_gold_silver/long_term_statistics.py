@@ -0,0 +1,78 @@
+"""Publish prices as external long-term statistics.
+
+Imported by the fetcher only when the statistics option is enabled, so the
+recorder modules are never loaded otherwise.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, SENSOR_TYPES
+from .history import PriceHistory, hourly_stats
+
+try:  # Home Assistant 2025.4+ describes how the mean is computed
+    from homeassistant.components.recorder.models import StatisticMeanType
+except ImportError:  # pragma: no cover - older cores
+    StatisticMeanType = None
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def statistic_id(metal: str, field: str) -> str:
+    return f"{DOMAIN}:{metal}_{field}"
+
+
+def _metadata(metal: str, field: str, name: str) -> StatisticMetaData:
+    meta = {
+        "has_sum": False,
+        "name": name,
+        "source": DOMAIN,
+        "statistic_id": statistic_id(metal, field),
+        "unit_of_measurement": "MYR/g",
+    }
+    if StatisticMeanType is not None:
+        meta["mean_type"] = StatisticMeanType.ARITHMETIC
+    else:
+        meta["has_mean"] = True
+    return StatisticMetaData(**meta)
+
+
+@callback
+def async_import_hourly(
+    hass: HomeAssistant, history: PriceHistory, since: Optional[float], now: float
+) -> Optional[float]:
+    """Queue hourly mean/min/max for the hours completed since ``since``.
+
+    ``since=None`` backfills everything the history holds. Returns the end
+    of the last hour queued, to pass as ``since`` next time, or ``since``
+    unchanged when no hour has completed.
+    """
+    imported_until = since
+    for desc in SENSOR_TYPES.values():
+        metal, field = desc["metal"], desc["field"]
+        rows = hourly_stats(history.samples(metal, field), since or 0.0, now)
+        if not rows:
+            continue
+        async_add_external_statistics(
+            hass,
+            _metadata(metal, field, f"Maybank {desc['name']}"),
+            [
+                StatisticData(
+                    start=datetime.fromtimestamp(start, timezone.utc),
+                    mean=mean,
+                    min=low,
+                    max=high,
+                )
+                for start, mean, low, high in rows
+            ],
+        )
+        last_end = rows[-1][0] + 3600
+        imported_until = max(imported_until or 0.0, last_end)
+        _LOGGER.debug("Maybank metals: queued %d hourly statistics for %s", len(rows), statistic_id(metal, field))
+    return imported_until
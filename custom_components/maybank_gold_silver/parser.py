@@ -0,0 +1,715 @@
+"""Single-pass HTML table extraction and price parsing for the Maybank rates page.
+
+This module has no Home Assistant imports so it can be loaded on its own by
+the offline scripts and benchmarks at the repository root.
+"""
+from __future__ import annotations
+
+import functools
+import hashlib
+import html as _html
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Tuple
+
+# Strategy identifiers, in the order they are tried by default.
+# A: "<Metal> Investment Account" tables
+# B: tables with Selling/Buying headers under a caption naming the metal
+# C: any table row labelled with the metal (or a table captioned with it)
+# D: free-text fallback, two decimals after the metal name
+STRATEGIES: Tuple[str, ...] = ("A", "B", "C", "D")
+# Scans the raw page text; only worth running once the table strategies,
+# which cost next to nothing on the extracted tables, have all failed
+FALLBACK_STRATEGY = "D"
+
+_METALS = ("gold", "silver")
+
+# Tags that end a run of caption text outside of tables
+_BLOCK_TAGS = frozenset(
+    {
+        "p", "div", "h1", "h2", "h3", "h4", "h5", "h6", "li", "ul", "ol",
+        "br", "section", "article", "header", "footer", "tbody", "thead",
+    }
+)
+_RAW_TEXT_TAGS = frozenset({"script", "style"})
+
+_RE_DECIMAL = re.compile(r"\d[\d,]*\.\d{2}")
+_RE_WS = re.compile(r"\s+")
+_RE_INVESTMENT_CAPTION = re.compile(
+    r"\b(gold|silver)\s+investment\s+account", re.IGNORECASE
+)
+_RE_OUTSIDE = re.compile(r"<(?:(table)\b|(script)\b|(style)\b|(!--))", re.IGNORECASE)
+_RE_TAG = re.compile(r"<(/?)([A-Za-z][A-Za-z0-9]*)[^<>]*>")
+# Characters of preceding markup searched for a table's caption
+_CAPTION_WINDOW = 2048
+# Longest unfinished comment or tag carried over to the next streamed chunk;
+# past this it is given up on rather than rescanned with every chunk
+_MAX_PENDING = 256 * 1024
+_RE_RAW_TEXT_END = {
+    "script": re.compile(r"</script\s*>", re.IGNORECASE),
+    "style": re.compile(r"</style\s*>", re.IGNORECASE),
+}
+
+
+# Strategy D: the first decimal must start within this many characters of
+# the metal's name, and the second within this many of the first
+_FALLBACK_SPAN = 300
+# Mentions of a metal strategy D examines before giving up; the live page
+# has under 200
+_FALLBACK_MAX_MENTIONS = 10_000
+
+
+# The patterns below are only used by the fallback strategies (B-D). Strategy
+# A wins on the live page, so they are compiled the first time one runs
+# rather than when the module is imported.
+@functools.lru_cache(maxsize=None)
+def _re_metal_word() -> re.Pattern[str]:
+    return re.compile(r"\b(gold|silver)\b", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=None)
+def _re_fallback_decimal() -> re.Pattern[str]:
+    # Bounded so a long run of digits isn't rescanned from every offset
+    return re.compile(r"\d{1,15}\.\d{2}")
+
+
+_MIGA_TIERS = (
+    ("miga_100g", "100 grams and above"),
+    ("miga_below100g", "below 100 grams"),
+)
+
+
+def _to_float(val: str) -> float:
+    return float(val.replace(",", "").strip())
+
+
+def _clean(text: str) -> str:
+    return _RE_WS.sub(" ", _html.unescape(text)).strip()
+
+
+@dataclass(frozen=True)
+class RateRow:
+    """One table row: the first cell is the label, the rest are values."""
+
+    cells: Tuple[str, ...]
+    header: bool = False
+
+    @property
+    def label(self) -> str:
+        return self.cells[0] if self.cells else ""
+
+    def price_pair(self) -> Optional[Tuple[float, float]]:
+        """Return the first two adjacent decimal cells as (selling, buying)."""
+        cells = self.cells
+        for idx in range(len(cells) - 1):
+            if _RE_DECIMAL.fullmatch(cells[idx]) and _RE_DECIMAL.fullmatch(cells[idx + 1]):
+                return _to_float(cells[idx]), _to_float(cells[idx + 1])
+        return None
+
+
+@dataclass(frozen=True)
+class RateTable:
+    """A table found in the page along with the text that introduces it.
+
+    ``start`` and ``end`` are character offsets of the ``<table>`` open and
+    close tags in the source text.
+    """
+
+    caption: str
+    headers: Tuple[str, ...]
+    rows: Tuple[RateRow, ...]
+    start: int
+    end: int
+
+    def first_pair(self) -> Optional[Tuple[float, float]]:
+        for row in self.rows:
+            pair = row.price_pair()
+            if pair:
+                return pair
+        return None
+
+    def has_headers(self, *names: str) -> bool:
+        lowered = " ".join(self.headers).lower()
+        return all(name in lowered for name in names)
+
+
+class _OpenTable:
+    """Mutable state for a table that is still being read."""
+
+    __slots__ = ("caption", "start", "headers", "rows", "row", "row_header", "cell")
+
+    def __init__(self, caption: str, start: int) -> None:
+        self.caption = caption
+        self.start = start
+        self.headers: Tuple[str, ...] = ()
+        self.rows: List[RateRow] = []
+        self.row: Optional[List[str]] = None
+        self.row_header = True
+        self.cell: Optional[List[str]] = None
+
+    def close_cell(self) -> None:
+        if self.cell is not None and self.row is not None:
+            self.row.append(_clean("".join(self.cell)))
+        self.cell = None
+
+    def close_row(self) -> None:
+        self.close_cell()
+        if self.row:
+            cells = tuple(self.row)
+            if self.row_header and not self.headers:
+                self.headers = cells
+            else:
+                self.rows.append(RateRow(cells, self.row_header))
+        self.row = None
+        self.row_header = True
+
+    def open_cell(self, header: bool) -> None:
+        self.close_cell()
+        if self.row is None:
+            # Maybank omits <tr> before some data rows
+            self.row = []
+        if not header:
+            self.row_header = False
+        self.cell = []
+
+    def finish(self, end: int) -> RateTable:
+        self.close_row()
+        return RateTable(self.caption, self.headers, tuple(self.rows), self.start, end)
+
+
+def _strip_comments(text: str) -> str:
+    if "<!--" not in text:
+        return text
+    out: List[str] = []
+    pos = 0
+    while True:
+        start = text.find("<!--", pos)
+        if start < 0:
+            out.append(text[pos:])
+            break
+        out.append(text[pos:start])
+        end = text.find("-->", start + 4)
+        if end < 0:
+            break
+        pos = end + 3
+    return " ".join(out)
+
+
+class TableExtractor:
+    """Incremental tokenizer that collects every table in an HTML document.
+
+    Outside of tables the scanner only looks for the next ``<table``,
+    ``<script``, ``<style`` or comment, so marketing markup is skipped at
+    regex-engine speed. Inside a table every tag is tokenized. The caption
+    of a table is recovered from a short window of text preceding it. Each
+    character is visited a bounded number of times, so the cost is linear
+    in the size of the input.
+
+    ``feed`` may be called repeatedly with consecutive chunks; incomplete
+    tags at a chunk boundary are carried over to the next call. ``offset``
+    is where the first fed character sits in the document, for reading a
+    slice of it with document offsets on the tables.
+    """
+
+    def __init__(self, offset: int = 0) -> None:
+        self.tables: List[RateTable] = []
+        self._buf = ""
+        self._base = offset  # offset of self._buf[0] in the whole document
+        self._tail = ""  # last _CAPTION_WINDOW chars consumed outside tables
+        self._stack: List[_OpenTable] = []
+        self._raw_end: Optional[re.Pattern[str]] = None
+
+    @property
+    def consumed(self) -> int:
+        """Document offset up to which characters are fully tokenized."""
+        return self._base
+
+    def feed(self, data: str) -> None:
+        buf = self._buf + data if self._buf else data
+        pos = self._scan(buf, final=False)
+        self._advance(buf, pos)
+
+    def close(self) -> List[RateTable]:
+        if self._buf:
+            pos = self._scan(self._buf, final=True)
+            self._advance(self._buf, pos)
+        while self._stack:
+            self.tables.append(self._stack.pop().finish(self._base))
+        return self.tables
+
+    def _advance(self, buf: str, pos: int) -> None:
+        self._tail = (self._tail + buf[max(0, pos - _CAPTION_WINDOW):pos])[-_CAPTION_WINDOW:]
+        self._base += pos
+        self._buf = buf[pos:]
+
+    def _caption_before(self, buf: str, lt: int) -> str:
+        """Return the last block of text before the ``<table>`` at ``lt``."""
+        limit = _CAPTION_WINDOW
+        if self.tables:
+            # The walk below stops at the previous table's close tag, so don't
+            # tokenize what precedes it; back-to-back tables would otherwise
+            # each cost a full window
+            limit = min(limit, self._base + lt - self.tables[-1].end)
+        window = buf[max(0, lt - limit):lt]
+        if len(window) < limit:
+            window = (self._tail + window)[-limit:]
+        window = _strip_comments(window)
+        parts: List[str] = []
+        end = len(window)
+        raw = False  # walking backwards through script/style content
+        for match in reversed(list(_RE_TAG.finditer(window))):
+            name = match.group(2).lower()
+            if not raw:
+                parts.append(window[match.end():end])
+            end = match.start()
+            if name in _RAW_TEXT_TAGS:
+                raw = match.group(1) == "/"
+                continue
+            if raw:
+                continue
+            if name in _BLOCK_TAGS or name == "table":
+                text = _clean("".join(reversed(parts)))
+                if text:
+                    return text
+                parts = []
+                if name == "table":
+                    break
+        else:
+            # Drop a tag cut in half by the start of the window
+            head = "" if raw else window[:end]
+            parts.append(head[head.find(">") + 1:] if "<" not in head else head)
+            text = _clean("".join(reversed(parts)))
+            if text:
+                return text
+        return self.tables[-1].caption if self.tables else ""
+
+    def _scan(self, buf: str, final: bool) -> int:
+        """Tokenize ``buf`` and return how many characters were consumed."""
+        pos = 0
+        size = len(buf)
+        while pos < size:
+            if self._raw_end is not None:
+                match = self._raw_end.search(buf, pos)
+                if match is None:
+                    # Keep a short tail in case the end tag straddles chunks
+                    return size if final else max(pos, size - 16)
+                self._raw_end = None
+                pos = match.end()
+                continue
+            if not self._stack:
+                match = _RE_OUTSIDE.search(buf, pos)
+                if match is None:
+                    # "<tabl" may be completed by the next chunk
+                    return size if final else max(pos, size - 8)
+                lt = match.start()
+                if match.group(4):
+                    close = buf.find("-->", lt + 4)
+                    if close < 0:
+                        return lt if self._keep_pending(size, lt, final) else size
+                    pos = close + 3
+                    continue
+                gt = buf.find(">", match.end())
+                if gt < 0:
+                    return lt if self._keep_pending(size, lt, final) else size
+                if match.group(1):
+                    self._stack.append(_OpenTable(self._caption_before(buf, lt), self._base + lt))
+                else:
+                    self._raw_end = _RE_RAW_TEXT_END[(match.group(2) or match.group(3)).lower()]
+                pos = gt + 1
+                continue
+            table = self._stack[-1]
+            lt = buf.find("<", pos)
+            if lt < 0:
+                if table.cell is not None:
+                    table.cell.append(buf[pos:])
+                return size
+            if lt > pos and table.cell is not None:
+                table.cell.append(buf[pos:lt])
+            if buf.startswith("<!--", lt):
+                close = buf.find("-->", lt + 4)
+                if close < 0:
+                    return lt if self._keep_pending(size, lt, final) else size
+                pos = close + 3
+                continue
+            match = _RE_TAG.match(buf, lt)
+            if match is None:
+                gt = buf.find(">", lt + 1)
+                if gt < 0 and self._keep_pending(size, lt, final):
+                    return lt
+                # Not a tag we understand; treat "<" as text
+                if table.cell is not None:
+                    table.cell.append("<")
+                pos = lt + 1
+                continue
+            self._table_tag(match.group(1) == "/", match.group(2).lower(), table, lt)
+            pos = match.end()
+        return pos
+
+    @staticmethod
+    def _keep_pending(size: int, lt: int, final: bool) -> bool:
+        """Whether to wait for the next chunk to finish the construct at ``lt``.
+
+        Not on the last chunk, nor once it has grown past ``_MAX_PENDING``;
+        an unclosed comment or tag would otherwise be rescanned with every
+        chunk that follows.
+        """
+        return not final and size - lt <= _MAX_PENDING
+
+    def _table_tag(self, closing: bool, name: str, table: _OpenTable, lt: int) -> None:
+        if name == "table":
+            if closing:
+                self.tables.append(self._stack.pop().finish(self._base + lt))
+            else:
+                self._stack.append(_OpenTable(table.caption, self._base + lt))
+        elif name in ("td", "th"):
+            if closing:
+                table.close_cell()
+            else:
+                table.open_cell(name == "th")
+        elif name == "tr":
+            table.close_row()
+        elif name == "caption":
+            if not closing:
+                table.close_row()
+                table.cell = []
+            elif table.cell is not None:
+                table.caption = _clean("".join(table.cell))
+                table.cell = None
+        elif name in _RAW_TEXT_TAGS and not closing:
+            self._raw_end = _RE_RAW_TEXT_END[name]
+
+
+def extract_tables(html: str) -> List[RateTable]:
+    """Return every table in ``html`` in document order."""
+    extractor = TableExtractor()
+    extractor.feed(html)
+    return extractor.close()
+
+
+def has_required_tables(tables: List[RateTable]) -> bool:
+    """Return True once both investment accounts and both MIGA-i tiers are read.
+
+    Only complete tables are passed in, so a streaming reader can stop as
+    soon as this holds; the rest of the page cannot change the result of
+    strategy A or the MIGA-i lookup.
+    """
+    metals = set()
+    tiers = set()
+    for table in tables:
+        metal, table_tiers = _rate_contents(table)
+        if metal:
+            metals.add(metal)
+        tiers.update(table_tiers)
+    return len(metals) == len(_METALS) and len(tiers) == len(_MIGA_TIERS)
+
+
+def _rate_contents(table: RateTable) -> Tuple[Optional[str], List[str]]:
+    """Return the investment account metal and the MIGA-i tiers ``table`` prices."""
+    match = _RE_INVESTMENT_CAPTION.search(table.caption)
+    metal = match.group(1).lower() if match and table.first_pair() else None
+    tiers = []
+    for row in table.rows:
+        label = row.label.lower()
+        for key, marker in _MIGA_TIERS:
+            if marker in label and row.price_pair():
+                tiers.append(key)
+    return metal, tiers
+
+
+def rate_tables(tables: List[RateTable]) -> List[RateTable]:
+    """Return the investment account and MIGA-i tables among ``tables``."""
+    return [t for t in tables if any(_rate_contents(t))]
+
+
+def rate_digest(html: str, tables: List[RateTable]) -> str:
+    """Hash the markup of the rate tables, or the whole page if one is missing.
+
+    Only the rate tables are hashed, so a full parse, a stream that stopped
+    after them and a hinted window all give the same digest, and a change
+    to any other table on the page still counts as unchanged.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if has_required_tables(tables):
+        for table in rate_tables(tables):
+            digest.update(html[table.start:table.end].encode("utf-8", "replace"))
+    else:
+        digest.update(html.encode("utf-8", "replace"))
+    return digest.hexdigest()
+
+
+# ---------- Table hints ----------
+
+# Characters of markup before the first rate table kept as its fingerprint
+_HINT_ANCHOR = 64
+# How far the rate tables may drift between fetches and still be found
+_HINT_SLACK = 4096
+
+
+@dataclass(frozen=True)
+class TableHint:
+    """Where the rate tables sat in the last page that parsed.
+
+    ``offset`` is the start of the first rate table, ``length`` the span up
+    to the end of the last one and ``anchor`` the markup just before
+    ``offset``. Pages differ between fetches by a few tokens and timestamps
+    above the tables, so the anchor is searched for within ``_HINT_SLACK``
+    characters of the old offset rather than at it.
+    """
+
+    offset: int
+    length: int
+    anchor: str
+
+    @property
+    def search_end(self) -> int:
+        """Characters of the page needed before the window can be located."""
+        return self.offset + _HINT_SLACK
+
+    def as_dict(self) -> Dict[str, object]:
+        return {"offset": self.offset, "length": self.length, "anchor": self.anchor}
+
+    @classmethod
+    def from_dict(cls, state: Optional[Mapping[str, object]]) -> Optional[TableHint]:
+        if not state:
+            return None
+        try:
+            return cls(int(state["offset"]), int(state["length"]), str(state["anchor"]))
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+def make_hint(html: str, tables: List[RateTable]) -> Optional[TableHint]:
+    """Remember where the investment account and MIGA-i tables are in ``html``.
+
+    Returns None unless every required table is present, or when the markup
+    before them is too short to serve as a fingerprint.
+    """
+    if not has_required_tables(tables):
+        return None
+    rate = rate_tables(tables)
+    start = min(t.start for t in rate)
+    end = max(t.end for t in rate)
+    anchor = html[max(0, start - _HINT_ANCHOR):start]
+    if len(anchor) < _HINT_ANCHOR // 2:
+        return None
+    return TableHint(start, end - start, anchor)
+
+
+def locate_window(html: str, hint: TableHint) -> Optional[Tuple[int, int]]:
+    """Return the ``(start, end)`` slice expected to hold the rate tables.
+
+    The slice starts a caption window ahead of the first table so captions
+    read the same as in a full parse. Returns None when the anchor is not
+    found near the remembered offset.
+    """
+    lo = max(0, hint.offset - len(hint.anchor) - _HINT_SLACK)
+    pos = html.find(hint.anchor, lo, hint.search_end)
+    if pos < 0:
+        return None
+    first = pos + len(hint.anchor)
+    return max(0, first - _CAPTION_WINDOW), min(len(html), first + hint.length + _HINT_SLACK)
+
+
+def extract_window(html: str, hint: TableHint) -> Optional[List[RateTable]]:
+    """Extract tables from the hinted window only.
+
+    Returns None, meaning a full ``extract_tables`` is needed, when the
+    anchor has moved out of reach or the window lacks a required table.
+    Table offsets are document offsets, as from ``extract_tables``.
+    """
+    window = locate_window(html, hint)
+    if window is None:
+        return None
+    start, end = window
+    extractor = TableExtractor(start)
+    extractor.feed(html[start:end])
+    tables = extractor.close()
+    return tables if has_required_tables(tables) else None
+
+
+# ---------- Strategies ----------
+
+def _is_tier_table(table: RateTable) -> bool:
+    caption = table.caption.lower()
+    return "miga" in caption or "kijang" in caption
+
+
+def _strategy_investment(
+    tables: List[RateTable], html: str, prices: Dict[str, Dict[str, float]]
+) -> None:
+    """Strategy A: Maybank-specific "Investment Account" tables (most reliable)."""
+    for table in tables:
+        match = _RE_INVESTMENT_CAPTION.search(table.caption)
+        if not match:
+            continue
+        metal = match.group(1).lower()
+        pair = table.first_pair()
+        if pair and metal not in prices:
+            # Selling = bank sells to customer (customer buy price)
+            # Buying = bank buys from customer (customer sell price)
+            prices[metal] = {"buy": pair[0], "sell": pair[1]}
+
+
+def _strategy_selling_buying(
+    tables: List[RateTable], html: str, prices: Dict[str, Dict[str, float]]
+) -> None:
+    """Strategy B: generic tables with Selling/Buying headers."""
+    metal_word = _re_metal_word()
+    for table in tables:
+        if _is_tier_table(table) or not table.has_headers("selling", "buying"):
+            continue
+        match = metal_word.search(table.caption)
+        if not match:
+            continue
+        metal = match.group(1).lower()
+        pair = table.first_pair()
+        if pair and metal not in prices:
+            prices[metal] = {"buy": pair[0], "sell": pair[1]}
+
+
+def _strategy_table_cells(
+    tables: List[RateTable], html: str, prices: Dict[str, Dict[str, float]]
+) -> None:
+    """Strategy C: rows labelled with the metal, or tables captioned with it."""
+    metal_word = _re_metal_word()
+    for table in tables:
+        tier = _is_tier_table(table)
+        caption_match = None if tier else metal_word.search(table.caption)
+        for row in table.rows:
+            match = metal_word.match(row.label) or caption_match
+            if not match:
+                continue
+            metal = match.group(1).lower()
+            if metal in prices:
+                continue
+            pair = row.price_pair()
+            if pair:
+                # Assume first is buy (selling), second is sell (buying)
+                prices[metal] = {"buy": pair[0], "sell": pair[1]}
+
+
+def _strategy_two_decimals(
+    tables: List[RateTable], html: str, prices: Dict[str, Dict[str, float]]
+) -> None:
+    """Strategy D: fallback over raw text for pages without usable tables.
+
+    Takes two decimals after a mention of the metal: the first within
+    ``_FALLBACK_SPAN`` characters of it and the second within as many of
+    the first. That was one lazy ``.{0,300}?`` pattern, which rescanned up
+    to 300 characters from every mention and backtracked through long runs
+    of digits. Here each search for the next decimal runs once, and at most
+    ``_FALLBACK_MAX_MENTIONS`` mentions are looked at, so a page full of
+    "gold" and stray numbers is parsed in linear time.
+    """
+    decimal = _re_fallback_decimal()
+    after: Dict[int, Optional[re.Match[str]]] = {}
+
+    def next_decimal(pos: int) -> Optional[re.Match[str]]:
+        if pos not in after:
+            after[pos] = decimal.search(html, pos)
+        return after[pos]
+
+    ahead: Optional[re.Match[str]] = None  # first decimal after the current mention
+    resume = 0  # mentions inside the last pair's span were consumed by it
+    for count, mention in enumerate(_re_metal_word().finditer(html)):
+        if count >= _FALLBACK_MAX_MENTIONS or all(metal in prices for metal in _METALS):
+            break
+        if mention.start() < resume:
+            continue
+        if ahead is None or ahead.start() < mention.end():
+            ahead = decimal.search(html, mention.end())
+            if ahead is None:
+                break
+        first: Optional[re.Match[str]] = ahead
+        while first is not None and first.start() - mention.end() <= _FALLBACK_SPAN:
+            second = next_decimal(first.end() + 1)
+            if second is not None and second.start() - first.end() <= _FALLBACK_SPAN:
+                resume = second.end()
+                metal = mention.group(1).lower()
+                if metal not in prices:
+                    prices[metal] = {"buy": _to_float(first.group()), "sell": _to_float(second.group())}
+                break
+            # The pattern went on to the next offset, which may fall inside this number
+            first = next_decimal(first.start() + 1)
+
+
+_STRATEGY_FUNCS = {
+    "A": _strategy_investment,
+    "B": _strategy_selling_buying,
+    "C": _strategy_table_cells,
+    "D": _strategy_two_decimals,
+}
+
+
+def _miga_prices(tables: List[RateTable], prices: Dict[str, Dict[str, float]]) -> None:
+    """Parse MIGA-i (Islamic Gold Account) tiers from their labelled rows."""
+    for table in tables:
+        for row in table.rows:
+            label = row.label.lower()
+            for key, marker in _MIGA_TIERS:
+                if key in prices or marker not in label:
+                    continue
+                pair = row.price_pair()
+                if pair:
+                    prices[key] = {"buy": pair[0], "sell": pair[1]}
+
+
+@dataclass(frozen=True)
+class ParseResult:
+    """Parsed prices plus the strategy that produced the gold price."""
+
+    prices: Dict[str, Dict[str, float]]
+    strategy: Optional[str]
+
+
+def order_strategies(
+    last_winner: Optional[str] = None,
+    wins: Optional[Mapping[str, int]] = None,
+) -> Tuple[str, ...]:
+    """Order strategies by recorded success: last winner first, then most wins.
+
+    Ties keep the default order and the fallback always runs last.
+    """
+    wins = wins or {}
+    cheap = [s for s in STRATEGIES if s != FALLBACK_STRATEGY]
+    cheap.sort(key=lambda s: (s != last_winner, -wins.get(s, 0), STRATEGIES.index(s)))
+    return tuple(cheap) + (FALLBACK_STRATEGY,)
+
+
+def parse_tables(
+    tables: List[RateTable],
+    html: str = "",
+    strategies: Tuple[str, ...] = STRATEGIES,
+) -> ParseResult:
+    """Apply ``strategies`` in order to an extracted table model.
+
+    Strategies stop as soon as a complete gold price is found; later
+    strategies never overwrite a metal an earlier one already filled.
+    """
+    prices: Dict[str, Dict[str, float]] = {}
+    winner: Optional[str] = None
+    for strategy in strategies:
+        _STRATEGY_FUNCS[strategy](tables, html, prices)
+        gold = prices.get("gold")
+        if gold and gold.get("buy") and gold.get("sell"):
+            winner = strategy
+            break
+    _miga_prices(tables, prices)
+    return ParseResult(prices, winner)
+
+
+def parse_prices(html: str) -> Dict[str, Dict[str, float]]:
+    """Parse metals prices from Maybank HTML.
+
+    Note: Maybank uses "Selling" for customer buy price (bank sells to you)
+    and "Buying" for customer sell price (bank buys from you).
+
+    Returns example structure:
+    {
+        'gold': {'buy': 534.14, 'sell': 513.79},
+        'silver': {'buy': 6.62, 'sell': 6.10},
+        'miga_100g': {'buy': 534.13, 'sell': 522.06},
+        'miga_below100g': {'buy': 535.88, 'sell': 521.56}
+    }
+    """
+    return parse_tables(extract_tables(html), html).prices
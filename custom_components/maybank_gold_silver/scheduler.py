@@ -0,0 +1,198 @@
+"""Adaptive poll scheduling based on when Maybank publishes new rates.
+
+Kept free of Home Assistant imports so it can be exercised offline. The
+coordinator records the time of every observed rate change and asks for the
+interval to wait before the next poll.
+"""
+from __future__ import annotations
+
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+BUCKET_MINUTES = 15
+BUCKETS = 24 * 60 // BUCKET_MINUTES
+
+# Weight kept by older observations each time a new change is recorded,
+# so the schedule follows Maybank if its publishing times drift
+DECAY = 0.97
+# Changes needed for a day type before its histogram is trusted
+MIN_OBSERVATIONS = 3.0
+# A bucket is hot when it holds at least this share of the busiest bucket
+HOT_SHARE = 0.25
+# Buckets polled densely before and after a hot bucket
+PAD_BEFORE = 1
+PAD_AFTER = 2
+
+
+def _kind(when: datetime) -> str:
+    return "weekend" if when.weekday() >= 5 else "weekday"
+
+
+def _bucket(when: datetime) -> int:
+    return (when.hour * 60 + when.minute) // BUCKET_MINUTES
+
+
+class PollScheduler:
+    """Learns publication windows and turns them into poll intervals.
+
+    Change times are kept in two decaying 15-minute histograms, one for
+    weekdays and one for weekends. Polls are ``dense`` inside learned
+    windows and stretch up to ``max_interval`` outside them. Until enough
+    changes have been seen the ``base`` interval is used unchanged. No poll
+    is scheduled inside the quiet hours.
+    """
+
+    def __init__(
+        self,
+        base: timedelta,
+        dense: timedelta = timedelta(minutes=10),
+        max_interval: timedelta = timedelta(hours=3),
+        quiet_start: Optional[time] = None,
+        quiet_end: Optional[time] = None,
+    ) -> None:
+        self.base = base
+        self.dense = dense
+        self.max_interval = max_interval
+        self.quiet_start = quiet_start
+        self.quiet_end = quiet_end
+        self._hist: Dict[str, List[float]] = {
+            "weekday": [0.0] * BUCKETS,
+            "weekend": [0.0] * BUCKETS,
+        }
+        self.changes_seen = 0
+        self.last_change: Optional[datetime] = None
+
+    # ---------- Persistence ----------
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "hist": {kind: list(values) for kind, values in self._hist.items()},
+            "changes_seen": self.changes_seen,
+            "last_change": self.last_change.isoformat() if self.last_change else None,
+        }
+
+    def restore(self, state: Optional[Dict[str, Any]]) -> None:
+        """Load state produced by ``as_dict``; malformed state is ignored."""
+        if not isinstance(state, dict):
+            return
+        hist = state.get("hist")
+        for kind in self._hist:
+            values = hist.get(kind) if isinstance(hist, dict) else None
+            if isinstance(values, list) and len(values) == BUCKETS:
+                try:
+                    self._hist[kind] = [float(v) for v in values]
+                except (TypeError, ValueError):
+                    continue
+        try:
+            self.changes_seen = int(state.get("changes_seen") or 0)
+        except (TypeError, ValueError):
+            self.changes_seen = 0
+        last = state.get("last_change")
+        try:
+            self.last_change = datetime.fromisoformat(last) if last else None
+        except (TypeError, ValueError):
+            self.last_change = None
+
+    # ---------- Learning ----------
+
+    def record_change(self, when: datetime) -> None:
+        """Record that new rates were seen at ``when`` (local time)."""
+        hist = self._hist[_kind(when)]
+        for idx, value in enumerate(hist):
+            hist[idx] = value * DECAY
+        hist[_bucket(when)] += 1.0
+        self.changes_seen += 1
+        self.last_change = when
+
+    def _learned(self, kind: str) -> bool:
+        return sum(self._hist[kind]) >= MIN_OBSERVATIONS
+
+    def _hot_buckets(self, kind: str) -> List[bool]:
+        hist = self._hist[kind]
+        threshold = max(HOT_SHARE * max(hist), 0.5)
+        hot = [False] * BUCKETS
+        for idx, value in enumerate(hist):
+            if value >= threshold:
+                for offset in range(-PAD_BEFORE, PAD_AFTER + 1):
+                    hot[(idx + offset) % BUCKETS] = True
+        return hot
+
+    def windows(self, kind: str) -> List[Tuple[str, str]]:
+        """Return learned dense-polling windows as ("HH:MM", "HH:MM") pairs."""
+        if not self._learned(kind):
+            return []
+        hot = self._hot_buckets(kind)
+        out: List[Tuple[str, str]] = []
+        idx = 0
+        while idx < BUCKETS:
+            if not hot[idx]:
+                idx += 1
+                continue
+            start = idx
+            while idx < BUCKETS and hot[idx]:
+                idx += 1
+            out.append((_fmt(start * BUCKET_MINUTES), _fmt(idx * BUCKET_MINUTES)))
+        return out
+
+    # ---------- Scheduling ----------
+
+    def in_quiet_hours(self, when: datetime) -> bool:
+        start, end = self.quiet_start, self.quiet_end
+        if start is None or end is None or start == end:
+            return False
+        now = when.time()
+        if start < end:
+            return start <= now < end
+        return now >= start or now < end
+
+    def _until_quiet_end(self, now: datetime) -> timedelta:
+        end = now.replace(
+            hour=self.quiet_end.hour, minute=self.quiet_end.minute, second=0, microsecond=0
+        )
+        if end <= now:
+            end += timedelta(days=1)
+        return end - now
+
+    def _is_hot(self, when: datetime, cache: Dict[str, List[bool]]) -> Optional[bool]:
+        """True/False for a learned day type, None when it is still unknown."""
+        kind = _kind(when)
+        if not self._learned(kind):
+            other = "weekday" if kind == "weekend" else "weekend"
+            # Rates never moved on this day type while the other is well known
+            return False if self._learned(other) else None
+        if kind not in cache:
+            cache[kind] = self._hot_buckets(kind)
+        return cache[kind][_bucket(when)]
+
+    def next_interval(self, now: datetime) -> timedelta:
+        """Return how long to wait after a poll made at ``now``."""
+        if self.in_quiet_hours(now):
+            return max(self._until_quiet_end(now), self.dense)
+        cache: Dict[str, List[bool]] = {}
+        hot = self._is_hot(now, cache)
+        if hot is None:
+            interval = self.base
+        elif hot:
+            interval = self.dense
+        else:
+            # Sleep until the next learned window starts, capped at max_interval
+            interval = self.max_interval
+            step = timedelta(minutes=BUCKET_MINUTES)
+            boundary = now.replace(second=0, microsecond=0) - timedelta(
+                minutes=now.minute % BUCKET_MINUTES
+            )
+            probe = boundary + step
+            while probe - now < self.max_interval:
+                if self._is_hot(probe, cache):
+                    interval = max(probe - now, self.dense)
+                    break
+                probe += step
+        if self.in_quiet_hours(now + interval):
+            # Poll when the quiet hours end instead of during them
+            return max(self._until_quiet_end(now), self.dense)
+        return interval
+
+
+def _fmt(minutes: int) -> str:
+    minutes %= 24 * 60
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
@@ -1,36 +1,55 @@
 from __future__ import annotations
 
-import asyncio
 import logging
-import re
+import time
 from datetime import timedelta
-from typing import Any, Dict, Optional
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Dict, Mapping, Optional
 
-from aiohttp import ClientError
-
-from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_SCAN_INTERVAL
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers import config_validation as cv
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.start import async_at_started
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
     DataUpdateCoordinator,
-    UpdateFailed,
 )
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
-from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.entity import DeviceInfo, EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-import voluptuous as vol
+from homeassistant.util import dt as dt_util
 
 from .const import (
+    CONF_ADAPTIVE_POLLING,
+    CONF_DEFER_FIRST_REFRESH,
+    CONF_PARSE_OFFLOAD_KB,
+    CONF_QUIET_END,
+    CONF_QUIET_START,
+    CONF_REQUEST_BUDGET,
+    CONF_STATISTICS_IMPORT,
+    CONF_STREAMING,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_DEFER_FIRST_REFRESH,
+    DEFAULT_PARSE_OFFLOAD_KB,
+    DEFAULT_REQUEST_BUDGET,
     DEFAULT_SCAN_INTERVAL_MINUTES,
+    DEFAULT_STATISTICS_IMPORT,
+    DEFAULT_STREAMING,
+    DERIVED_SENSOR_TYPES,
+    DIAGNOSTIC_SENSOR_TYPES,
     DOMAIN,
+    HOLDING_OPTIONS,
     SENSOR_TYPES,
+    SIGNAL_LEDGER_ACCOUNT_ADDED,
     SOURCE_URL,
-    USER_AGENT,
 )
+from .breaker import STATES as BREAKER_STATES
+from .fetcher import MaybankFetcher, async_get_fetcher
+from .holdings import price_key, value_holdings
+
+if TYPE_CHECKING:
+    from .ledger_store import StoredLedger
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -54,14 +73,24 @@ DEVICE_INFO_MIGA = DeviceInfo(
     sw_version="2.0.7",
 )
 
-PLATFORM_SCHEMA = cv.PLATFORM_SCHEMA.extend(
-    {
-        vol.Optional(
-            CONF_SCAN_INTERVAL, default=timedelta(minutes=DEFAULT_SCAN_INTERVAL_MINUTES)
-        ): vol.Any(cv.time_period, cv.positive_timedelta),
-    }
+# Valuation of the gram holdings entered in the options
+DEVICE_INFO_PORTFOLIO = DeviceInfo(
+    identifiers={(DOMAIN, "maybank_portfolio")},
+    name="Maybank Gold Portfolio",
+    manufacturer="Cikgu Saleh",
+    model="Holdings",
+    configuration_url=SOURCE_URL,
+    sw_version="2.0.7",
 )
 
+# Price sensor attributes that never change; kept out of recorder rows
+PRICE_UNRECORDED_ATTRIBUTES = frozenset({"source", "metal", "type", "help"})
+
+HOLDING_NAMES = {
+    "gold": "Gold",
+    "silver": "Silver",
+    "miga": "MIGA-i",
+}
 
 async def async_setup_platform(
     hass: HomeAssistant,
@@ -70,29 +99,10 @@ async def async_setup_platform(
     discovery_info: DiscoveryInfoType | None = None,
 ) -> None:
     """Set up the Maybank metals sensors via YAML (deprecated, use config flow)."""
-    _LOGGER.warning(
-        "Setting up Maybank Gold & Silver via YAML is deprecated. "
-        "Please use the UI configuration instead."
-    )
-    scan_interval = config.get(CONF_SCAN_INTERVAL)
-    if isinstance(scan_interval, int):
-        update_interval = timedelta(seconds=scan_interval)
-    else:
-        update_interval = scan_interval
-
-    session = async_get_clientsession(hass)
-
-    coordinator = MaybankMetalsCoordinator(hass, session, update_interval)
-    
-    # Create entities first, then refresh in background to avoid blocking setup
-    entities: list[SensorEntity] = []
-    for key, desc in SENSOR_TYPES.items():
-        entities.append(MaybankMetalPriceSensor(coordinator, key, desc))
+    # Imported here so the YAML schema is only built for YAML setups
+    from .yaml_platform import async_setup_yaml_platform
 
-    add_entities(entities)
-    
-    # Start background refresh without blocking
-    await coordinator.async_refresh()
+    await async_setup_yaml_platform(hass, config, add_entities)
 
 
 async def async_setup_entry(
@@ -101,156 +111,288 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up sensors from a config entry (UI)."""
+    setup_started = time.monotonic()
     # Reuse coordinator if already exists, otherwise create new one
     if entry.entry_id not in hass.data.setdefault(DOMAIN, {}):
-        session = async_get_clientsession(hass)
-        update_interval = timedelta(minutes=DEFAULT_SCAN_INTERVAL_MINUTES)
-        coordinator = MaybankMetalsCoordinator(hass, session, update_interval)
+        fetcher = async_get_fetcher(hass)
+        fetcher.streaming = entry.options.get(CONF_STREAMING, DEFAULT_STREAMING)
+        fetcher.import_statistics = entry.options.get(CONF_STATISTICS_IMPORT, DEFAULT_STATISTICS_IMPORT)
+        fetcher.request_budget = float(entry.options.get(CONF_REQUEST_BUDGET, DEFAULT_REQUEST_BUDGET))
+        fetcher.offload_threshold = int(entry.options.get(CONF_PARSE_OFFLOAD_KB, DEFAULT_PARSE_OFFLOAD_KB) * 1024)
+        fetcher.scheduler.quiet_start = dt_util.parse_time(entry.options.get(CONF_QUIET_START) or "")
+        fetcher.scheduler.quiet_end = dt_util.parse_time(entry.options.get(CONF_QUIET_END) or "")
+        # Give entities the last known prices before the first fetch completes
+        await fetcher.async_load_snapshot()
+        coordinator = MaybankMetalsCoordinator(
+            hass,
+            fetcher,
+            timedelta(minutes=DEFAULT_SCAN_INTERVAL_MINUTES),
+            adaptive=entry.options.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING),
+            holdings={
+                account: float(entry.options.get(option) or 0)
+                for account, option in HOLDING_OPTIONS.items()
+            },
+        )
+        entry.async_on_unload(fetcher.async_subscribe(coordinator))
         # Store coordinator for lifecycle management
         hass.data[DOMAIN][entry.entry_id] = coordinator
     else:
         coordinator = hass.data[DOMAIN][entry.entry_id]
+    # Imported here, like the YAML platform, so importing the platform
+    # doesn't load the ledger and its storage
+    from .ledger_store import async_get_ledger
+
+    ledger = await async_get_ledger(hass)
 
     # Create entities first
-    entities: list[SensorEntity] = []
-    for key, desc in SENSOR_TYPES.items():
-        entities.append(MaybankMetalPriceSensor(coordinator, key, desc))
+    async_add_entities(_build_entities(coordinator, ledger))
+
+    @callback
+    def _async_add_account(account: str) -> None:
+        async_add_entities(_pnl_entities(coordinator, ledger, account))
 
-    async_add_entities(entities)
+    entry.async_on_unload(
+        async_dispatcher_connect(hass, SIGNAL_LEDGER_ACCOUNT_ADDED, _async_add_account)
+    )
     
     _LOGGER.info("Maybank Gold & Silver: Entities added, starting background refresh")
     # Start background refresh without blocking setup
-    await coordinator.async_refresh()
-    _LOGGER.info("Maybank Gold & Silver: Initial refresh completed")
+    _async_schedule_first_refresh(
+        hass,
+        coordinator,
+        entry.options.get(CONF_DEFER_FIRST_REFRESH, DEFAULT_DEFER_FIRST_REFRESH),
+        entry,
+    )
+    coordinator.startup_stats["setup_ms"] = round((time.monotonic() - setup_started) * 1000, 1)
 
 
-class MaybankMetalsCoordinator(DataUpdateCoordinator[Dict[str, Any]]):
-    """Coordinator to fetch and parse metals prices from Maybank page."""
+def _build_entities(
+    coordinator: MaybankMetalsCoordinator, ledger: StoredLedger | None = None
+) -> list[SensorEntity]:
+    """Price sensors followed by the sensors derived from them."""
+    entities: list[SensorEntity] = []
+    for key, desc in SENSOR_TYPES.items():
+        entities.append(MaybankMetalPriceSensor(coordinator, key, desc))
+    for key, desc in DERIVED_SENSOR_TYPES.items():
+        entities.append(MaybankDerivedSensor(coordinator, key, desc))
+    for key, desc in DIAGNOSTIC_SENSOR_TYPES.items():
+        entities.append(MaybankDiagnosticSensor(coordinator, key, desc))
+    entities.append(MaybankCircuitBreakerSensor(coordinator))
+    accounts = [account for account, grams in coordinator.holdings.items() if grams]
+    if accounts:
+        for kind in ("market_value", "liquidation_value"):
+            for account in accounts:
+                entities.append(MaybankHoldingSensor(coordinator, account, kind))
+            entities.append(MaybankHoldingSensor(coordinator, None, kind))
+    if ledger is not None:
+        for account in ledger.ledger.books:
+            entities.extend(_pnl_entities(coordinator, ledger, account))
+    return entities
+
+
+def _pnl_entities(
+    coordinator: MaybankMetalsCoordinator, ledger: StoredLedger, account: str
+) -> list[SensorEntity]:
+    """Unrealized and realized P&L sensors for one ledger account."""
+    return [MaybankPnLSensor(coordinator, ledger, account, kind) for kind in ("unrealized", "realized")]
+
+
+@callback
+def _async_schedule_first_refresh(
+    hass: HomeAssistant,
+    coordinator: MaybankMetalsCoordinator,
+    defer: bool,
+    entry: ConfigEntry | None = None,
+) -> None:
+    """Run the first fetch as a background task, optionally once HA has started."""
 
-    def __init__(self, hass: HomeAssistant, session, update_interval: timedelta) -> None:
+    @callback
+    def _start(_hass: HomeAssistant) -> None:
+        name = f"{DOMAIN} first refresh"
+        if entry is not None:
+            entry.async_create_background_task(hass, coordinator.async_first_background_refresh(), name)
+        else:
+            hass.async_create_background_task(coordinator.async_first_background_refresh(), name)
+
+    if defer:
+        unsub = async_at_started(hass, _start)
+        if entry is not None:
+            entry.async_on_unload(unsub)
+    else:
+        _start(hass)
+
+
+class MaybankMetalsCoordinator(DataUpdateCoordinator[Dict[str, Any]]):
+    """Coordinator that gets metals prices from the shared fetcher."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        fetcher: MaybankFetcher,
+        update_interval: timedelta | None,
+        adaptive: bool = False,
+        holdings: Dict[str, float] | None = None,
+    ) -> None:
         super().__init__(
             hass,
             _LOGGER,
             name="Maybank Gold & Silver Prices",
             update_interval=update_interval,
+            # Notified after every refresh, even an unchanged page: the
+            # rolling statistics move on with time, and entities diff what
+            # they show before writing
+            always_update=True,
+        )
+        self.fetcher = fetcher
+        # Interval to return to once failures stop
+        self._base_interval = update_interval
+        # Take update_interval from the fetcher's learned schedule after every refresh
+        self.adaptive = adaptive
+        # Grams held per account (gold, silver, miga); empty for YAML setups
+        self.holdings: Dict[str, float] = holdings or {}
+        # Valued up front so holding sensors can write before the first fetch
+        self._valuation: Dict[str, Any] = value_holdings(self.holdings, None)
+        self._valued_data: Dict[str, Any] | None = None
+        # What entities were last notified about, and the keys that changed since
+        self._notified: tuple | None = None
+        self._changed: set[str] | None = None
+        # Entity state writes skipped because nothing they show changed
+        self.suppressed_writes = 0
+        # Price sensor attributes, rebuilt once per update and shared read-only
+        self._common_attributes: Dict[str, Any] | None = None
+        self._price_attributes: Dict[tuple[str, str], Mapping[str, Any]] = {}
+        self._price_stats: Dict[tuple[str, str], Dict[str, float]] = {}
+        # Platform setup time and how long the first background fetch took
+        self.startup_stats: Dict[str, Any] = {}
+        self._created = time.monotonic()
+
+    async def async_first_background_refresh(self) -> None:
+        """Do the first fetch off the setup path and record how long it took."""
+        started = time.monotonic()
+        self.startup_stats["first_refresh_delay_ms"] = round((started - self._created) * 1000, 1)
+        await self.async_refresh()
+        self.startup_stats["first_refresh_ms"] = round((time.monotonic() - started) * 1000, 1)
+        _LOGGER.info(
+            "Maybank Gold & Silver: Initial refresh completed in %.0f ms",
+            self.startup_stats["first_refresh_ms"],
         )
-        self._session = session
 
-    async def _async_update_data(self) -> Dict[str, Any]:
-        """Fetch data from Maybank with proper error handling."""
-        _LOGGER.debug("Maybank metals: starting fetch from source")
-        headers = {
-            "User-Agent": USER_AGENT,
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language": "en-MY,en;q=0.9",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Cache-Control": "no-cache",
-            "Pragma": "no-cache",
-            "Connection": "keep-alive",
-            "Upgrade-Insecure-Requests": "1",
-            "Referer": SOURCE_URL,
-            "Origin": "https://www.maybank2u.com.my",
-            # Browser client hints and fetch metadata to better mimic a real browser
-            "Sec-Fetch-Dest": "document",
-            "Sec-Fetch-Mode": "navigate",
-            "Sec-Fetch-Site": "same-origin",
-            "Sec-Fetch-User": "?1",
-            "sec-ch-ua": '"Chromium";v="124", "Google Chrome";v="124", ";Not A Brand";v="99"',
-            "sec-ch-ua-mobile": "?0",
-            "sec-ch-ua-platform": '"Windows"',
+    @callback
+    def async_update_listeners(self) -> None:
+        """Work out which values changed, then notify entities."""
+        derived = self.fetcher.derived
+        current = (self.data, derived, self.last_update_success, self.fetcher.restored)
+        previous, self._notified = self._notified, current
+        if previous is None or previous[2:] != current[2:]:
+            # Availability or the restored flag changed: every entity writes
+            self._changed = None
+        else:
+            old_data, old_derived = previous[0] or {}, previous[1]
+            data = self.data or {}
+            self._changed = {
+                f"{metal}.{field}"
+                for metal in set(data) | set(old_data)
+                for field in ("buy", "sell")
+                if (data.get(metal) or {}).get(field) != (old_data.get(metal) or {}).get(field)
+            }
+            self._changed.update(key for key in derived if derived.get(key) != old_derived.get(key))
+        self._common_attributes = None
+        self._price_attributes = {}
+        self._price_stats = {}
+        super().async_update_listeners()
+
+    def _build_common_attributes(self) -> Dict[str, Any]:
+        """Attributes every price sensor shares for the current update."""
+        attrs: Dict[str, Any] = {
+            "last_update_success": self.last_update_success,
+            "last_error": self.hass.data.get(DOMAIN, {}).get("last_error") or "None",
         }
-        
-        try:
-            async with self._session.get(SOURCE_URL, headers=headers, timeout=30, allow_redirects=True) as resp:
-                if resp.status != 200:
-                    _LOGGER.error("Maybank metals: HTTP status %s", resp.status)
-                    raise UpdateFailed(f"HTTP {resp.status}")
-                # Enforce that the final URL is still the Maybank page we were told to use
-                final_url = resp.url
-                final_host = getattr(final_url, "host", "")
-                final_path = getattr(final_url, "path", "")
-                # Allow any subdomain of maybank2u.com.my (e.g., www, origin variations) and flexible path
-                if not final_host.endswith("maybank2u.com.my") or "gold_and_silver" not in final_path:
-                    raise UpdateFailed(
-                        f"Unexpected redirect to {final_url}; refusing to parse as per user requirement"
-                    )
-                _LOGGER.debug("Maybank metals: fetching from %s (status %s)", final_url, resp.status)
-                html = await resp.text()
-                _LOGGER.debug("Maybank metals: fetched %d chars of HTML", len(html))
-        except UpdateFailed:
-            # Re-raise UpdateFailed as-is
-            raise
-        except (asyncio.TimeoutError, ClientError) as err:
-            # Retry once with SSL verification disabled, only for the strict Maybank host
-            _LOGGER.info("Maybank metals: request error on first attempt: %s, retrying with SSL disabled", err)
-            self.hass.data.setdefault(DOMAIN, {})["last_error"] = f"request_error: {err}"
-            try:
-                async with self._session.get(
-                    SOURCE_URL,
-                    headers=headers,
-                    timeout=30,
-                    allow_redirects=True,
-                    ssl=False,
-                ) as resp:
-                    if resp.status != 200:
-                        _LOGGER.error("Maybank metals: HTTP status (ssl=False) %s", resp.status)
-                        raise UpdateFailed(f"HTTP {resp.status}")
-                    final_url = resp.url
-                    final_host = getattr(final_url, "host", "")
-                    final_path = getattr(final_url, "path", "")
-                    if not final_host.endswith("maybank2u.com.my") or "gold_and_silver" not in final_path:
-                        raise UpdateFailed(
-                            f"Unexpected redirect to {final_url} (ssl=False); refusing to parse as per user requirement"
-                        )
-                    _LOGGER.debug("Maybank metals: retry (ssl=False) from %s (status %s)", final_url, resp.status)
-                    html = await resp.text()
-                    _LOGGER.debug("Maybank metals: fetched %d chars of HTML (ssl=False)", len(html))
-            except Exception as err2:  # any failure in retry
-                msg = f"request_error_retry: {err2}"
-                self.hass.data.setdefault(DOMAIN, {})["last_error"] = msg
-                _LOGGER.error("Maybank metals: request error on retry: %s", err2)
-                raise UpdateFailed(f"Request error: {err2}") from err2
-        except Exception as err:
-            # Catch-all to prevent any unhandled exception from crashing HA
-            msg = f"Unexpected error: {type(err).__name__}: {err}"
-            self.hass.data.setdefault(DOMAIN, {})["last_error"] = msg
-            _LOGGER.error("Maybank metals: %s", msg)
-            raise UpdateFailed(msg) from err
-        
+        prices_as_of = self.fetcher.prices_as_of
+        if prices_as_of:
+            attrs["prices_as_of"] = prices_as_of.isoformat()
+        if self.fetcher.restored:
+            # Values come from the saved snapshot until the first live fetch
+            attrs["restored_from_snapshot"] = True
+            if prices_as_of:
+                age = self.fetcher.utcnow() - prices_as_of
+                attrs["snapshot_age_minutes"] = round(age.total_seconds() / 60)
+        return attrs
+
+    def price_attributes(self, metal: str, field: str) -> Mapping[str, Any]:
+        """Read-only attributes for one price sensor, built once per update."""
+        cached = self._price_attributes.get((metal, field))
+        if cached is not None:
+            return cached
+        if self._common_attributes is None:
+            self._common_attributes = self._build_common_attributes()
+        attrs: Dict[str, Any] = {"source": SOURCE_URL, "metal": metal, "type": field}
+        attrs.update(self._common_attributes)
+        attrs.update(self.price_stats(metal, field))
+        if not (self.data or {}).get(metal):
+            # Add diagnostic info when unavailable
+            attrs["status"] = "unavailable"
+            attrs["help"] = "Check HA logs for 'maybank_gold_silver' errors"
+        cached = self._price_attributes[(metal, field)] = MappingProxyType(attrs)
+        return cached
+
+    def price_stats(self, metal: str, field: str) -> Dict[str, float]:
+        """Rolling min/max/mean for one price, e.g. min_24h, max_7d, mean_30d, once per update."""
+        stats = self._price_stats.get((metal, field))
+        if stats is None:
+            now = self.fetcher.utcnow().timestamp()
+            stats = self._price_stats[(metal, field)] = self.fetcher.history.stats(metal, field, now)
+        return stats
+
+    @callback
+    def should_write(self, key: str) -> bool:
+        """Whether the entity showing ``key`` needs a state write for this update."""
+        if self._changed is None or key in self._changed:
+            return True
+        self.suppressed_writes += 1
+        return False
+
+    @callback
+    def should_write_shown(self, shown: tuple, current: tuple) -> bool:
+        """Whether an entity that last wrote ``shown`` needs a write to show ``current``.
+
+        For entities computed from several prices, which diff their own value
+        and attributes instead of looking up one changed key.
+        """
+        if self._changed is None or shown != current:
+            return True
+        self.suppressed_writes += 1
+        return False
+
+    @property
+    def valuation(self) -> Dict[str, Any]:
+        """All positions valued against the current prices, once per snapshot."""
+        if self._valued_data is not self.data:
+            self._valuation = value_holdings(self.holdings, self.data)
+            self._valued_data = self.data
+        return self._valuation
+
+    async def _async_update_data(self) -> Dict[str, Any]:
+        """Fetch data, then let the scheduler or the failure backoff pick the next poll time."""
         try:
-            _LOGGER.debug("Maybank metals: parsing HTML for prices (length: %d)", len(html))
-            prices = _parse_prices(html)
-            if not prices:
-                # Log a small sanitized snippet to help troubleshoot without spamming logs
-                snippet = re.sub(r"\s+", " ", html)[:1000]
-                self.hass.data.setdefault(DOMAIN, {})["last_error"] = "parse_failed"
-                _LOGGER.error(
-                    "Maybank metals parsing returned no data. First 1000 chars: %s",
-                    snippet,
-                )
-                # Also log if we can find gold/silver keywords
-                if 'gold' in html.lower():
-                    idx = html.lower().find('gold')
-                    context = html[max(0, idx-100):idx+300]
-                    _LOGGER.error("Found 'gold' at position %d, context: %s", idx, context[:400])
-                raise UpdateFailed("Failed to parse metals prices from Maybank page")
-            self.hass.data.setdefault(DOMAIN, {})["last_error"] = None
-            _LOGGER.info("Maybank metals: successfully parsed prices %s", prices)
-            return prices
-        except UpdateFailed:
-            raise
-        except Exception as err:
-            # Catch parsing errors
-            msg = f"Parse error: {type(err).__name__}: {err}"
-            self.hass.data.setdefault(DOMAIN, {})["last_error"] = msg
-            _LOGGER.error("Maybank metals: %s", msg)
-            raise UpdateFailed(msg) from err
+            return await self.fetcher.async_fetch(self)
+        finally:
+            interval = self._base_interval
+            if self.adaptive:
+                interval = self.fetcher.scheduler.next_interval(dt_util.as_local(self.fetcher.utcnow()))
+            retry_in = self.fetcher.breaker.retry_in(time.monotonic())
+            # No interval means refreshes are only ever requested, never scheduled
+            if retry_in is not None and interval is not None:
+                # Never poll sooner than usual, only later while failures continue
+                interval = max(interval, timedelta(seconds=retry_in))
+            self.update_interval = interval
+            _LOGGER.debug("Maybank metals: next poll in %s", self.update_interval)
 
 
 class MaybankMetalPriceSensor(CoordinatorEntity[MaybankMetalsCoordinator], SensorEntity):
     """Sensor entity representing one metal price (buy/sell)."""
 
     _attr_has_entity_name = True
+    _unrecorded_attributes = PRICE_UNRECORDED_ATTRIBUTES
 
     def __init__(self, coordinator: MaybankMetalsCoordinator, key: str, desc: Dict[str, Any]) -> None:
         super().__init__(coordinator)
@@ -261,7 +403,10 @@ class MaybankMetalPriceSensor(CoordinatorEntity[MaybankMetalsCoordinator], Senso
         self._attr_name = desc["name"]
         self._attr_icon = desc.get("icon")
         self._attr_native_unit_of_measurement = desc.get("unit", "MYR/g")
-        self._attr_state_class = SensorStateClass.MEASUREMENT
+        if not coordinator.fetcher.import_statistics:
+            # With statistics import on, hourly statistics come from the
+            # fetcher instead of being compiled from this sensor's states
+            self._attr_state_class = SensorStateClass.MEASUREMENT
         self._attr_unique_id = f"{DOMAIN}_{self._metal}_{self._field}"
         
         # Assign device based on sensor type
@@ -272,6 +417,18 @@ class MaybankMetalPriceSensor(CoordinatorEntity[MaybankMetalsCoordinator], Senso
             self._attr_device_info = DEVICE_INFO_REGULAR
             
         self._attr_suggested_display_precision = 2
+        # Rolling statistics as of the last state write
+        self._shown_stats = coordinator.price_stats(self._metal, self._field)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when this sensor's price, statistics or availability changed."""
+        stats = self.coordinator.price_stats(self._metal, self._field)
+        # The windows slide while the price stands still, so the statistics
+        # can change without this sensor's key changing
+        if stats != self._shown_stats or self.coordinator.should_write(f"{self._metal}.{self._field}"):
+            self._shown_stats = stats
+            self.async_write_ha_state()
 
     @property
     def native_value(self) -> Optional[float]:
@@ -288,164 +445,205 @@ class MaybankMetalPriceSensor(CoordinatorEntity[MaybankMetalsCoordinator], Senso
             return None
 
     @property
-    def extra_state_attributes(self) -> Dict[str, Any] | None:
-        data = self.coordinator.data or {}
-        metal_data = data.get(self._metal)
-        last_error = self.hass.data.get(DOMAIN, {}).get("last_error")
-        
-        base_attrs = {
-            "source": SOURCE_URL,
-            "metal": self._metal,
-            "type": self._field,
-            "last_update_success": self.coordinator.last_update_success,
-            "last_error": last_error or "None",
+    def extra_state_attributes(self) -> Mapping[str, Any]:
+        return self.coordinator.price_attributes(self._metal, self._field)
+
+
+class MaybankDerivedSensor(CoordinatorEntity[MaybankMetalsCoordinator], SensorEntity):
+    """Spread, tier premium or ratio computed by the fetcher from the latest prices."""
+
+    _attr_has_entity_name = True
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 2
+
+    def __init__(self, coordinator: MaybankMetalsCoordinator, key: str, desc: Dict[str, Any]) -> None:
+        super().__init__(coordinator)
+        self._key = key
+        self._attr_name = desc["name"]
+        self._attr_icon = desc.get("icon")
+        self._attr_native_unit_of_measurement = desc.get("unit")
+        self._attr_unique_id = f"{DOMAIN}_{key}"
+        if desc.get("device") == "miga":
+            self._attr_device_info = DEVICE_INFO_MIGA
+        else:
+            self._attr_device_info = DEVICE_INFO_REGULAR
+        self._attr_native_value = coordinator.fetcher.derived.get(key)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when this value or availability changed."""
+        if self.coordinator.should_write(self._key):
+            self._attr_native_value = self.coordinator.fetcher.derived.get(self._key)
+            self.async_write_ha_state()
+
+
+class MaybankHoldingSensor(CoordinatorEntity[MaybankMetalsCoordinator], SensorEntity):
+    """Market or liquidation value of one holding, or of the whole portfolio."""
+
+    _attr_has_entity_name = True
+    _attr_device_class = SensorDeviceClass.MONETARY
+    _attr_native_unit_of_measurement = "MYR"
+    _attr_suggested_display_precision = 2
+    _attr_device_info = DEVICE_INFO_PORTFOLIO
+
+    def __init__(self, coordinator: MaybankMetalsCoordinator, account: str | None, kind: str) -> None:
+        super().__init__(coordinator)
+        self._account = account
+        self._kind = kind
+        label = "Market Value" if kind == "market_value" else "Liquidation Value"
+        if account is None:
+            self._attr_name = f"Portfolio {label}"
+            self._attr_icon = "mdi:briefcase-variant"
+            self._attr_unique_id = f"{DOMAIN}_portfolio_{kind}"
+        else:
+            self._attr_name = f"{HOLDING_NAMES[account]} {label}"
+            self._attr_icon = "mdi:gold"
+            self._attr_unique_id = f"{DOMAIN}_holding_{account}_{kind}"
+        self._attr_native_value, self._attr_extra_state_attributes = self._current()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when the value, its attributes or availability changed."""
+        current = self._current()
+        shown = (self._attr_native_value, self._attr_extra_state_attributes)
+        if self.coordinator.should_write_shown(shown, current):
+            self._attr_native_value, self._attr_extra_state_attributes = current
+            self.async_write_ha_state()
+
+    def _current(self) -> tuple[Optional[float], Dict[str, Any] | None]:
+        valuation = self.coordinator.valuation
+        if self._account is None:
+            grams = {account: position["grams"] for account, position in valuation["positions"].items()}
+            return valuation.get(self._kind), {"grams": grams}
+        position = valuation["positions"].get(self._account)
+        if not position:
+            return None, None
+        price_field = "buy_price" if self._kind == "market_value" else "sell_price"
+        return position[self._kind], {
+            "grams": position["grams"],
+            "tier": position["tier"],
+            "price_per_gram": position[price_field],
         }
-        
-        if not metal_data:
-            # Add diagnostic info when unavailable
-            base_attrs["status"] = "unavailable"
-            base_attrs["help"] = "Check HA logs for 'maybank_gold_silver' errors"
-            return base_attrs
-            
-        return base_attrs
 
 
-# ---------- Parsing helpers ----------
+class MaybankPnLSensor(CoordinatorEntity[MaybankMetalsCoordinator], SensorEntity):
+    """Unrealized or realized P&L of one ledger account (FIFO; average cost in attributes)."""
 
-# Optimized regex patterns based on actual Maybank HTML structure
-# Strategy A: Maybank-specific pattern for "Investment Account"
-_RE_MAYBANK_INVESTMENT = re.compile(
-    r"(Gold|Silver)\s+Investment\s+Account.*?<td>(\d+\.\d{2})</td><td>(\d+\.\d{2})</td>",
-    re.IGNORECASE | re.DOTALL
-)
+    _attr_has_entity_name = True
+    _attr_device_class = SensorDeviceClass.MONETARY
+    _attr_native_unit_of_measurement = "MYR"
+    _attr_suggested_display_precision = 2
+    _attr_device_info = DEVICE_INFO_PORTFOLIO
+
+    def __init__(
+        self,
+        coordinator: MaybankMetalsCoordinator,
+        ledger: StoredLedger,
+        account: str,
+        kind: str,
+    ) -> None:
+        super().__init__(coordinator)
+        self._ledger = ledger
+        self._account = account
+        self._kind = kind
+        label = "Unrealized P&L" if kind == "unrealized" else "Realized P&L"
+        self._attr_name = f"{HOLDING_NAMES[account]} {label}"
+        self._attr_icon = "mdi:chart-line" if kind == "unrealized" else "mdi:cash-check"
+        self._attr_unique_id = f"{DOMAIN}_ledger_{account}_{kind}"
+        self._attr_native_value, self._attr_extra_state_attributes = self._current()
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self._ledger.async_add_listener(self._handle_coordinator_update))
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when the P&L, its attributes or availability changed.
+
+        Also called when a transaction is recorded.
+        """
+        current = self._current()
+        shown = (self._attr_native_value, self._attr_extra_state_attributes)
+        if self.coordinator.should_write_shown(shown, current):
+            self._attr_native_value, self._attr_extra_state_attributes = current
+            self.async_write_ha_state()
+
+    def _current(self) -> tuple[Optional[float], Dict[str, Any]]:
+        book = self._ledger.ledger.books[self._account]
+        data = self.coordinator.data or {}
+        # Unrealized P&L is what selling everything would bring back
+        bid = (data.get(price_key(self._account, book.grams)) or {}).get("sell")
+        summary = book.summary(float(bid) if bid is not None else None)
+        if self._kind == "realized":
+            attrs = {"realized_average": summary["realized_average"]}
+        else:
+            attrs = {key: value for key, value in summary.items() if not key.startswith("realized")}
+        return summary[f"{self._kind}_fifo"], attrs
 
-# Strategy B: Generic table pattern with Selling/Buying headers
-_RE_SELLING_BUYING = re.compile(
-    r"\b(Gold|Silver)\b.*?Selling.*?Buying.*?<td>(\d+\.\d{2})</td><td>(\d+\.\d{2})</td>",
-    re.IGNORECASE | re.DOTALL
-)
 
-# Strategy C: Simple two consecutive numbers in table cells
-_RE_TABLE_CELLS = re.compile(
-    r"\b(Gold|Silver)\b.*?<td>(\d+\.\d{2})</td>\s*<td>(\d+\.\d{2})</td>",
-    re.IGNORECASE | re.DOTALL
-)
+class MaybankDiagnosticSensor(SensorEntity):
+    """One fetch/parse metric; updated after every request, not only on new prices."""
 
-# Strategy D: Fallback - any two decimal numbers after metal name
-_RE_TWO_DECIMALS = re.compile(
-    r"\b(Gold|Silver)\b.{0,300}?(\d+\.\d{2}).{1,300}?(\d+\.\d{2})",
-    re.IGNORECASE | re.DOTALL
-)
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_device_info = DEVICE_INFO_REGULAR
 
-# MIGA-i patterns
-_RE_MIGA_100G = re.compile(
-    r"For 100 grams and above.*?<td>(\d+\.\d{2})</td><td>(\d+\.\d{2})</td>",
-    re.IGNORECASE | re.DOTALL
-)
+    def __init__(self, coordinator: MaybankMetalsCoordinator, key: str, desc: Dict[str, Any]) -> None:
+        self._fetcher = coordinator.fetcher
+        self._key = key
+        self._attr_name = desc["name"]
+        self._attr_icon = desc.get("icon")
+        self._attr_unique_id = f"{DOMAIN}_diagnostic_{key}"
+        unit = desc.get("unit")
+        self._attr_native_unit_of_measurement = unit
+        if unit == "ms":
+            self._attr_device_class = SensorDeviceClass.DURATION
+        elif unit == "B":
+            self._attr_device_class = SensorDeviceClass.DATA_SIZE
+        if desc.get("counter"):
+            self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+        elif unit:
+            self._attr_state_class = SensorStateClass.MEASUREMENT
+
+    async def async_added_to_hass(self) -> None:
+        # Only enabled sensors get here, so disabled ones add no listener at all
+        self.async_on_remove(self._fetcher.async_add_metrics_listener(self.async_write_ha_state))
 
-_RE_MIGA_BELOW100G = re.compile(
-    r"For below 100 grams.*?<td>(\d+\.\d{2})</td><td>(\d+\.\d{2})</td>",
-    re.IGNORECASE | re.DOTALL
-)
+    @property
+    def native_value(self) -> Any:
+        return self._fetcher.metrics.get(self._key)
 
 
-def _to_float(val: str) -> float:
-    return float(val.replace(",", "").strip())
+class MaybankCircuitBreakerSensor(SensorEntity):
+    """State of the fetch circuit breaker, for automations to react to a failing site."""
 
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_options = list(BREAKER_STATES)
+    _attr_device_info = DEVICE_INFO_REGULAR
+    _attr_name = "Circuit Breaker"
+    _attr_icon = "mdi:electric-switch"
+    _attr_unique_id = f"{DOMAIN}_circuit_breaker"
 
-def _parse_prices(html: str) -> Dict[str, Dict[str, float]]:
-    """Parse metals prices from Maybank HTML.
-    
-    Note: Maybank uses "Selling" for customer buy price (bank sells to you)
-    and "Buying" for customer sell price (bank buys from you).
-
-    Returns example structure:
-    {
-        'gold': {'buy': 534.14, 'sell': 513.79},
-        'silver': {'buy': 6.62, 'sell': 6.10},
-        'miga_100g': {'buy': 534.13, 'sell': 522.06},
-        'miga_below100g': {'buy': 535.88, 'sell': 521.56}
-    }
-    """
-    prices: Dict[str, Dict[str, float]] = {
-        "gold": {}, 
-        "silver": {},
-        "miga_100g": {},
-        "miga_below100g": {}
-    }
-
-    # Strategy A: Maybank-specific "Investment Account" pattern (most reliable)
-    for m in _RE_MAYBANK_INVESTMENT.finditer(html):
-        metal = m.group(1).lower()
-        selling = m.group(2)  # Bank sells to customer (customer buy price)
-        buying = m.group(3)   # Bank buys from customer (customer sell price)
-        if selling and buying:
-            try:
-                prices[metal]["buy"] = _to_float(selling)
-                prices[metal]["sell"] = _to_float(buying)
-            except (ValueError, AttributeError):
-                pass
-    
-    # Strategy B: Generic Selling/Buying pattern (only if Strategy A didn't find gold)
-    if not (prices["gold"].get("buy") and prices["gold"].get("sell")):
-        for m in _RE_SELLING_BUYING.finditer(html):
-            metal = m.group(1).lower()
-            selling = m.group(2)
-            buying = m.group(3)
-            if selling and buying:
-                try:
-                    prices[metal]["buy"] = _to_float(selling)
-                    prices[metal]["sell"] = _to_float(buying)
-                except (ValueError, AttributeError):
-                    pass
-    
-    # Strategy C: Table cells pattern (only if still no gold data)
-    if not (prices["gold"].get("buy") and prices["gold"].get("sell")):
-        for m in _RE_TABLE_CELLS.finditer(html):
-            metal = m.group(1).lower()
-            first = m.group(2)
-            second = m.group(3)
-            if first and second and "buy" not in prices[metal]:
-                try:
-                    # Assume first is buy (selling), second is sell (buying)
-                    prices[metal]["buy"] = _to_float(first)
-                    prices[metal]["sell"] = _to_float(second)
-                except (ValueError, AttributeError):
-                    pass
-
-    # Strategy D: Fallback - two decimal numbers (only if still no gold data)
-    if not (prices["gold"].get("buy") and prices["gold"].get("sell")):
-        for m in _RE_TWO_DECIMALS.finditer(html):
-            metal = m.group(1).lower()
-            first = m.group(2)
-            second = m.group(3)
-            if first and second and "buy" not in prices[metal]:
-                try:
-                    prices[metal]["buy"] = _to_float(first)
-                    prices[metal]["sell"] = _to_float(second)
-                except (ValueError, AttributeError):
-                    pass
-
-    # Parse MIGA-i prices (Islamic Gold Account)
-    match_100g = _RE_MIGA_100G.search(html)
-    if match_100g:
-        try:
-            prices["miga_100g"]["buy"] = _to_float(match_100g.group(1))
-            prices["miga_100g"]["sell"] = _to_float(match_100g.group(2))
-        except (ValueError, AttributeError):
-            pass
-    
-    match_below100g = _RE_MIGA_BELOW100G.search(html)
-    if match_below100g:
-        try:
-            prices["miga_below100g"]["buy"] = _to_float(match_below100g.group(1))
-            prices["miga_below100g"]["sell"] = _to_float(match_below100g.group(2))
-        except (ValueError, AttributeError):
-            pass
+    def __init__(self, coordinator: MaybankMetalsCoordinator) -> None:
+        self._fetcher = coordinator.fetcher
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(self._fetcher.async_add_metrics_listener(self.async_write_ha_state))
 
-    # Validate and clean up - only remove if completely empty
-    for metal in list(prices.keys()):
-        if not prices[metal].get("buy") and not prices[metal].get("sell"):
-            prices.pop(metal, None)
+    @property
+    def native_value(self) -> str:
+        return self._fetcher.breaker.state
 
-    return prices
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        next_attempt = self._fetcher.next_attempt
+        return {
+            "consecutive_failures": self._fetcher.breaker.failures,
+            "next_attempt": next_attempt.isoformat() if next_attempt else None,
+            "trips": self._fetcher.breaker.trips,
+        }
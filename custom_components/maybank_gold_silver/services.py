@@ -0,0 +1,83 @@
+"""Transaction ledger services.
+
+Imported by ``async_setup`` only, so the service schema isn't built on the
+sensor platform's import path; the stored ledger itself is in
+``ledger_store``.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, SIGNAL_LEDGER_ACCOUNT_ADDED
+from .holdings import price_key
+from .ledger import ACCOUNTS, KINDS
+from .ledger_store import async_get_ledger
+
+SERVICE_RECORD_TRANSACTION = "record_transaction"
+
+ATTR_ACCOUNT = "account"
+ATTR_TYPE = "type"
+ATTR_GRAMS = "grams"
+ATTR_PRICE = "price_per_gram"
+ATTR_TIMESTAMP = "timestamp"
+
+RECORD_TRANSACTION_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ACCOUNT): vol.In(ACCOUNTS),
+        vol.Required(ATTR_TYPE): vol.In(KINDS),
+        vol.Required(ATTR_GRAMS): vol.All(vol.Coerce(float), vol.Range(min=0, min_included=False)),
+        vol.Optional(ATTR_PRICE): vol.All(vol.Coerce(float), vol.Range(min=0, min_included=False)),
+        vol.Optional(ATTR_TIMESTAMP): cv.datetime,
+    }
+)
+
+
+def _current_price(hass: HomeAssistant, account: str, kind: str, grams: float) -> Optional[float]:
+    """Price Maybank quotes right now for this trade, if prices are known."""
+    fetcher = hass.data.get(DOMAIN, {}).get("fetcher")
+    data: Dict[str, Any] = (fetcher.data if fetcher is not None else None) or {}
+    metal = data.get(price_key(account, grams)) or {}
+    return metal.get("buy" if kind == "buy" else "sell")
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the ledger services."""
+
+    async def _record_transaction(call: ServiceCall) -> None:
+        account = call.data[ATTR_ACCOUNT]
+        kind = call.data[ATTR_TYPE]
+        grams = call.data[ATTR_GRAMS]
+        price = call.data.get(ATTR_PRICE)
+        if price is None:
+            price = _current_price(hass, account, kind, grams)
+            if price is None:
+                raise ServiceValidationError(
+                    "No current Maybank price is available; pass price_per_gram"
+                )
+        # A timestamp without a UTC offset is local time
+        when = dt_util.as_local(call.data.get(ATTR_TIMESTAMP) or dt_util.now())
+        stored = await async_get_ledger(hass)
+        new_account = account not in stored.ledger.books
+        try:
+            stored.async_record(account, kind, grams, float(price), when.isoformat())
+        except ValueError as err:
+            raise ServiceValidationError(str(err)) from err
+        if new_account:
+            # Sensor platforms add the P&L sensors for an account that had no transactions
+            async_dispatcher_send(hass, SIGNAL_LEDGER_ACCOUNT_ADDED, account)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RECORD_TRANSACTION,
+        _record_transaction,
+        schema=RECORD_TRANSACTION_SCHEMA,
+    )
@@ -0,0 +1,85 @@
+"""Deprecated YAML setup of the sensor platform.
+
+Imported by ``sensor.async_setup_platform`` only when a ``sensor:`` entry in
+configuration.yaml names this platform, so UI-configured installs never
+build the YAML schema. Because the schema isn't on the sensor module, Home
+Assistant checks the entry against the generic sensor platform schema, and
+it is validated here.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from datetime import timedelta
+
+import voluptuous as vol
+
+from homeassistant.const import CONF_SCAN_INTERVAL
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import ConfigType
+
+from .const import (
+    CONF_DEFER_FIRST_REFRESH,
+    CONF_STREAMING,
+    DEFAULT_DEFER_FIRST_REFRESH,
+    DEFAULT_SCAN_INTERVAL_MINUTES,
+    DEFAULT_STREAMING,
+)
+from .fetcher import async_get_fetcher
+from .sensor import MaybankMetalsCoordinator, _async_schedule_first_refresh, _build_entities
+
+_LOGGER = logging.getLogger(__name__)
+
+PLATFORM_SCHEMA = cv.PLATFORM_SCHEMA.extend(
+    {
+        vol.Optional(
+            CONF_SCAN_INTERVAL, default=timedelta(minutes=DEFAULT_SCAN_INTERVAL_MINUTES)
+        ): vol.Any(cv.time_period, cv.positive_timedelta),
+        vol.Optional(CONF_STREAMING, default=DEFAULT_STREAMING): cv.boolean,
+        vol.Optional(CONF_DEFER_FIRST_REFRESH, default=DEFAULT_DEFER_FIRST_REFRESH): cv.boolean,
+    }
+)
+
+
+async def async_setup_yaml_platform(
+    hass: HomeAssistant,
+    config: ConfigType,
+    add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the Maybank metals sensors via YAML (deprecated, use config flow)."""
+    setup_started = time.monotonic()
+    _LOGGER.warning(
+        "Setting up Maybank Gold & Silver via YAML is deprecated. "
+        "Please use the UI configuration instead."
+    )
+    try:
+        config = PLATFORM_SCHEMA(config)
+    except vol.Invalid as err:
+        _LOGGER.error("Invalid Maybank Gold & Silver YAML configuration: %s", err)
+        return
+    scan_interval = config.get(CONF_SCAN_INTERVAL)
+    if isinstance(scan_interval, int):
+        update_interval = timedelta(seconds=scan_interval)
+    else:
+        update_interval = scan_interval
+
+    fetcher = async_get_fetcher(hass)
+    if not fetcher.subscriber_count:
+        # Config entry options take precedence once an entry is set up
+        fetcher.streaming = config.get(CONF_STREAMING, DEFAULT_STREAMING)
+    # Give entities the last known prices before the first fetch completes
+    await fetcher.async_load_snapshot()
+
+    coordinator = MaybankMetalsCoordinator(hass, fetcher, update_interval)
+    fetcher.async_subscribe(coordinator)
+
+    # Create entities first, then refresh in background to avoid blocking setup
+    add_entities(_build_entities(coordinator))
+
+    # Start background refresh without blocking
+    _async_schedule_first_refresh(
+        hass, coordinator, config.get(CONF_DEFER_FIRST_REFRESH, DEFAULT_DEFER_FIRST_REFRESH)
+    )
+    coordinator.startup_stats["setup_ms"] = round((time.monotonic() - setup_started) * 1000, 1)
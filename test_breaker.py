@@ -0,0 +1,53 @@
+"""Test the fetch backoff and circuit breaker with a fake clock."""
+
+from conftest import load_component_module, run_tests
+
+breaker = load_component_module("breaker")
+
+
+def _breaker(jitter=0.0):
+    return breaker.CircuitBreaker(threshold=3, base=60.0, cap=600.0, rng=lambda: jitter)
+
+
+def test_backoff_doubles_with_jitter_and_cap():
+    low, high = _breaker(0.0), _breaker(1.0)
+    assert [low.backoff(n) for n in range(1, 6)] == [30.0, 60.0, 120.0, 240.0, 300.0]
+    assert [high.backoff(n) for n in range(1, 6)] == [60.0, 120.0, 240.0, 480.0, 600.0]
+
+
+def test_opens_after_threshold_and_refuses():
+    cb = _breaker()
+    now = 0.0
+    for _ in range(2):
+        assert cb.allow(now)
+        cb.record_failure(now)
+    assert cb.state == breaker.CLOSED
+    assert cb.allow(now)
+    delay = cb.record_failure(now)
+    assert cb.state == breaker.OPEN and cb.trips == 1
+    assert not cb.allow(now + delay - 1)
+    assert cb.refused == 1
+    assert cb.retry_in(now + delay - 1) == 1.0
+
+
+def test_half_open_lets_one_probe_through():
+    cb = _breaker()
+    for _ in range(3):
+        cb.record_failure(0.0)
+    later = cb.retry_at
+    assert cb.allow(later)
+    assert cb.state == breaker.HALF_OPEN
+    # A second caller while the probe is in flight is refused
+    assert not cb.allow(later)
+    # A failed probe opens the breaker again, for longer
+    delay = cb.record_failure(later)
+    assert cb.state == breaker.OPEN and delay == cb.backoff(4)
+    assert cb.trips == 1
+    assert cb.allow(cb.retry_at)
+    cb.record_success()
+    assert cb.state == breaker.CLOSED and cb.failures == 0
+    assert cb.retry_in(0.0) is None
+    assert cb.as_dict(0.0)["state"] == "closed"
+
+
+run_tests(globals())
@@ -0,0 +1,43 @@
+"""Test the derived spread, tier premium and ratio values."""
+from pathlib import Path
+
+from conftest import load_component_module, run_tests
+
+derived = load_component_module("derived")
+
+PRICES = {
+    "gold": {"buy": 534.14, "sell": 513.79},
+    "silver": {"buy": 6.62, "sell": 6.10},
+    "miga_100g": {"buy": 534.13, "sell": 522.06},
+    "miga_below100g": {"buy": 535.88, "sell": 521.56},
+}
+
+
+def test_full_snapshot():
+    values = derived.compute_derived(PRICES)
+    assert values == {
+        "miga_3_spread_100g_plus": 12.07,
+        "miga_4_spread_below_100g": 14.32,
+        "miga_5_tier_premium_buy": 1.75,
+        "miga_6_tier_premium_sell": 0.5,
+        "gold_spread": 20.35,
+        "silver_spread": 0.52,
+        "gold_silver_ratio": 82.38,
+    }, values
+
+
+def test_missing_inputs():
+    values = derived.compute_derived({"gold": PRICES["gold"]})
+    assert values["gold_spread"] == 20.35
+    assert values["gold_silver_ratio"] is None
+    assert values["miga_5_tier_premium_buy"] is None
+    assert set(derived.compute_derived(None).values()) == {None}
+
+
+def test_keys_match_sensor_types():
+    text = (Path(__file__).parent / "custom_components" / "maybank_gold_silver" / "const.py").read_text()
+    for key in derived.compute_derived(PRICES):
+        assert f'"{key}"' in text, key
+
+
+run_tests(globals())
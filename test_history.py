@@ -0,0 +1,117 @@
+"""Test the price history ring buffer against a brute-force reference."""
+import random
+
+from conftest import load_component_module, run_tests
+
+history = load_component_module("history")
+
+HOUR = 3600.0
+DAY = 24 * HOUR
+
+
+def _reference(samples, length, now):
+    """Min/max/time-weighted mean recomputed from scratch."""
+    cutoff = now - length
+    carry = None
+    inside = []
+    for ts, value in samples:
+        if ts <= cutoff:
+            carry = value
+        else:
+            inside.append((ts, value))
+    if not inside:
+        if carry is None:
+            return None
+        return {"min": carry, "max": carry, "mean": carry}
+    values = [v for _, v in inside] + ([carry] if carry is not None else [])
+    points = ([(cutoff, carry)] if carry is not None else []) + inside
+    area = sum(v * (points[i + 1][0] - t) for i, (t, v) in enumerate(points[:-1]))
+    area += points[-1][1] * (now - points[-1][0])
+    span = now - points[0][0]
+    mean = area / span if span > 0 else points[-1][1]
+    return {"min": min(values), "max": max(values), "mean": round(mean, 2)}
+
+
+def test_matches_reference():
+    rng = random.Random(7)
+    series = history.RingSeries(capacity=4096)
+    samples = []
+    now = 0.0
+    price = 500.0
+    for _ in range(2000):
+        # Queries and samples arrive in time order, as they do in HA
+        ts = now + rng.uniform(0.1, 12) * HOUR
+        price = round(price + rng.uniform(-5, 5), 2)
+        if series.append(ts, price):
+            samples.append((ts, price))
+        now = ts + rng.uniform(0, 2) * HOUR
+        for window, length in history.WINDOWS.items():
+            got = series.stats(window, now)
+            want = _reference(samples, length, now)
+            if want is None:
+                assert got is None
+                continue
+            assert got["min"] == want["min"] and got["max"] == want["max"], (window, got, want)
+            assert abs(got["mean"] - want["mean"]) <= 0.011, (window, got, want)
+
+
+def test_capacity_is_fixed():
+    series = history.RingSeries(capacity=16)
+    for i in range(1000):
+        series.append(i * HOUR, 500.0 + (i % 7))
+    assert len(series) == 16
+    assert len(series._ts) == len(series._values) == 16
+    for window in history.WINDOWS:
+        assert len(series._windows[window].mins) <= 16
+    # The 30d window is wider than the buffer; stats cover what is kept
+    stats = series.stats("30d", 999 * HOUR)
+    assert stats["min"] == 500.0 and stats["max"] == 506.0
+
+
+def test_unchanged_price_carries_into_window():
+    series = history.RingSeries()
+    series.append(0.0, 510.0)
+    series.append(2 * DAY, 520.0)
+    stats = series.stats("1h", 3 * DAY)
+    assert stats == {"min": 520.0, "max": 520.0, "mean": 520.0}
+    stats = series.stats("24h", 2 * DAY + 12 * HOUR)
+    assert stats["min"] == 510.0 and stats["max"] == 520.0
+    assert stats["mean"] == 515.0
+
+
+def test_price_history_round_trip():
+    prices = {"gold": {"buy": 534.14, "sell": 513.79}, "silver": {"buy": 6.62, "sell": 6.10}}
+    hist = history.PriceHistory()
+    assert hist.record(0.0, prices) == 4
+    # Same prices again store nothing
+    assert hist.record(HOUR, prices) == 0
+    hist.record(2 * HOUR, {"gold": {"buy": 540.0, "sell": 520.0}})
+    copy = history.PriceHistory()
+    copy.restore(hist.as_dict())
+    now = 3 * HOUR
+    assert copy.stats("gold", "buy", now) == hist.stats("gold", "buy", now)
+    stats = hist.stats("gold", "buy", now)
+    assert stats["max_24h"] == 540.0 and stats["min_24h"] == 534.14
+    assert stats["min_1h"] == 540.0
+    assert hist.stats("miga_100g", "buy", now) == {}
+
+
+def test_hourly_stats():
+    samples = [(HOUR / 2, 500.0), (HOUR + HOUR / 4, 520.0), (5 * HOUR, 510.0)]
+    rows = history.hourly_stats(samples, 0.0, 4 * HOUR + 10)
+    # First hour is averaged from the first sample; the last complete hour ends at 4h
+    assert [r[0] for r in rows] == [0.0, HOUR, 2 * HOUR, 3 * HOUR]
+    assert rows[0] == (0.0, 500.0, 500.0, 500.0)
+    assert rows[1] == (HOUR, 515.0, 500.0, 520.0)
+    assert rows[2] == (2 * HOUR, 520.0, 520.0, 520.0)
+    # Resuming from a marker only yields the hours after it
+    assert history.hourly_stats(samples, 3 * HOUR, 6 * HOUR) == [
+        (3 * HOUR, 520.0, 520.0, 520.0),
+        (4 * HOUR, 520.0, 520.0, 520.0),
+        (5 * HOUR, 510.0, 510.0, 510.0),
+    ]
+    assert history.hourly_stats([], 0.0, DAY) == []
+    assert history.hourly_stats(samples, 0.0, HOUR / 2) == []
+
+
+run_tests(globals())
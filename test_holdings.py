@@ -0,0 +1,50 @@
+"""Test the holdings valuation, including the MIGA-i tier choice."""
+
+from conftest import load_component_module, run_tests
+
+holdings = load_component_module("holdings")
+
+PRICES = {
+    "gold": {"buy": 534.14, "sell": 513.79},
+    "silver": {"buy": 6.62, "sell": 6.10},
+    "miga_100g": {"buy": 534.13, "sell": 522.06},
+    "miga_below100g": {"buy": 535.88, "sell": 521.56},
+}
+
+
+def test_miga_tier_by_size():
+    assert holdings.price_key("miga", 99.99) == "miga_below100g"
+    assert holdings.price_key("miga", 100) == "miga_100g"
+    assert holdings.price_key("gold", 500) == "gold"
+
+
+def test_portfolio_totals():
+    result = holdings.value_holdings({"gold": 10, "silver": 100, "miga": 150}, PRICES)
+    miga = result["positions"]["miga"]
+    assert miga["tier"] == "miga_100g"
+    assert miga["market_value"] == 80119.5
+    assert miga["liquidation_value"] == 78309.0
+    assert result["positions"]["gold"]["liquidation_value"] == 5137.9
+    assert result["market_value"] == round(5341.4 + 662.0 + 80119.5, 2)
+    assert result["liquidation_value"] == round(5137.9 + 610.0 + 78309.0, 2)
+
+
+def test_zero_positions_skipped():
+    result = holdings.value_holdings({"gold": 0, "silver": 0, "miga": 20}, PRICES)
+    assert list(result["positions"]) == ["miga"]
+    assert result["positions"]["miga"]["tier"] == "miga_below100g"
+    assert holdings.value_holdings({}, PRICES) == {
+        "positions": {},
+        "market_value": 0.0,
+        "liquidation_value": 0.0,
+    }
+
+
+def test_missing_prices_blank_the_total():
+    result = holdings.value_holdings({"gold": 10, "miga": 5}, {"gold": PRICES["gold"]})
+    assert result["positions"]["miga"]["market_value"] is None
+    assert result["market_value"] is None
+    assert result["positions"]["gold"]["market_value"] == 5341.4
+
+
+run_tests(globals())
@@ -0,0 +1,187 @@
+"""Test the transaction ledger: FIFO and average cost, P&L and fast restore."""
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from conftest import load_component_module, run_tests
+
+ledger = load_component_module("ledger")
+
+WHEN = "2025-10-01T09:00:00+08:00"
+
+
+def test_fifo_and_average_cost():
+    book = ledger.Ledger()
+    book.record("gold", "buy", 10, 500.0, WHEN)
+    book.record("gold", "buy", 10, 520.0, WHEN)
+    book.record("gold", "sell", 15, 530.0, WHEN)
+    summary = book.books["gold"].summary(540.0)
+    # FIFO: sold 10 @ 500 and 5 @ 520; 5 @ 520 left
+    assert summary["cost_basis_fifo"] == 2600.0
+    assert summary["realized_fifo"] == 15 * 530 - (5000 + 2600)
+    # Average: pooled cost 510/g
+    assert summary["cost_basis_average"] == 2550.0
+    assert summary["realized_average"] == 15 * (530 - 510)
+    assert summary["unrealized_fifo"] == 5 * 540 - 2600
+    assert summary["unrealized_average"] == 5 * 540 - 2550
+    assert summary["grams"] == 5
+
+
+def test_invalid_transactions():
+    book = ledger.Ledger()
+    for args in (("gold", "sell", 1, 500.0), ("platinum", "buy", 1, 1.0), ("gold", "buy", 0, 1.0)):
+        try:
+            book.record(*args, WHEN)
+        except ValueError:
+            continue
+        raise AssertionError(f"accepted {args}")
+    book.record("silver", "buy", 1, 6.0, WHEN)
+    try:
+        book.record("silver", "sell", 2, 6.0, WHEN)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("oversold")
+    assert len(book.transactions) == 1
+    assert book.books["silver"].grams == 1
+
+
+def test_backdated_transaction_is_replayed_in_order():
+    book = ledger.Ledger()
+    book.record("gold", "buy", 10, 500.0, "2025-10-01T09:00:00+08:00")
+    book.record("gold", "sell", 10, 530.0, "2025-10-03T09:00:00+08:00")
+    # Bought on the 2nd, entered late: the sale on the 3rd still takes the oldest lot
+    book.record("gold", "buy", 5, 520.0, "2025-10-02T09:00:00+08:00")
+    in_order = ledger.Ledger()
+    in_order.record("gold", "buy", 10, 500.0, "2025-10-01T09:00:00+08:00")
+    in_order.record("gold", "buy", 5, 520.0, "2025-10-02T09:00:00+08:00")
+    in_order.record("gold", "sell", 10, 530.0, "2025-10-03T09:00:00+08:00")
+    assert book.transactions == in_order.transactions
+    assert book.books["gold"].summary(510.0) == in_order.books["gold"].summary(510.0)
+    assert book.books["gold"].summary(None)["realized_fifo"] == 300.0
+    # Offsets are compared as instants, not as text
+    book.record("gold", "buy", 1, 525.0, "2025-10-03T02:00:00+01:00")
+    assert book.transactions[-1][0] == "2025-10-03T02:00:00+01:00"
+    book.record("gold", "buy", 1, 515.0, "2025-10-02T23:00:00+00:00")
+    assert book.transactions[2][0] == "2025-10-02T23:00:00+00:00"
+    # A backdated sale that leaves a later one short is rejected untouched
+    before = [list(txn) for txn in book.transactions], book.books["gold"].summary(None)
+    try:
+        book.record("gold", "sell", 10, 530.0, "2025-10-02T12:00:00+08:00")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("backdated oversell accepted")
+    assert (book.transactions, book.books["gold"].summary(None)) == before
+
+
+def test_restore_keeps_the_valid_prefix():
+    book = ledger.Ledger()
+    book.record("gold", "buy", 10, 500.0, WHEN)
+    book.record("silver", "buy", 100, 6.0, WHEN)
+    good = json.loads(json.dumps(book.as_dict()))
+    # A sale with nothing held, and everything after it, is dropped
+    state = {"transactions": [["2025-10-01T08:00:00+08:00", "miga", "sell", 1, 500.0]] + good["transactions"]}
+    restored = ledger.Ledger()
+    assert restored.restore(state) == 3
+    assert restored.transactions == [] and restored.books == {}
+    # Malformed entries stop the replay where they are
+    for bad in (["gold", "buy"], None, [WHEN, "gold", "buy", "ten", 500.0], ["yesterday", "gold", "buy", 1, 1.0]):
+        state = {"transactions": good["transactions"] + [bad]}
+        restored = ledger.Ledger()
+        assert restored.restore(state) == 1, bad
+        assert restored.transactions == book.transactions
+        assert restored.books["gold"].summary(520.0) == book.books["gold"].summary(520.0)
+    # An unreadable checkpoint falls back to a full replay
+    for checkpoint in ({"applied": 2, "books": []}, {"applied": 2, "books": {"gold": None}}, "x"):
+        restored = ledger.Ledger()
+        assert restored.restore(dict(good, checkpoint=checkpoint)) == 0, checkpoint
+        assert restored.books["silver"].summary(7.0) == book.books["silver"].summary(7.0)
+    for state in (None, [], {"transactions": "x"}):
+        assert ledger.Ledger().restore(state) == 0
+
+
+def test_backdated_replay_from_checkpoints_matches_in_order():
+    rng = random.Random(11)
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    entries = []
+    for hour in range(3 * ledger.CHECKPOINT_INTERVAL):
+        account = rng.choice(("gold", "silver"))
+        entries.append(((base + timedelta(hours=hour)).isoformat(), account, rng.uniform(1, 5), rng.uniform(480, 560)))
+    late = entries[::7]
+    on_time = [entry for entry in entries if entry not in late]
+    book = ledger.Ledger()
+    for when, account, grams, price in on_time:
+        book.record(account, "buy", grams, price, when)
+        book.record(account, "sell", grams / 2, price, when)
+    # Restored from the stored checkpoint, then entered late
+    book.restore(json.loads(json.dumps(book.as_dict())))
+    for when, account, grams, price in reversed(late):
+        book.record(account, "buy", grams, price, when)
+        book.record(account, "sell", grams / 2, price, when)
+    in_order = ledger.Ledger()
+    for when, account, grams, price in entries:
+        in_order.record(account, "buy", grams, price, when)
+        in_order.record(account, "sell", grams / 2, price, when)
+    assert [txn[0] for txn in book.transactions] == [txn[0] for txn in in_order.transactions]
+    for account in ("gold", "silver"):
+        a, b = book.books[account].summary(520.0), in_order.books[account].summary(520.0)
+        for key in a:
+            assert abs(a[key] - b[key]) < 0.05, (account, key, a, b)
+    # A rejected backdated sale leaves every copy of the books as it was
+    before = book.books["gold"].summary(None)
+    try:
+        book.record("gold", "sell", 10**6, 500.0, base.isoformat())
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("backdated oversell accepted")
+    assert book.books["gold"].summary(None) == before
+    book.record("gold", "buy", 1, 500.0, (base + timedelta(minutes=30)).isoformat())
+    in_order.record("gold", "buy", 1, 500.0, (base + timedelta(minutes=30)).isoformat())
+    assert abs(book.books["gold"].realized_fifo - in_order.books["gold"].realized_fifo) < 0.05
+
+
+def _random_ledger(count, seed=3):
+    rng = random.Random(seed)
+    book = ledger.Ledger()
+    while len(book.transactions) < count:
+        account = rng.choice(ledger.ACCOUNTS)
+        held = book.books[account].grams if account in book.books else 0
+        if held > 1 and rng.random() < 0.4:
+            book.record(account, "sell", round(rng.uniform(0.1, held), 2), rng.uniform(480, 560), WHEN)
+        else:
+            book.record(account, "buy", round(rng.uniform(0.1, 50), 2), rng.uniform(480, 560), WHEN)
+    return book
+
+
+def test_restore_uses_checkpoint():
+    book = _random_ledger(20000)
+    state = json.loads(json.dumps(book.as_dict()))
+    # Two transactions recorded after the checkpoint are replayed on top
+    extra = ledger.Ledger()
+    extra.restore(state)
+    extra.record("gold", "buy", 1, 500.0, WHEN)
+    extra.record("gold", "sell", 0.5, 510.0, WHEN)
+    state["transactions"] = extra.transactions
+
+    started = time.perf_counter()
+    fast = ledger.Ledger()
+    fast.restore(state)
+    fast_ms = (time.perf_counter() - started) * 1000
+
+    state["checkpoint"] = None
+    started = time.perf_counter()
+    slow = ledger.Ledger()
+    slow.restore(state)
+    replay_ms = (time.perf_counter() - started) * 1000
+
+    for account in slow.books:
+        a, b = fast.books[account].summary(520.0), slow.books[account].summary(520.0)
+        for key in a:
+            assert a[key] is None and b[key] is None or abs(a[key] - b[key]) < 0.05, (account, key, a, b)
+    print(f"  20k entries: restore {fast_ms:.1f} ms from checkpoint, {replay_ms:.1f} ms by replay")
+
+
+run_tests(globals())
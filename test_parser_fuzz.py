@@ -0,0 +1,127 @@
+"""Fuzz the parser with random and adversarial pages.
+
+Random pages check the fallback strategy against the backtracking pattern
+it replaced. Adversarial pages (repeated keywords, stray numbers, unclosed
+tags and comments, thousands of tables) must parse within a time budget,
+and the parser's own caps must hold.
+"""
+import random
+import re
+import time
+
+from conftest import load_component_module, run_tests
+
+parser = load_component_module("parser")
+
+# The strategy D pattern before it was replaced
+_REFERENCE = re.compile(
+    r"\b(Gold|Silver)\b.{0,300}?(\d+\.\d{2}).{1,300}?(\d+\.\d{2})",
+    re.IGNORECASE | re.DOTALL
+)
+_SIZE = 2 * 1024 * 1024
+# Generous; each page takes well under a second on a laptop
+_BUDGET_S = 3.0
+_CHUNK = 16 * 1024
+
+
+def _reference_prices(html):
+    prices = {}
+    for m in _REFERENCE.finditer(html):
+        prices.setdefault(m.group(1).lower(), {"buy": float(m.group(2)), "sell": float(m.group(3))})
+    return prices
+
+
+def _random_page(rng):
+    pieces = []
+    for _ in range(rng.randint(1, 40)):
+        kind = rng.random()
+        if kind < 0.2:
+            pieces.append(rng.choice(["Gold", "gold", "SILVER", "Silver", "goldsmith", "xgold"]))
+        elif kind < 0.45:
+            digits = "".join(rng.choice("0123456789") for _ in range(rng.randint(1, 8)))
+            pieces.append(f"{digits}.{rng.randint(0, 99):02d}")
+        elif kind < 0.55:
+            pieces.append(rng.choice(["1.2.34", "12.3", "99", ".50", "1.234.56", "7.8.90"]))
+        elif kind < 0.65:
+            pieces.append(rng.choice(["<td>", "</td>", "<tr>", "<!-- gold -->", "\n"]))
+        else:
+            # Filler straddling the 300-character spans
+            pieces.append(rng.choice(" ab-") * rng.choice([1, 5, 150, 290, 299, 300, 301, 310]))
+        pieces.append(rng.choice(["", " ", "  "]))
+    return "".join(pieces)
+
+
+def _repeat(unit, size=_SIZE):
+    return unit * (size // len(unit) + 1)
+
+
+ADVERSARIAL = {
+    "keywords_one_number": lambda: "Gold 1.00 " + _repeat("gold "),
+    "keywords_lonely_numbers": lambda: _repeat("gold " * 50 + "9.99" + " " * 310),
+    "digit_run": lambda: "gold " + "9" * _SIZE,
+    "unclosed_td": lambda: "<table>" + _repeat("<td>gold 1.00 "),
+    "unterminated_tags": lambda: "<table><tr>" + _repeat("<td class=x gold 1.00 "),
+    "tiny_tables": lambda: _repeat("<p>Gold</p><table><td>1.00</td></table>"),
+    "nested_tables": lambda: _repeat("<table><tr><td>silver 2.00"),
+    "unclosed_comment": lambda: "<!-- " + _repeat("gold 1.00 <table> "),
+    "unclosed_script": lambda: "<table><script>" + _repeat("gold 1.00 </scrip "),
+}
+
+
+def _stream(html):
+    extractor = parser.TableExtractor()
+    for start in range(0, len(html), _CHUNK):
+        extractor.feed(html[start:start + _CHUNK])
+        assert len(extractor._buf) <= parser._MAX_PENDING + _CHUNK
+    return extractor.close()
+
+
+def test_fallback_matches_reference_pattern():
+    rng = random.Random(20251001)
+    for _ in range(2000):
+        html = _random_page(rng)
+        got = parser.parse_tables([], html, ("D",)).prices
+        assert got == _reference_prices(html), html
+
+
+def test_adversarial_pages_parse_within_budget():
+    for name, build in ADVERSARIAL.items():
+        html = build()
+        started = time.perf_counter()
+        parser.parse_prices(html)
+        parser.parse_tables(_stream(html), html)
+        elapsed = time.perf_counter() - started
+        assert elapsed < _BUDGET_S, f"{name}: {elapsed:.2f} s"
+
+
+def test_fallback_gives_up_after_mention_cap():
+    prices = "Gold 534.14 513.79"
+    # Far enough from the prices that only the last mention can match
+    filler = " " * (parser._FALLBACK_SPAN + 1)
+    capped = "gold " * parser._FALLBACK_MAX_MENTIONS + filler + prices
+    assert parser.parse_tables([], capped, ("D",)).prices == {}
+    assert parser.parse_tables([], "gold " * 10 + filler + prices, ("D",)).prices == {
+        "gold": {"buy": 534.14, "sell": 513.79}
+    }
+
+
+def test_unclosed_comment_is_given_up_on():
+    # Past the cap the comment stops being carried, and later tables are found
+    html = "<!-- " + "x" * (parser._MAX_PENDING + _CHUNK) + "<p>Gold</p><table><td>1.00</td><td>2.00</td></table>"
+    tables = _stream(html)
+    assert [t.caption for t in tables] == ["Gold"]
+    # A short unclosed comment is carried until it closes
+    tables = _stream("<!-- " + "x" * 100 + " --><p>Silver</p><table></table>")
+    assert [t.caption for t in tables] == ["Silver"]
+
+
+def test_back_to_back_table_captions():
+    html = (
+        "<p>Gold</p><table><td>1.00</td></table>"
+        "<table><td>2.00</td></table>"
+        "<p>Silver</p><table><td>3.00</td></table>"
+    )
+    assert [t.caption for t in parser.extract_tables(html)] == ["Gold", "Gold", "Silver"]
+
+
+run_tests(globals())
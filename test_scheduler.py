@@ -0,0 +1,92 @@
+"""Test the adaptive poll scheduler with simulated publication times."""
+from datetime import datetime, time, timedelta
+
+from conftest import load_component_module, run_tests
+
+scheduler = load_component_module("scheduler")
+
+BASE = timedelta(minutes=30)
+# Monday 6 Oct 2025
+MONDAY = datetime(2025, 10, 6)
+
+
+def _trained():
+    sched = scheduler.PollScheduler(BASE)
+    # Maybank publishes around 09:15 and 13:45 on weekdays
+    for week in range(3):
+        for day in range(5):
+            date = MONDAY + timedelta(days=7 * week + day)
+            sched.record_change(date.replace(hour=9, minute=17))
+            sched.record_change(date.replace(hour=13, minute=46))
+    return sched
+
+
+def test_untrained_uses_base_interval():
+    sched = scheduler.PollScheduler(BASE)
+    assert sched.next_interval(MONDAY.replace(hour=3)) == BASE
+
+
+def test_dense_inside_learned_window():
+    sched = _trained()
+    assert sched.next_interval(MONDAY.replace(hour=9, minute=20)) == sched.dense
+    assert sched.next_interval(MONDAY.replace(hour=13, minute=40)) == sched.dense
+
+
+def test_backs_off_until_next_window():
+    sched = _trained()
+    # 08:05 -> next dense window starts at 09:00 (one bucket before 09:15)
+    assert sched.next_interval(MONDAY.replace(hour=8, minute=5)) == timedelta(minutes=55)
+    # Late evening backs off to the cap
+    assert sched.next_interval(MONDAY.replace(hour=20)) == sched.max_interval
+
+
+def test_weekend_backs_off():
+    sched = _trained()
+    saturday = MONDAY + timedelta(days=5)
+    assert sched.next_interval(saturday.replace(hour=9, minute=20)) == sched.max_interval
+
+
+def test_quiet_hours():
+    sched = scheduler.PollScheduler(BASE, quiet_start=time(22, 0), quiet_end=time(6, 0))
+    # Inside quiet hours: wait until they end
+    assert sched.next_interval(MONDAY.replace(hour=23)) == timedelta(hours=7)
+    # A poll that would land in quiet hours is pushed to their end
+    assert sched.next_interval(MONDAY.replace(hour=21, minute=45)) == timedelta(hours=8, minutes=15)
+    assert sched.next_interval(MONDAY.replace(hour=12)) == BASE
+
+
+def test_state_round_trip():
+    sched = _trained()
+    copy = scheduler.PollScheduler(BASE)
+    copy.restore(sched.as_dict())
+    assert copy.windows("weekday") == sched.windows("weekday") == [("09:00", "10:00"), ("13:30", "14:30")]
+    assert copy.changes_seen == 30
+
+
+def test_malformed_state_is_ignored():
+    good = _trained().as_dict()
+    sched = scheduler.PollScheduler(BASE)
+    sched.restore({"hist": {"weekday": ["x"] * scheduler.BUCKETS}, "changes_seen": "many", "last_change": "soon"})
+    assert sched.windows("weekday") == []
+    assert sched.changes_seen == 0 and sched.last_change is None
+    # A bad field doesn't cost the good ones
+    sched.restore(dict(good, last_change=12))
+    assert sched.changes_seen == 30 and sched.windows("weekday")
+    sched.restore(["not", "a", "dict"])
+    sched.restore({"hist": "x"})
+
+
+def test_polls_per_day():
+    sched = _trained()
+    now = MONDAY + timedelta(days=21)
+    end = now + timedelta(days=1)
+    polls = 0
+    while now < end:
+        now += sched.next_interval(now)
+        polls += 1
+    # A fixed 30 minute interval makes 48 requests a day
+    assert polls < 48, polls
+    print(f"  adaptive: {polls} polls per weekday vs 48 fixed")
+
+
+run_tests(globals())
@@ -0,0 +1,138 @@
+"""Price sensor state writes, driven through Home Assistant on a fake clock.
+
+The fetcher serves prices set by the test instead of requesting the page,
+and the coordinator refreshes on demand. Needs Home Assistant installed.
+"""
+import asyncio
+import logging
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from conftest import require, run_tests
+
+require("homeassistant", globals())
+
+from homeassistant.const import EVENT_STATE_CHANGED  # noqa: E402
+from homeassistant.core import HomeAssistant, callback  # noqa: E402
+from homeassistant.helpers import device_registry as dr, entity, entity_registry as er  # noqa: E402
+from homeassistant.helpers.entity_platform import EntityPlatform  # noqa: E402
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from custom_components.maybank_gold_silver.const import DOMAIN  # noqa: E402
+from custom_components.maybank_gold_silver.fetcher import MaybankFetcher  # noqa: E402
+from custom_components.maybank_gold_silver.sensor import MaybankMetalsCoordinator, _build_entities  # noqa: E402
+
+START = datetime(2025, 10, 6, 1, 0, tzinfo=timezone.utc)
+GOLD = "sensor.gold_buy_price"
+
+
+def _prices(gold, silver=6.5):
+    return {
+        "gold": {"buy": gold, "sell": gold - 20},
+        "silver": {"buy": silver, "sell": silver - 0.5},
+    }
+
+
+class _FakeFetcher(MaybankFetcher):
+    """Serves ``prices`` instead of requesting the page."""
+
+    prices = {}
+
+    async def _async_fetch(self):
+        self.refresh_count += 1
+        if self.prices == self.data:
+            return self._unchanged("unchanged")
+        return self._accept_prices(self.prices)
+
+
+async def _drive(steps, config_dir):
+    """Refresh once per ``(minutes after START, prices)``; return hass, fetcher, writes."""
+    clock = [START]
+    writes = []
+    hass = HomeAssistant(config_dir)
+    entity.async_setup(hass)
+    await dr.async_load(hass)
+    await er.async_load(hass)
+
+    @callback
+    def _on_state(event):
+        writes.append(event.data["entity_id"])
+
+    hass.bus.async_listen(EVENT_STATE_CHANGED, _on_state)
+    fetcher = _FakeFetcher(hass, None, utcnow=lambda: clock[0])
+    coordinator = MaybankMetalsCoordinator(hass, fetcher, None)
+    platform = EntityPlatform(
+        hass=hass,
+        logger=logging.getLogger(__name__),
+        domain="sensor",
+        platform_name=DOMAIN,
+        platform=None,
+        scan_interval=timedelta(minutes=30),
+        entity_namespace=None,
+    )
+    await platform.async_add_entities(_build_entities(coordinator))
+    await hass.async_block_till_done()
+    for minutes, prices in steps:
+        clock[0] = START + timedelta(minutes=minutes)
+        fetcher.prices = prices
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+    return hass, fetcher, writes
+
+
+def _run(steps, check):
+    async def _main():
+        with tempfile.TemporaryDirectory() as config_dir:
+            hass, fetcher, writes = await _drive(steps, config_dir)
+            try:
+                check(hass, fetcher, writes)
+            finally:
+                await hass.async_stop(force=True)
+
+    asyncio.run(_main())
+
+
+def test_flat_price_statistics_follow_the_windows():
+    # Gold moves once, then stays flat for 30 hours while silver keeps moving
+    steps = [(0, _prices(500.0)), (30, _prices(600.0))]
+    steps += [(60 + 30 * i, _prices(600.0, 6.5 + i / 100)) for i in range(60)]
+
+    def check(hass, fetcher, writes):
+        attrs = hass.states.get(GOLD).attributes
+        expected = fetcher.history.stats("gold", "buy", fetcher.utcnow().timestamp())
+        assert expected["min_24h"] == 600.0
+        for name in ("min_1h", "max_1h", "mean_1h", "min_24h", "mean_24h", "max_7d", "mean_7d"):
+            assert attrs[name] == expected[name], (name, attrs[name], expected[name])
+
+    _run(steps, check)
+
+
+def test_statistics_move_on_while_every_price_is_flat():
+    # Nothing changes after the first half hour, so every later page is unchanged
+    steps = [(0, _prices(500.0)), (30, _prices(600.0))]
+    steps += [(60 + 30 * i, _prices(600.0)) for i in range(50)]
+
+    def check(hass, fetcher, writes):
+        attrs = hass.states.get(GOLD).attributes
+        assert fetcher.skip_counts["unchanged"] == 50
+        assert attrs["min_1h"] == attrs["min_24h"] == attrs["mean_24h"] == 600.0
+
+    _run(steps, check)
+
+
+def test_unchanged_refresh_at_the_same_time_writes_nothing():
+    steps = [(0, _prices(500.0)), (30, _prices(600.0))]
+    counts = []
+
+    def check(hass, fetcher, writes):
+        counts.append(len(writes))
+
+    _run(steps, check)
+    # Same prices at the same instant: nothing any sensor shows has moved
+    _run(steps + [(30, _prices(600.0))], check)
+    assert counts[0] == counts[1], counts
+
+
+run_tests(globals())
@@ -0,0 +1,151 @@
+"""Test the single-pass table extractor against the sample Maybank HTML."""
+
+from conftest import load_component_module, run_tests
+
+parser = load_component_module("parser")
+
+# Full HTML from user (investment accounts, Kijang Emas and MIGA-i)
+full_html = """<div class="col-sm-6"><p class="text-medium black">Maybank Gold Investment Account</p><div class="table-responsive"><table class="table highlight"><tr><th>Date</th><th>Selling (RM/g)</th><th>Buying (RM/g)</th></tr><td>01 Oct 2025</td><td>534.14</td><td>513.79</td></table><p class="text-small">Effective on 01 Oct 2025 01:44 PM</p></div><p class="text-medium black p-top-50">Kijang Emas Daily Prices</p><div class="table-responsive"><table class="table highlight"><tr><th>Size (oz)</th><th>Selling (RM)</th><th>Buying (RM)</th></tr><td>ONE</td><td>17,271.00</td><td>16,578.00</td></tr> <tr><td>HALF</td><td>8,798.00</td><td>8,289.00</td></tr> <tr><td>QUARTER</td><td>4,481.00</td><td>4,144.00</td></tr></table><p class="text-small">Effective on 01 Oct 2025 01:44 PM</p></div></div><div class="col-sm-6"><p class="text-medium black">Maybank Silver Investment Account</p><div class="table-responsive"><table class="table highlight"><tr><th>Date</th><th>Selling (RM/g)</th><th>Buying (RM/g)</th></tr><td>01 Oct 2025</td><td>6.62</td><td>6.10</td></table><p class="text-small">Effective on 01 Oct 2025 01:44 PM</p></div><p class="text-medium black p-top-50">Maybank Islamic Gold Account-i (MIGA-i) </p><div class="table-responsive"><table class="table highlight"><tr><th>Date</th><th>Selling (RM/g)</th><th>Buying (RM/g)</th></tr><tr><td>For 100 grams and above</td><td>534.13</td><td>522.06</td></tr><tr><td>For below 100 grams </td><td>535.88</td><td>521.56</td></tr></table><p class="text-small">Effective on 01 Oct 2025 09:17:39</p></div></div>"""
+
+# Generic layout from test_with_sample.py
+generic_html = """
+<table class="rates-table">
+    <thead><tr><th>Metal</th><th>Buy (RM/g)</th><th>Sell (RM/g)</th></tr></thead>
+    <tbody>
+        <tr><td>Gold</td><td>345.50</td><td>350.75</td></tr>
+        <tr><td>Silver</td><td>4.25</td><td>4.50</td></tr>
+    </tbody>
+</table>
+"""
+
+EXPECTED_FULL = {
+    "gold": {"buy": 534.14, "sell": 513.79},
+    "silver": {"buy": 6.62, "sell": 6.10},
+    "miga_100g": {"buy": 534.13, "sell": 522.06},
+    "miga_below100g": {"buy": 535.88, "sell": 521.56},
+}
+
+
+def test_table_model():
+    tables = parser.extract_tables(full_html)
+    captions = [t.caption for t in tables]
+    assert captions == [
+        "Maybank Gold Investment Account",
+        "Kijang Emas Daily Prices",
+        "Maybank Silver Investment Account",
+        "Maybank Islamic Gold Account-i (MIGA-i)",
+    ], captions
+    assert tables[0].headers == ("Date", "Selling (RM/g)", "Buying (RM/g)")
+    assert tables[0].rows[0].cells == ("01 Oct 2025", "534.14", "513.79")
+    assert tables[3].rows[1].label == "For below 100 grams"
+
+
+def test_full_page():
+    result = parser.parse_tables(parser.extract_tables(full_html), full_html)
+    assert result.prices == EXPECTED_FULL, result.prices
+    assert result.strategy == "A"
+
+
+def test_generic_table():
+    result = parser.parse_tables(parser.extract_tables(generic_html), generic_html)
+    assert result.prices == {
+        "gold": {"buy": 345.50, "sell": 350.75},
+        "silver": {"buy": 4.25, "sell": 4.50},
+    }
+    assert result.strategy == "C"
+
+
+def test_free_text_fallback():
+    prices = parser.parse_prices("Gold: 345.50 / 350.75\nSilver: 4.25 / 4.50")
+    assert prices["gold"] == {"buy": 345.50, "sell": 350.75}
+    assert prices["silver"] == {"buy": 4.25, "sell": 4.50}
+
+
+def test_chunked_feed_matches_single_pass():
+    extractor = parser.TableExtractor()
+    for i in range(0, len(full_html), 7):
+        extractor.feed(full_html[i:i + 7])
+    assert extractor.close() == parser.extract_tables(full_html)
+
+
+def test_required_tables_stop_point():
+    extractor = parser.TableExtractor()
+    cut = full_html.index("Maybank Islamic Gold")
+    extractor.feed(full_html[:cut])
+    assert not parser.has_required_tables(extractor.tables)
+    extractor.feed(full_html[cut:])
+    assert parser.has_required_tables(extractor.tables)
+    assert not parser.has_required_tables(parser.extract_tables(generic_html))
+
+
+def test_no_tables():
+    assert parser.parse_prices("<html><body><p>Maintenance</p></body></html>") == {}
+
+
+def test_strategy_order():
+    assert parser.order_strategies() == parser.STRATEGIES
+    assert parser.order_strategies("C") == ("C", "A", "B", "D")
+    assert parser.order_strategies(None, {"B": 3, "A": 1}) == ("B", "A", "C", "D")
+    # The raw-text fallback never jumps ahead of the table strategies
+    assert parser.order_strategies("D", {"D": 9}) == ("A", "B", "C", "D")
+
+
+def test_last_winner_first_gives_same_prices():
+    tables = parser.extract_tables(generic_html)
+    default = parser.parse_tables(tables, generic_html)
+    adapted = parser.parse_tables(tables, generic_html, parser.order_strategies(default.strategy))
+    assert adapted == default
+
+
+
+def _padded(before: int, after: int = 0) -> str:
+    pad = '<div class="promo"><p>Invest in gold from RM100.00 today.</p></div>\n'
+    return "<html><body>" + pad * before + full_html + pad * after + "</body></html>"
+
+
+def test_window_matches_full_parse():
+    html = _padded(200, 200)
+    hint = parser.make_hint(html, parser.extract_tables(html))
+    assert hint is not None
+    # Markup above the tables shifted by a few characters since the hint was taken
+    moved = html.replace("<body>", "<body><p>new banner</p>", 1)
+    tables = parser.extract_window(moved, hint)
+    assert tables is not None
+    assert parser.parse_tables(tables, moved).prices == EXPECTED_FULL
+    full = parser.extract_tables(moved)
+    assert [(t.caption, t.start, t.end) for t in tables] == [(t.caption, t.start, t.end) for t in full]
+    assert parser.TableHint.from_dict(hint.as_dict()) == hint
+
+
+def test_window_falls_back_when_fingerprint_fails():
+    html = _padded(200)
+    hint = parser.make_hint(html, parser.extract_tables(html))
+    # Far more markup above the tables than the hint can absorb
+    assert parser.extract_window(_padded(2000), hint) is None
+    # Anchor in place but a rate table dropped from the page
+    without_miga = html[:html.index("<p class=\"text-medium black p-top-50\">Maybank Islamic")]
+    assert parser.extract_window(without_miga, hint) is None
+    assert parser.make_hint(generic_html, parser.extract_tables(generic_html)) is None
+    assert parser.TableHint.from_dict({"offset": "x"}) is None
+
+
+def test_digest_covers_only_rate_tables():
+    html = _padded(200, 200)
+    digest = parser.rate_digest(html, parser.extract_tables(html))
+    # A stream that stopped after the rate tables and a hinted window agree
+    cut = html.index("</table>", html.index("MIGA-i")) + len("</table>")
+    assert parser.rate_digest(html, parser.extract_tables(html[:cut])) == digest
+    hint = parser.make_hint(html, parser.extract_tables(html))
+    assert parser.rate_digest(html, parser.extract_window(html, hint)) == digest
+    # Kijang Emas is not a rate table the integration reads
+    changed = html.replace("17,271.00", "17,301.00")
+    assert parser.rate_digest(changed, parser.extract_tables(changed)) == digest
+    changed = html.replace("534.14", "535.01")
+    assert parser.rate_digest(changed, parser.extract_tables(changed)) != digest
+    # Without the rate tables the whole page counts
+    assert parser.rate_digest(generic_html, parser.extract_tables(generic_html)) != parser.rate_digest(
+        generic_html + " ", parser.extract_tables(generic_html)
+    )
+
+
+run_tests(globals())